@@ -0,0 +1,9 @@
+"""
+URL routing for the async attendance read endpoint.
+"""
+from django.urls import path
+from .async_views import attendance_index
+
+urlpatterns = [
+    path('attendance/', attendance_index),
+]
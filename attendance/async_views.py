@@ -0,0 +1,27 @@
+"""
+Async read endpoint for Attendance records, mounted under /api/async/.
+"""
+from rest_framework.request import Request
+
+from employee_project.db_router import use_replica
+from employee_project.middleware import query_budget
+from employees.async_views import async_endpoint, read_queryset
+from .pagination import DateIdKeysetPagination
+from .serializers import ATTENDANCE_VALUES, attendance_row
+from .views import AttendanceViewSet
+
+
+@use_replica
+@query_budget(2)
+@async_endpoint(require_auth=True)
+async def attendance_index(request):
+    paginator = DateIdKeysetPagination()
+    queryset = read_queryset(AttendanceViewSet, request, ATTENDANCE_VALUES)
+    page_query = paginator.get_page_queryset(queryset, Request(request))
+    rows = paginator.set_page([row async for row in page_query.aiterator()])
+    legacy_employee = request.GET.get('employee_format') == 'string'
+    return {
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': [attendance_row(row, legacy_employee=legacy_employee) for row in rows],
+    }
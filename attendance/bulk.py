@@ -0,0 +1,74 @@
+"""
+Bulk ingestion of attendance rows.
+Validates a batch of (employee_id, date, status) rows with a single employee lookup and
+writes them with upserting INSERTs, so re-posted rows update the existing record.
+"""
+from django.db import transaction
+from rest_framework import serializers
+
+from employees.models import Employee
+from .models import Attendance, attendance_bulk_written
+from .serializers import AttendanceRowSerializer
+
+MAX_BULK_ROWS = 10000
+BULK_BATCH_SIZE = 1000
+
+
+def upsert_attendance(rows):
+    """
+    Validate and write a list of attendance rows.
+
+    Returns a ``(written, errors)`` tuple. ``errors`` holds one entry per rejected row,
+    ``{'index': <position in payload>, 'errors': {...}}``; valid rows are written even
+    when others fail. If the same (employee, date) appears twice, the last row wins.
+    """
+    if not isinstance(rows, list):
+        raise serializers.ValidationError({'non_field_errors': ['Expected a list of attendance rows.']})
+    if len(rows) > MAX_BULK_ROWS:
+        raise serializers.ValidationError(
+            {'non_field_errors': [f'A batch may contain at most {MAX_BULK_ROWS} rows.']}
+        )
+
+    row_serializer = AttendanceRowSerializer()
+    errors = []
+    cleaned = []
+    for index, row in enumerate(rows):
+        try:
+            cleaned.append((index, row_serializer.run_validation(row)))
+        except serializers.ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+
+    # Resolve every referenced employee in one query instead of one lookup per row.
+    employee_ids = {row['employee_id'] for _, row in cleaned}
+    known_ids = set(
+        Employee.objects.filter(pk__in=employee_ids).values_list('pk', flat=True)
+    )
+    does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+
+    latest = {}
+    for index, row in cleaned:
+        if row['employee_id'] not in known_ids:
+            errors.append({
+                'index': index,
+                'errors': {'employee_id': [does_not_exist.format(pk_value=row['employee_id'])]},
+            })
+            continue
+        latest[(row['employee_id'], row['date'])] = row['status']
+
+    records = [
+        Attendance(employee_id=employee_id, date=day, status=status)
+        for (employee_id, day), status in latest.items()
+    ]
+    if records:
+        with transaction.atomic():
+            Attendance.objects.bulk_create(
+                records,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=['status'],
+            )
+            attendance_bulk_written.send(sender=Attendance, keys=list(latest))
+
+    errors.sort(key=lambda error: error['index'])
+    return len(records), errors
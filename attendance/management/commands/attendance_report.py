@@ -0,0 +1,45 @@
+"""
+Management command listing employees who recorded a status on many of their recent days,
+computed on the attendance matrix (attendance/matrix.py).
+"""
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.matrix import STATUS_CODES, get_matrix, window_days
+from employees.models import Employee
+
+
+class Command(BaseCommand):
+    help = 'List employees with a status on at least --min-days of their last --days days.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', default='A', choices=sorted(STATUS_CODES),
+                            help='Attendance status to count (default: A).')
+        parser.add_argument('--days', type=int, default=30,
+                            help='Trailing window in days, ending today (default: 30).')
+        parser.add_argument('--min-days', type=int, default=3,
+                            help='Report employees with at least this many matching days (default: 3).')
+        parser.add_argument('--department', type=int,
+                            help='Only employees of this department id.')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['days'] <= window_days():
+            raise CommandError(f'--days must be from 1 to {window_days()}.')
+        matrix = get_matrix()
+        rows = matrix.select(department_id=options['department'])
+        counts = matrix.window_counts(options['status'], options['days'], rows)
+        longest, current = matrix.streaks(options['status'], rows)
+        flagged = np.flatnonzero(counts >= options['min_days'])
+        flagged = flagged[np.argsort(-counts[flagged], kind='stable')]
+        employee_ids = matrix.employee_ids[rows][flagged].tolist()
+        names = dict(Employee.objects.filter(pk__in=employee_ids).values_list('pk', 'name'))
+
+        for position, employee_id in zip(flagged.tolist(), employee_ids):
+            self.stdout.write(
+                f"{names.get(employee_id, '?')} (id {employee_id}): {counts[position]} of the last "
+                f"{options['days']} days, longest streak {longest[position]}, current {current[position]}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(employee_ids)} employee(s) with status {options['status']} on at least "
+            f"{options['min_days']} of the last {options['days']} days."
+        ))
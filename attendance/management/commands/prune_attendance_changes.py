@@ -0,0 +1,16 @@
+"""
+Management command to delete AttendanceChange rows that no matrix refresh will read again.
+Schedule it daily (cron, or a ``prune_attendance_changes`` job); requests never prune.
+"""
+from django.core.management.base import BaseCommand
+from attendance.matrix import prune_changes
+
+
+class Command(BaseCommand):
+    help = 'Delete AttendanceChange log rows older than the matrix change retention.'
+
+    def handle(self, *args, **options):
+        deleted = prune_changes()
+        self.stdout.write(
+            self.style.SUCCESS(f'Pruned {deleted} attendance change rows.')
+        )
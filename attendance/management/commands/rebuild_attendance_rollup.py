@@ -0,0 +1,16 @@
+"""
+Management command to rebuild the monthly attendance rollup from scratch.
+Use after loading data with raw SQL or any other path that bypasses the rollup signals.
+"""
+from django.core.management.base import BaseCommand
+from attendance.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the AttendanceMonthlyRollup table from Attendance records.'
+
+    def handle(self, *args, **options):
+        written = rebuild_rollup()
+        self.stdout.write(
+            self.style.SUCCESS(f'Attendance rollup rebuilt with {written} rows.')
+        )
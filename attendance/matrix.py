@@ -0,0 +1,302 @@
+"""
+In-memory employee x day attendance matrix for vectorized analytics.
+
+The matrix holds one int8 status code per cell (see STATUS_CODES; 0 means no record) for
+every employee over the last ATTENDANCE_MATRIX_DAYS days. Rows follow employee id order
+and columns follow the calendar, so ``rows`` maps an employee id to its row and
+``column()`` maps a date to its column.
+
+Each process keeps one matrix, returned by get_matrix(). Instead of reloading, it replays
+the AttendanceChange log written by the receivers in attendance/signals.py and re-reads
+only the cells that changed. A matrix is never modified once built: a refresh with changes
+returns a new one, so a request can keep using the matrix it started with while another
+thread swaps in a newer one.
+"""
+import threading
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from employees.models import Employee
+from .models import Attendance, AttendanceChange
+
+STATUS_CODES = {'P': 1, 'A': 2, 'L': 3}
+LOAD_CHUNK_SIZE = 10000
+# Change rows are re-read for this long after they are seen, so a write whose transaction
+# committed after a later-logged change is still picked up.
+CHANGE_OVERLAP = timedelta(seconds=30)
+# Matrices reload in full at least daily, when their window moves, so older changes are
+# never read again; prune_changes() deletes them.
+CHANGE_RETENTION = timedelta(days=2)
+
+
+def window_days():
+    return getattr(settings, 'ATTENDANCE_MATRIX_DAYS', 366)
+
+
+def _locate(employee_ids, start, keys):
+    """
+    Rows and columns of ``(employee_id, date, ...)`` keys, with a mask of the keys whose
+    employee has a row.
+    """
+    employees = np.fromiter((key[0] for key in keys), dtype=np.int64, count=len(keys))
+    rows = np.searchsorted(employee_ids, employees)
+    known = rows < len(employee_ids)
+    known[known] = employee_ids[rows[known]] == employees[known]
+    columns = np.fromiter((key[1].toordinal() for key in keys), dtype=np.int64, count=len(keys))
+    return rows, columns - start.toordinal(), known
+
+
+def _fill(codes, employee_ids, start, records):
+    """Write ``(employee_id, date, status)`` records into ``codes``."""
+    rows, columns, known = _locate(employee_ids, start, records)
+    values = np.fromiter((STATUS_CODES[record[2]] for record in records), dtype=np.int8, count=len(records))
+    codes[rows[known], columns[known]] = values[known]
+
+
+def prune_changes():
+    """
+    Delete AttendanceChange rows older than CHANGE_RETENTION and return how many went.
+    Run from the ``prune_attendance_changes`` command or job, never from a request, so that
+    chart reads stay read-only.
+    """
+    deleted, _ = AttendanceChange.objects.filter(changed_at__lt=timezone.now() - CHANGE_RETENTION).delete()
+    return deleted
+
+
+class AttendanceMatrix:
+    """
+    Attendance for ``employee_ids`` x ``start``..``end``. ``codes`` is the int8 matrix and
+    ``department_ids`` holds each row's department.
+    """
+
+    def __init__(self, employee_ids, department_ids, codes, start, synced_at, seen=None):
+        self.employee_ids = employee_ids
+        self.department_ids = department_ids
+        self.codes = codes
+        self.start = start
+        self.end = start + timedelta(days=codes.shape[1] - 1)
+        self.rows = {employee_id: row for row, employee_id in enumerate(employee_ids.tolist())}
+        self.synced_at = synced_at
+        # Change ids already applied within CHANGE_OVERLAP of synced_at.
+        self.seen = seen or {}
+
+    @classmethod
+    def load(cls, end=None, days=None):
+        """Build the matrix from the database, ending at ``end`` (default: today)."""
+        synced_at = timezone.now()
+        # Changes committed before the rows below are read are already reflected in them.
+        seen = dict(
+            AttendanceChange.objects.filter(changed_at__gte=synced_at - CHANGE_OVERLAP)
+            .values_list('pk', 'changed_at')
+        )
+        end = end or timezone.localdate()
+        start = end - timedelta(days=(days or window_days()) - 1)
+        employees = list(Employee.objects.order_by('pk').values_list('pk', 'department_id'))
+        employee_ids = np.array([pk for pk, _ in employees], dtype=np.int64)
+        department_ids = np.array([department_id for _, department_id in employees], dtype=np.int64)
+        codes = np.zeros((len(employees), (end - start).days + 1), dtype=np.int8)
+
+        records = (
+            Attendance.objects.filter(date__range=(start, end))
+            .values_list('employee_id', 'date', 'status')
+            .iterator(chunk_size=LOAD_CHUNK_SIZE)
+        )
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= LOAD_CHUNK_SIZE:
+                _fill(codes, employee_ids, start, chunk)
+                chunk = []
+        if chunk:
+            _fill(codes, employee_ids, start, chunk)
+        # Changes logged while loading fall inside the overlap and are replayed by the first refresh.
+        return cls(employee_ids, department_ids, codes, start, synced_at, seen)
+
+    def refreshed(self):
+        """
+        Return a matrix with the changes logged since this one was synced applied, or self
+        when there are none.
+        """
+        changes = [
+            change for change in AttendanceChange.objects
+            .filter(changed_at__gte=self.synced_at - CHANGE_OVERLAP)
+            .values_list('pk', 'employee_id', 'date', 'changed_at')
+            .order_by('changed_at', 'pk')
+            if change[0] not in self.seen
+        ]
+        if not changes:
+            return self
+
+        synced_at = max(self.synced_at, changes[-1][3])
+        seen = {
+            pk: changed_at for pk, changed_at in self.seen.items()
+            if changed_at >= synced_at - CHANGE_OVERLAP
+        }
+        seen.update((pk, changed_at) for pk, _, _, changed_at in changes)
+
+        employee_ids = self.employee_ids
+        department_ids = self.department_ids.copy()
+        codes = self.codes
+        added = []
+        changed_employees = {employee_id for _, employee_id, day, _ in changes if day is None}
+        if changed_employees:
+            current = dict(Employee.objects.filter(pk__in=changed_employees).values_list('pk', 'department_id'))
+            if any(employee_id in self.rows for employee_id in changed_employees - set(current)):
+                # Deleted employees would leave holes in the rows; rebuild instead.
+                return self.load(end=self.end, days=codes.shape[1])
+            added = sorted(set(current) - set(self.rows))
+            if added and added[0] < employee_ids[-1]:
+                # Rows are kept in id order; an employee inserted below the last id needs a rebuild.
+                return self.load(end=self.end, days=codes.shape[1])
+            for employee_id, department_id in current.items():
+                if employee_id in self.rows:
+                    department_ids[self.rows[employee_id]] = department_id
+            if added:
+                employee_ids = np.concatenate([employee_ids, np.array(added, dtype=np.int64)])
+                department_ids = np.concatenate(
+                    [department_ids, np.array([current[pk] for pk in added], dtype=np.int64)]
+                )
+                codes = np.vstack([codes, np.zeros((len(added), codes.shape[1]), dtype=np.int8)])
+
+        cells = {
+            (employee_id, day) for _, employee_id, day, _ in changes
+            if day is not None and self.start <= day <= self.end
+        }
+        if cells or added:
+            codes = codes.copy() if codes is self.codes else codes
+            # New employees get their whole window: rows written with bulk_create alongside
+            # them, e.g. by seed_data, log no cell changes.
+            scope = Q(employee_id__in=added, date__range=(self.start, self.end))
+            if cells:
+                scope |= Q(
+                    employee_id__in={employee_id for employee_id, _ in cells},
+                    date__range=(min(day for _, day in cells), max(day for _, day in cells)),
+                )
+                # Clear every changed cell first: a deleted record has no row to re-read.
+                rows, columns, known = _locate(employee_ids, self.start, list(cells))
+                codes[rows[known], columns[known]] = 0
+            new_employees = set(added)
+            records = [
+                record for record in Attendance.objects.filter(scope).values_list('employee_id', 'date', 'status')
+                if record[0] in new_employees or (record[0], record[1]) in cells
+            ]
+            if records:
+                _fill(codes, employee_ids, self.start, records)
+        return AttendanceMatrix(employee_ids, department_ids, codes, self.start, synced_at, seen)
+
+    def column(self, day):
+        """Column of ``day``, which must fall inside the window."""
+        return (day - self.start).days
+
+    def dates(self, start=None, end=None):
+        first, last = self._columns(start, end)
+        return [self.start + timedelta(days=offset) for offset in range(first, last)]
+
+    def _columns(self, start, end):
+        first = 0 if start is None else min(max(self.column(start), 0), self.codes.shape[1])
+        last = self.codes.shape[1] if end is None else min(max(self.column(end) + 1, 0), self.codes.shape[1])
+        return first, max(first, last)
+
+    def select(self, department_id=None, employee_ids=None):
+        """Row indexes of the employees in ``department_id`` or listed in ``employee_ids``."""
+        if employee_ids is not None:
+            return np.array([self.rows[pk] for pk in employee_ids if pk in self.rows], dtype=np.int64)
+        if department_id is not None:
+            return np.flatnonzero(self.department_ids == int(department_id))
+        return np.arange(len(self.employee_ids))
+
+    def cells(self, rows=None, start=None, end=None):
+        first, last = self._columns(start, end)
+        codes = self.codes[:, first:last]
+        return codes if rows is None else codes[rows]
+
+    def daily_counts(self, status, rows=None, start=None, end=None):
+        """Per day: employees with ``status`` and employees with any record."""
+        cells = self.cells(rows, start, end)
+        return (cells == STATUS_CODES[status]).sum(axis=0), (cells != 0).sum(axis=0)
+
+    def rolling_rate(self, status, window, rows=None, start=None, end=None):
+        """
+        Share of recorded cells with ``status`` over the ``window`` days ending on each day,
+        as (dates, rates, counts). Windows are cut short at the start of the matrix.
+        """
+        # Sum from the first column so the windows of the first requested days are complete.
+        first, _ = self._columns(start, end)
+        matches, recorded = self.daily_counts(status, rows, end=end)
+        matches = _trailing_sums(matches, window)[first:]
+        recorded = _trailing_sums(recorded, window)[first:]
+        rates = np.divide(matches, recorded, out=np.zeros(len(matches)), where=recorded > 0)
+        return self.dates(start, end), rates, matches
+
+    def window_counts(self, status, window, rows=None):
+        """Days with ``status`` among each employee's last ``window`` days."""
+        return (self.cells(rows, start=self.end - timedelta(days=window - 1)) == STATUS_CODES[status]).sum(axis=1)
+
+    def streaks(self, status, rows=None, start=None, end=None):
+        """
+        Longest run of consecutive days with ``status`` for each row, and the run still
+        going on the last day, as two arrays.
+        """
+        hits = self.cells(rows, start, end) == STATUS_CODES[status]
+        longest = np.zeros(hits.shape[0], dtype=np.int64)
+        current = np.zeros(hits.shape[0], dtype=np.int64)
+        if hits.shape[1]:
+            # +1 marks where a run starts and -1 where it ends; the zero padding closes runs at the edges.
+            padded = np.pad(hits.astype(np.int8), ((0, 0), (1, 1)))
+            edges = np.diff(padded, axis=1)
+            starts = np.argwhere(edges == 1)
+            ends = np.argwhere(edges == -1)
+            # Both are in row-major order, so the n-th start pairs with the n-th end.
+            np.maximum.at(longest, starts[:, 0], ends[:, 1] - starts[:, 1])
+            # The current run ends at the last miss; argmin finds it without an int64 copy of hits.
+            current = np.where(hits.all(axis=1), hits.shape[1], np.argmin(hits[:, ::-1], axis=1))
+        return longest, current
+
+    def department_totals(self, rows=None, start=None, end=None):
+        """Per department id: the count of each status in STATUS_CODES, as {department_id: {status: n}}."""
+        cells = self.cells(rows, start, end)
+        departments = self.department_ids if rows is None else self.department_ids[rows]
+        labels, index = np.unique(departments, return_inverse=True)
+        totals = {
+            status: np.bincount(index, weights=(cells == code).sum(axis=1), minlength=len(labels))
+            for status, code in STATUS_CODES.items()
+        }
+        return {
+            int(department_id): {status: int(totals[status][position]) for status in STATUS_CODES}
+            for position, department_id in enumerate(labels.tolist())
+        }
+
+
+def _trailing_sums(values, window):
+    totals = np.concatenate([[0], np.cumsum(values)])
+    starts = np.maximum(np.arange(1, len(totals)) - window, 0)
+    return totals[1:] - totals[starts]
+
+
+_matrix = None
+_lock = threading.Lock()
+
+
+def get_matrix():
+    """
+    The process's attendance matrix, refreshed from the change log. Loaded in full on
+    first use and again once the window has moved past its last day.
+    """
+    global _matrix
+    with _lock:
+        if _matrix is None or _matrix.end < timezone.localdate():
+            _matrix = AttendanceMatrix.load()
+        else:
+            _matrix = _matrix.refreshed()
+        return _matrix
+
+
+def forget_matrix():
+    """Drop the process's matrix so the next get_matrix() loads it from scratch."""
+    global _matrix
+    with _lock:
+        _matrix = None
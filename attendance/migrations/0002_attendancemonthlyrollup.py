@@ -0,0 +1,58 @@
+# Generated by Django 4.2.21 on 2026-10-18 17:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollup(apps, schema_editor):
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceMonthlyRollup = apps.get_model('attendance', 'AttendanceMonthlyRollup')
+    rows = (
+        Attendance.objects
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'employee_id', 'employee__department_id', 'status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    AttendanceMonthlyRollup.objects.bulk_create(
+        (
+            AttendanceMonthlyRollup(
+                month=row['month'],
+                department_id=row['employee__department_id'],
+                employee_id=row['employee_id'],
+                status=row['status'],
+                count=row['count'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_alter_employee_phone_number'),
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month being summarized')),
+                ('status', models.CharField(choices=[('P', 'Present'), ('A', 'Absent'), ('L', 'Late')], help_text='Attendance status being counted', max_length=1)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of attendance records with this status in the month')),
+                ('department', models.ForeignKey(help_text='Department of the employee when the rollup was computed', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.department')),
+                ('employee', models.ForeignKey(help_text='Employee whose attendance is counted', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', 'month'], name='attendance_rollup_dept_month')],
+                'unique_together': {('month', 'department', 'employee', 'status')},
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
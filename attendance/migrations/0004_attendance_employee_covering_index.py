@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# ?employee__id= lists walk (date, id) for one employee and read only status from the row;
+# rollup refreshes count statuses per employee and month. INCLUDE lets both run as
+# index-only scans. Covering indexes are PostgreSQL-only; elsewhere the unique
+# (employee, date) index serves these queries.
+INDEX_NAME = 'attendance_emp_date_cover_idx'
+
+
+def create_covering_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        f'ON attendance_attendance (employee_id, date, id) INCLUDE (status)'
+    )
+
+
+def drop_covering_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('attendance', '0003_attendance_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_covering_index, drop_covering_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:22
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendance_employee_covering_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_id', models.BigIntegerField(help_text='Employee whose attendance or department changed (not a foreign key: deletions are logged too)')),
+                ('date', models.DateField(blank=True, help_text='Attendance date that changed, or empty for a change to the employee', null=True)),
+                ('changed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='When the change was logged; old entries are pruned')),
+            ],
+        ),
+    ]
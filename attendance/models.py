@@ -1,8 +1,32 @@
 """
-Model defining attendance records for employees. Enforces one record per employee per date.
+Models defining attendance records for employees, their monthly rollup and change log.
+Enforces one record per employee per date.
 """
-from django.db import models
-from employees.models import Employee
+from django.db import models, router, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from employees.models import Department, Employee
+
+# Sent after rows are written with bulk_create, which bypasses post_save, and after any
+# delete. Receivers get ``keys``: a list of (employee_id, date) pairs that were written or
+# deleted. Deletes use this signal instead of post_delete: a post_delete receiver would make
+# every Employee or Department cascade load and delete the attendance rows one batch at a time.
+attendance_bulk_written = Signal()
+
+
+class AttendanceQuerySet(models.QuerySet):
+    """Sends attendance_bulk_written for the rows a queryset delete() removes."""
+
+    def delete(self):
+        with transaction.atomic(using=self.db, savepoint=False):
+            keys = list(self.order_by().values_list('employee_id', 'date'))
+            result = super().delete()
+            if keys:
+                attendance_bulk_written.send(sender=self.model, keys=keys, using=self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Attendance(models.Model):
@@ -28,9 +52,101 @@ class Attendance(models.Model):
         help_text="Attendance status: Present, Absent, or Late"
     )
 
+    objects = AttendanceQuerySet.as_manager()
+
     class Meta:
         unique_together = ('employee', 'date')
         verbose_name_plural = 'Attendance records'
+        # Keyset pagination walks (date, id); the unique (employee, date) index already
+        # serves employee__id filters in date order.
+        indexes = [
+            models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+            models.Index(fields=['status', 'date', 'id'], name='attendance_status_date_id_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded (employee, date) so rollup refreshes can cover the old bucket.
+        instance._loaded_key = (instance.__dict__.get('employee_id'), instance.__dict__.get('date'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_key = (self.employee_id, self.date)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        key = (self.employee_id, self.date)
+        with transaction.atomic(using=using, savepoint=False):
+            result = super().delete(*args, **kwargs)
+            attendance_bulk_written.send(sender=type(self), keys=[key], using=using)
+        return result
+
+    def __str__(self) -> str:
+        return f"{self.employee.name} - {self.get_status_display()} on {self.date}"
+
+
+class AttendanceMonthlyRollup(models.Model):
+    """
+    Precomputed attendance counts per month, department, employee and status.
+    Derived from Attendance; see attendance.rollup for how it is maintained.
+    """
+    month = models.DateField(
+        help_text="First day of the month being summarized"
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Department of the employee when the rollup was computed"
+    )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Employee whose attendance is counted"
+    )
+    status = models.CharField(
+        max_length=1,
+        choices=Attendance.STATUS_CHOICES,
+        help_text="Attendance status being counted"
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of attendance records with this status in the month"
+    )
+
+    class Meta:
+        unique_together = ('month', 'department', 'employee', 'status')
+        indexes = [
+            models.Index(fields=['department', 'month'], name='attendance_rollup_dept_month'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.month:%b %Y} {self.employee_id} {self.status}: {self.count}"
+
+
+class AttendanceChange(models.Model):
+    """
+    Append-only log of the (employee, date) cells written since a point in time, read by
+    attendance.matrix to refresh its in-memory matrix incrementally. A row with no date
+    records a change to the employee itself: created, moved or deleted.
+    """
+    employee_id = models.BigIntegerField(
+        help_text="Employee whose attendance or department changed (not a foreign key: "
+                  "deletions are logged too)"
+    )
+    date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Attendance date that changed, or empty for a change to the employee"
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        help_text="When the change was logged; old entries are pruned"
+    )
 
     def __str__(self) -> str:
-        return f"{self.employee.name} - {self.get_status_display()} on {self.date}"
\ No newline at end of file
+        return f"{self.employee_id} {self.date or 'employee'} at {self.changed_at}"
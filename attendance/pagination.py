@@ -0,0 +1,129 @@
+"""
+Keyset pagination for Attendance records.
+"""
+from base64 import b64decode, b64encode
+from datetime import date
+
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class DateIdKeysetPagination(pagination.BasePagination):
+    """
+    Pages through records newest first on the composite key (date, id).
+
+    The cursor carries the (date, id) of the boundary row, so every page is a single range
+    scan on the (date, id) index and page 1000 costs the same as page 1.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the requested page's query, ordered for the scan and sliced one row past
+        the page size. Async callers fetch it themselves and hand the rows to set_page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            queryset = queryset.order_by('-date', '-id')
+        else:
+            reverse, day, pk = self.cursor
+            if reverse:
+                # Rows newer than the boundary, fetched oldest first and flipped in set_page.
+                queryset = queryset.filter(Q(date__gte=day), Q(date__gt=day) | Q(id__gt=pk))
+                queryset = queryset.order_by('date', 'id')
+            else:
+                queryset = queryset.filter(Q(date__lte=day), Q(date__lt=day) | Q(id__lt=pk))
+                queryset = queryset.order_by('-date', '-id')
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.cursor is None:
+            self.has_next, self.has_previous = more, False
+        elif self.cursor[0]:
+            self.has_next, self.has_previous = True, more
+            rows = rows[::-1]
+        else:
+            self.has_next, self.has_previous = more, True
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            direction, day, pk = b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            return direction == 'r', date.fromisoformat(day), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        day, pk = (row['date'], row['id']) if isinstance(row, dict) else (row.date, row.id)
+        token = b64encode(f"{'r' if reverse else 'f'}|{day.isoformat()}|{pk}".encode('ascii')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param, 'required': False, 'in': 'query',
+                'description': 'The pagination cursor value.', 'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param, 'required': False, 'in': 'query',
+                'description': f'Number of results per page (max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,116 @@
+"""
+Maintenance of the AttendanceMonthlyRollup table.
+Rollup rows are recomputed per (employee, month) bucket from Attendance, so an update only
+touches the buckets it affects and the table never drifts from the source rows.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.db.models.functions import TruncMonth
+from django.utils.dateparse import parse_date
+
+from .models import Attendance, AttendanceMonthlyRollup
+
+ROLLUP_BATCH_SIZE = 1000
+
+
+def month_start(day):
+    """Return the first day of the month containing ``day`` (a date or ISO string)."""
+    if isinstance(day, str):
+        day = parse_date(day)
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _rollup_rows(rows):
+    return [
+        AttendanceMonthlyRollup(
+            month=row['month'],
+            department_id=row['employee__department_id'],
+            employee_id=row['employee_id'],
+            status=row['status'],
+            count=row['count'],
+        )
+        for row in rows
+    ]
+
+
+def _upsert(rows):
+    # Upserting instead of inserting lets two transactions refresh the same bucket at once:
+    # under READ COMMITTED both may see it empty, and a plain insert would then fail.
+    return AttendanceMonthlyRollup.objects.bulk_create(
+        _rollup_rows(rows),
+        update_conflicts=True,
+        unique_fields=['month', 'department', 'employee', 'status'],
+        update_fields=['count'],
+    )
+
+
+def refresh_rollup(keys):
+    """Recompute the rollup for an iterable of ``(employee_id, day)`` pairs."""
+    employees_by_month = defaultdict(set)
+    for employee_id, day in keys:
+        if employee_id is not None and day is not None:
+            employees_by_month[month_start(day)].add(employee_id)
+
+    with transaction.atomic():
+        for month, employee_ids in employees_by_month.items():
+            rows = [
+                {**row, 'month': month}
+                for row in Attendance.objects
+                .filter(employee_id__in=employee_ids, date__gte=month, date__lt=next_month(month))
+                .values('employee_id', 'employee__department_id', 'status')
+                .annotate(count=Count('id'))
+                .order_by()
+            ]
+            # Drop rows for statuses (or departments) the bucket no longer has, in one statement.
+            AttendanceMonthlyRollup.objects.filter(month=month, employee_id__in=employee_ids).exclude(
+                Exists(Attendance.objects.filter(
+                    employee_id=OuterRef('employee_id'),
+                    employee__department_id=OuterRef('department_id'),
+                    status=OuterRef('status'),
+                    date__gte=month,
+                    date__lt=next_month(month),
+                ))
+            ).delete()
+            if rows:
+                _upsert(rows)
+
+
+def refresh_employee_rollup(employee_ids):
+    """Recompute every month for the given employees, e.g. after a department change."""
+    with transaction.atomic():
+        AttendanceMonthlyRollup.objects.filter(employee_id__in=employee_ids).delete()
+        _insert_grouped(Attendance.objects.filter(employee_id__in=employee_ids))
+
+
+def rebuild_rollup():
+    """Rebuild the whole rollup table from Attendance. Returns the number of rollup rows."""
+    with transaction.atomic():
+        AttendanceMonthlyRollup.objects.all().delete()
+        return _insert_grouped(Attendance.objects.all())
+
+
+def _insert_grouped(queryset):
+    rows = (
+        queryset
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'employee_id', 'employee__department_id', 'status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= ROLLUP_BATCH_SIZE:
+            written += len(_upsert(batch))
+            batch = []
+    if batch:
+        written += len(_upsert(batch))
+    return written
@@ -5,16 +5,57 @@ from rest_framework import serializers
 from .models import Attendance
 
 
+ATTENDANCE_VALUES = (
+    'id', 'employee_id', 'employee__name', 'employee__department__name', 'date', 'status',
+)
+
+
 class AttendanceSerializer(serializers.ModelSerializer):
-    """Serializer for Attendance entries."""
+    """
+    Serializer for Attendance entries.
+    The employee is rendered as structured fields. The legacy "Name (Department)" string is
+    only included when the context sets ``legacy_employee``.
+    """
     employee_id = serializers.PrimaryKeyRelatedField(
-        queryset=__import__('employees').models.Employee.objects.all(),
+        queryset=__import__('employees').models.Employee.objects.select_related('department'),
         source='employee',
-        write_only=True,
         help_text="ID of the employee"
     )
+    employee_name = serializers.CharField(source='employee.name', read_only=True)
+    department_name = serializers.CharField(source='employee.department.name', read_only=True)
     employee = serializers.StringRelatedField(read_only=True)
 
     class Meta:
         model = Attendance
-        fields = ['id', 'employee', 'employee_id', 'date', 'status']
+        fields = ['id', 'employee', 'employee_id', 'employee_name', 'department_name', 'date', 'status']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('legacy_employee'):
+            fields.pop('employee')
+        return fields
+
+
+def attendance_row(row, legacy_employee=False):
+    """Representation of an Attendance from an ATTENDANCE_VALUES row, as AttendanceSerializer renders it."""
+    data = {
+        'id': row['id'],
+        'employee_id': row['employee_id'],
+        'employee_name': row['employee__name'],
+        'department_name': row['employee__department__name'],
+        'date': row['date'].isoformat(),
+        'status': row['status'],
+    }
+    if legacy_employee:
+        data['employee'] = f"{row['employee__name']} ({row['employee__department__name']})"
+    return data
+
+
+class AttendanceRowSerializer(serializers.Serializer):
+    """
+    Validates a single row of a bulk attendance payload.
+    The employee is kept as a raw id so a whole batch can be resolved in one query.
+    """
+    employee_id = serializers.IntegerField(min_value=1, help_text="ID of the employee")
+    date = serializers.DateField(help_text="Date of the attendance entry")
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES, help_text="P, A or L")
@@ -0,0 +1,66 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employees.models import Employee, employees_bulk_written
+from .models import Attendance, AttendanceChange, attendance_bulk_written
+from .rollup import refresh_employee_rollup, refresh_rollup
+
+
+def log_changes(keys):
+    """
+    Record ``(employee_id, date)`` pairs in the change log read by attendance.matrix; a
+    date of None marks a change to the employee itself.
+    """
+    AttendanceChange.objects.bulk_create([
+        AttendanceChange(employee_id=employee_id, date=day) for employee_id, day in keys
+    ])
+
+
+@receiver(post_save, sender=Attendance)
+def refresh_rollup_on_save(sender, instance, **kwargs):
+    keys = {(instance.employee_id, instance.date)}
+    loaded_key = getattr(instance, '_loaded_key', None)
+    if loaded_key:
+        keys.add(loaded_key)
+    refresh_rollup(keys)
+    log_changes(keys)
+
+
+@receiver(attendance_bulk_written)
+def refresh_rollup_on_bulk_write(sender, keys, **kwargs):
+    refresh_rollup(keys)
+    log_changes(keys)
+
+
+@receiver(post_save, sender=Employee)
+def refresh_rollup_on_department_change(sender, instance, created=False, **kwargs):
+    loaded_department_id = getattr(instance, '_loaded_department_id', None)
+    if not created and loaded_department_id not in (None, instance.department_id):
+        refresh_employee_rollup([instance.pk])
+
+
+@receiver(employees_bulk_written)
+def refresh_rollup_on_bulk_department_change(sender, employee_ids, department_changed, **kwargs):
+    if department_changed and employee_ids:
+        refresh_employee_rollup(employee_ids)
+
+
+@receiver(post_save, sender=Employee)
+def log_employee_change(sender, instance, created=False, **kwargs):
+    loaded_department_id = getattr(instance, '_loaded_department_id', None)
+    if created or loaded_department_id not in (None, instance.department_id):
+        log_changes([(instance.pk, None)])
+
+
+@receiver(post_delete, sender=Employee)
+def log_employee_delete(sender, instance, origin=None, **kwargs):
+    # EmployeeQuerySet.delete() logs its rows at once through employees_bulk_written.
+    if isinstance(origin, QuerySet) and origin.model is Employee:
+        return
+    log_changes([(instance.pk, None)])
+
+
+@receiver(employees_bulk_written)
+def log_bulk_employee_change(sender, employee_ids, **kwargs):
+    log_changes((employee_id, None) for employee_id in employee_ids)
@@ -1,10 +1,22 @@
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.request import Request
 from rest_framework import status
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
-from employees.models import Department, Employee
-from attendance.models import Attendance
-from datetime import date
+from employees.models import Department, Employee, Performance
+from attendance.models import Attendance, AttendanceChange, AttendanceMonthlyRollup
+from attendance.bulk import upsert_attendance
+from attendance.rollup import refresh_rollup
+from attendance.matrix import CHANGE_RETENTION, STATUS_CODES, AttendanceMatrix, forget_matrix, get_matrix
+from attendance.pagination import DateIdKeysetPagination
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import date, timedelta
+import json
+from io import StringIO
+from django.core.management import call_command
 
 
 class AttendanceAPITests(APITestCase):
@@ -31,3 +43,456 @@ class AttendanceAPITests(APITestCase):
         Attendance.objects.create(employee=self.employee, date=date.today(), status='P')
         response = self.client.get('/api/attendance/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AttendanceBulkAPITests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.department = Department.objects.create(name='Support')
+        self.employees = [
+            Employee.objects.create(
+                name=f'Worker {i}', email=f'worker{i}@example.com', phone_number='9876543210',
+                address='Main St', date_of_joining='2022-09-01', department=self.department
+            )
+            for i in range(3)
+        ]
+
+    def test_bulk_upsert_creates_and_updates(self):
+        Attendance.objects.create(employee=self.employees[0], date='2025-01-01', status='A')
+        rows = [
+            {'employee_id': employee.id, 'date': '2025-01-01', 'status': 'P'}
+            for employee in self.employees
+        ]
+        response = self.client.post('/api/attendance/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'written': 3, 'errors': []})
+        self.assertEqual(Attendance.objects.count(), 3)
+        self.assertEqual(Attendance.objects.get(employee=self.employees[0]).status, 'P')
+
+    def test_bulk_reports_row_errors_without_failing_batch(self):
+        rows = [
+            {'employee_id': self.employees[0].id, 'date': '2025-01-02', 'status': 'L'},
+            {'employee_id': 999999, 'date': '2025-01-02', 'status': 'P'},
+            {'employee_id': self.employees[1].id, 'date': 'not-a-date', 'status': 'X'},
+        ]
+        response = self.client.post('/api/attendance/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['written'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('employee_id', response.data['errors'][0]['errors'])
+        self.assertEqual(set(response.data['errors'][1]['errors']), {'date', 'status'})
+
+    def test_bulk_resolves_employees_in_one_query(self):
+        rows = [
+            {'employee_id': employee.id, 'date': f'2025-02-{day:02d}', 'status': 'P'}
+            for employee in self.employees for day in range(1, 11)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            written, errors = upsert_attendance(rows)
+        self.assertEqual((written, errors), (30, []))
+        employee_lookups = [q for q in queries if 'FROM "employees_employee"' in q['sql']]
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "attendance_attendance"')]
+        self.assertEqual(len(employee_lookups), 1)
+        self.assertEqual(len(inserts), 1)
+
+
+class AttendanceRollupTests(APITestCase):
+    def setUp(self):
+        self.support = Department.objects.create(name='Support')
+        self.sales = Department.objects.create(name='Sales')
+        self.employee = Employee.objects.create(
+            name='Mike', email='mike@example.com', phone_number='9876543210',
+            address='Main St', date_of_joining='2022-09-01', department=self.support
+        )
+
+    def rollup(self):
+        return {
+            (row.month.isoformat(), row.department_id, row.status): row.count
+            for row in AttendanceMonthlyRollup.objects.filter(employee=self.employee)
+        }
+
+    def test_rollup_follows_saves_and_deletes(self):
+        Attendance.objects.create(employee=self.employee, date='2025-01-01', status='P')
+        record = Attendance.objects.create(employee=self.employee, date='2025-01-02', status='P')
+        self.assertEqual(self.rollup(), {('2025-01-01', self.support.id, 'P'): 2})
+
+        record = Attendance.objects.get(pk=record.pk)
+        record.status = 'L'
+        record.date = date(2025, 2, 3)
+        record.save()
+        self.assertEqual(self.rollup(), {
+            ('2025-01-01', self.support.id, 'P'): 1,
+            ('2025-02-01', self.support.id, 'L'): 1,
+        })
+
+        record.delete()
+        self.assertEqual(self.rollup(), {('2025-01-01', self.support.id, 'P'): 1})
+
+    def test_rollup_follows_queryset_deletes(self):
+        Attendance.objects.create(employee=self.employee, date='2025-01-01', status='P')
+        Attendance.objects.create(employee=self.employee, date='2025-01-02', status='A')
+        Attendance.objects.filter(status='A').delete()
+        self.assertEqual(self.rollup(), {('2025-01-01', self.support.id, 'P'): 1})
+
+    def test_employee_cascade_deletes_do_not_load_rows(self):
+        def delete_employee(days):
+            employee = Employee.objects.create(
+                name='Temp', email=f'temp{days}@example.com', phone_number='1',
+                address='A', date_of_joining='2020-01-01', department=self.support
+            )
+            Attendance.objects.bulk_create([
+                Attendance(employee=employee, date=date(2020, 1, 1) + timedelta(days=day), status='P')
+                for day in range(days)
+            ])
+            Performance.objects.bulk_create([
+                Performance(employee=employee, rating=3, review_date=date(2020, 1, 1) + timedelta(days=day))
+                for day in range(days)
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                employee.delete()
+            self.assertFalse(Attendance.objects.filter(employee_id=employee.pk).exists())
+            return len(queries)
+
+        self.assertEqual(delete_employee(3000), delete_employee(3))
+
+    def test_rollup_follows_bulk_writes_and_department_changes(self):
+        upsert_attendance([
+            {'employee_id': self.employee.id, 'date': '2025-03-01', 'status': 'A'},
+            {'employee_id': self.employee.id, 'date': '2025-03-02', 'status': 'A'},
+        ])
+        self.assertEqual(self.rollup(), {('2025-03-01', self.support.id, 'A'): 2})
+
+        employee = Employee.objects.get(pk=self.employee.pk)
+        employee.department = self.sales
+        employee.save()
+        self.assertEqual(self.rollup(), {('2025-03-01', self.sales.id, 'A'): 2})
+
+    def test_refresh_updates_existing_rows_in_place(self):
+        # Refreshes upsert, so a row another transaction wrote meanwhile is updated, not re-inserted.
+        Attendance.objects.create(employee=self.employee, date='2025-01-01', status='P')
+        row = AttendanceMonthlyRollup.objects.get(employee=self.employee)
+        Attendance.objects.create(employee=self.employee, date='2025-01-02', status='P')
+        Attendance.objects.create(employee=self.employee, date='2025-01-03', status='A')
+        refresh_rollup([(self.employee.id, date(2025, 1, 1))])
+        self.assertEqual(AttendanceMonthlyRollup.objects.get(pk=row.pk).count, 2)
+        self.assertEqual(self.rollup(), {
+            ('2025-01-01', self.support.id, 'P'): 2,
+            ('2025-01-01', self.support.id, 'A'): 1,
+        })
+
+    def test_rebuild_command_matches_incremental_rollup(self):
+        Attendance.objects.create(employee=self.employee, date='2025-01-01', status='P')
+        Attendance.objects.create(employee=self.employee, date='2025-01-02', status='A')
+        expected = self.rollup()
+        AttendanceMonthlyRollup.objects.all().delete()
+        call_command('rebuild_attendance_rollup', stdout=StringIO())
+        self.assertEqual(self.rollup(), expected)
+
+
+class AttendanceExportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(self.admin)
+        department = Department.objects.create(name='Support')
+        self.employee = Employee.objects.create(
+            name='Mike, Jr.', email='mike@example.com', phone_number='9876543210',
+            address='Main St', date_of_joining='2022-09-01', department=department
+        )
+        Attendance.objects.create(employee=self.employee, date='2025-01-01', status='P')
+        Attendance.objects.create(employee=self.employee, date='2025-01-02', status='A')
+
+    def test_csv_export_streams_filtered_rows(self):
+        response = self.client.get('/api/attendance/export/csv/?status=A')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'id,employee_id,employee_name,date,status',
+            f'{Attendance.objects.get(status="A").id},{self.employee.id},"Mike, Jr.",2025-01-02,A',
+        ])
+
+    def test_ndjson_export(self):
+        response = self.client.get('/api/attendance/export/ndjson/')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['date'] for line in lines], ['2025-01-01', '2025-01-02'])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+
+class AttendancePaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(self.admin)
+        department = Department.objects.create(name='Support')
+        employees = [
+            Employee.objects.create(
+                name=f'Worker {i}', email=f'worker{i}@example.com', phone_number='9876543210',
+                address='Main St', date_of_joining='2022-09-01', department=department
+            )
+            for i in range(3)
+        ]
+        for day in range(1, 8):
+            for employee in employees:
+                Attendance.objects.create(employee=employee, date=date(2025, 1, day), status='P')
+        self.expected = list(Attendance.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+    def ids(self, response):
+        return [row['id'] for row in response.data['results']]
+
+    def test_walks_all_pages_forward_and_back(self):
+        seen, pages = [], []
+        url = '/api/attendance/?page_size=4'
+        while url:
+            response = self.client.get(url)
+            pages.append(response)
+            seen.extend(self.ids(response))
+            url = response.data['next']
+        self.assertEqual(seen, self.expected)
+        self.assertIsNone(pages[0].data['previous'])
+
+        response = self.client.get(pages[-1].data['previous'])
+        self.assertEqual(self.ids(response), self.ids(pages[-2]))
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/attendance/?page_size=100000')
+        self.assertEqual(len(response.data['results']), len(self.expected))
+        self.assertIsNone(response.data['next'])
+        request = APIRequestFactory().get('/api/attendance/?page_size=100000')
+        self.assertEqual(DateIdKeysetPagination().get_page_size(Request(request)), 500)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/attendance/?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class AttendanceQueryBudgetTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        department = Department.objects.create(name='Support')
+        self.employees = [
+            Employee.objects.create(
+                name=f'Person {number}', email=f'person{number}@example.com', phone_number='1',
+                address='Street', date_of_joining='2023-01-01', department=department
+            )
+            for number in range(10)
+        ]
+        Attendance.objects.bulk_create(
+            Attendance(employee=employee, date=date(2025, 1, day), status='P')
+            for employee in self.employees for day in range(1, 7)
+        )
+        self.record = Attendance.objects.first()
+
+    def test_reads_and_writes_stay_within_budget(self):
+        requests = [
+            ('get', '/api/attendance/', None),
+            ('get', f'/api/attendance/{self.record.id}/', None),
+            ('post', '/api/attendance/', {'employee_id': self.employees[0].id, 'date': '2025-02-01', 'status': 'P'}),
+            ('patch', f'/api/attendance/{self.record.id}/', {'status': 'L'}),
+            ('post', '/api/attendance/bulk/', [
+                {'employee_id': employee.id, 'date': '2025-02-02', 'status': 'A'} for employee in self.employees
+            ]),
+            ('delete', f'/api/attendance/{self.record.id}/', None),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                response = getattr(self.client, method)(url, data, format='json')
+                self.assertLess(response.status_code, 400)
+
+    def test_list_reports_no_duplicate_queries(self):
+        response = self.client.get('/api/attendance/')
+        self.assertEqual(len(response.data['results']), 50)
+        self.assertNotIn('dbdup', response['Server-Timing'])
+
+
+class AttendanceRepresentationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        departments = [Department.objects.create(name=f'Dept {number}') for number in range(4)]
+        self.employees = [
+            Employee.objects.create(
+                name=f'Person {number}', email=f'person{number}@example.com', phone_number='1',
+                address='Street', date_of_joining='2023-01-01', department=departments[number % 4]
+            )
+            for number in range(20)
+        ]
+        Attendance.objects.bulk_create(
+            Attendance(employee=employee, date=date(2025, 3, day), status='P')
+            for employee in self.employees for day in range(1, 11)
+        )
+
+    def list_queries(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/attendance/' + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_list_renders_structured_employee_fields(self):
+        response, _ = self.list_queries('?page_size=1')
+        record = Attendance.objects.select_related('employee__department').order_by('-date', '-id').first()
+        self.assertEqual(response.data['results'], [{
+            'id': record.id,
+            'employee_id': record.employee_id,
+            'employee_name': record.employee.name,
+            'department_name': record.employee.department.name,
+            'date': record.date.isoformat(),
+            'status': record.status,
+        }])
+
+    def test_query_count_is_constant_for_any_page_size(self):
+        self.list_queries('')  # warm the token cache
+        counts = {size: self.list_queries(f'?page_size={size}')[1] for size in (1, 10, 200)}
+        self.assertEqual(len(set(counts.values())), 1, counts)
+        _, legacy = self.list_queries('?page_size=200&employee_format=string')
+        self.assertEqual(legacy, counts[200])
+
+    def test_legacy_employee_string_behind_flag(self):
+        response, _ = self.list_queries('?page_size=5')
+        self.assertNotIn('employee', response.data['results'][0])
+
+        response, _ = self.list_queries('?page_size=5&employee_format=string')
+        row = response.data['results'][0]
+        self.assertEqual(row['employee'], f"{row['employee_name']} ({row['department_name']})")
+
+        employee = Employee.objects.select_related('department').get(pk=row['employee_id'])
+        retrieved = self.client.get(f"/api/attendance/{row['id']}/?employee_format=string")
+        self.assertEqual(retrieved.data['employee'], str(employee))
+
+    def test_create_returns_structured_fields(self):
+        employee = self.employees[0]
+        response = self.client.post('/api/attendance/', {
+            'employee_id': employee.id, 'date': '2025-04-01', 'status': 'L'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['employee_id'], employee.id)
+        self.assertEqual(response.data['employee_name'], employee.name)
+        self.assertEqual(response.data['department_name'], employee.department.name)
+        self.assertNotIn('employee', response.data)
+
+
+class AttendanceMatrixTests(APITestCase):
+    def setUp(self):
+        forget_matrix()
+        self.addCleanup(forget_matrix)
+        self.support = Department.objects.create(name='Support')
+        self.sales = Department.objects.create(name='Sales')
+        self.mike = Employee.objects.create(
+            name='Mike', email='mike@example.com', phone_number='9876543210',
+            address='Main St', date_of_joining='2022-09-01', department=self.support
+        )
+        self.anna = Employee.objects.create(
+            name='Anna', email='anna@example.com', phone_number='9876543211',
+            address='Main St', date_of_joining='2022-09-01', department=self.sales
+        )
+        self.today = date.today()
+        # Mike: absent 3 days, present, absent the last 2 days. Anna: absent once, late today.
+        for days_ago, code in enumerate('AAPAAA'):
+            Attendance.objects.create(employee=self.mike, date=self.day(days_ago), status=code)
+        Attendance.objects.create(employee=self.anna, date=self.day(3), status='A')
+        Attendance.objects.create(employee=self.anna, date=self.today, status='L')
+
+    def day(self, days_ago):
+        return self.today - timedelta(days=days_ago)
+
+    def test_streaks_window_counts_and_totals(self):
+        matrix = get_matrix()
+        self.assertEqual(matrix.codes.dtype.name, 'int8')
+        self.assertEqual(matrix.codes[matrix.rows[self.mike.pk], matrix.column(self.today)], 2)
+        rows = matrix.select(employee_ids=[self.mike.pk, self.anna.pk])
+        longest, current = matrix.streaks('A', rows)
+        self.assertEqual((longest.tolist(), current.tolist()), ([3, 1], [2, 0]))
+        # A run covering the whole window, and an empty window.
+        self.assertEqual(matrix.streaks('A', rows, start=self.day(1))[1].tolist(), [2, 0])
+        self.assertEqual(matrix.streaks('A', rows, start=self.day(-1))[1].tolist(), [0, 0])
+        self.assertEqual(matrix.window_counts('A', 4, rows).tolist(), [3, 1])
+        self.assertEqual(matrix.department_totals()[self.support.pk], {'P': 1, 'A': 5, 'L': 0})
+
+        dates, rates, counts = matrix.rolling_rate('A', 2, rows, start=self.day(2))
+        self.assertEqual(dates, [self.day(2), self.day(1), self.today])
+        self.assertEqual(counts.tolist(), [2, 1, 2])
+        self.assertEqual(rates.round(2).tolist(), [0.67, 0.5, 0.67])
+
+    def test_refresh_applies_only_logged_changes(self):
+        before = get_matrix()
+        self.assertIs(get_matrix(), before)
+
+        Attendance.objects.get(employee=self.mike, date=self.today).delete()
+        record = Attendance.objects.get(employee=self.anna, date=self.today)
+        record.status = 'P'
+        record.save()
+        upsert_attendance([{'employee_id': self.anna.id, 'date': self.day(1).isoformat(), 'status': 'A'}])
+        newcomer = Employee.objects.create(
+            name='Zoe', email='zoe@example.com', phone_number='1', address='A',
+            date_of_joining='2024-01-01', department=self.sales
+        )
+        Attendance.objects.create(employee=newcomer, date=self.today, status='L')
+        self.mike.department = self.sales
+        self.mike.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            refreshed = get_matrix()
+        self.assertEqual(len(queries), 3)
+        self.assertIsNot(refreshed, before)
+        self.assertEqual(before.codes[before.rows[self.mike.pk], before.column(self.today)], 2)
+        reloaded = AttendanceMatrix.load()
+        self.assertEqual(refreshed.employee_ids.tolist(), reloaded.employee_ids.tolist())
+        self.assertEqual(refreshed.department_ids.tolist(), reloaded.department_ids.tolist())
+        self.assertTrue((refreshed.codes == reloaded.codes).all())
+
+        self.anna.delete()
+        self.assertNotIn(self.anna.pk, get_matrix().rows)
+
+    def test_refresh_picks_up_seeded_attendance(self):
+        get_matrix()
+        call_command('seed_data', employees=2, days=3, departments=1, seed=1, end_date=self.today, stdout=StringIO())
+        matrix = get_matrix()
+        seeded = Employee.objects.exclude(pk__in=[self.mike.pk, self.anna.pk]).order_by('pk')
+        for employee in seeded:
+            statuses = dict(Attendance.objects.filter(employee=employee).values_list('date', 'status'))
+            row = matrix.codes[matrix.rows[employee.pk]]
+            self.assertEqual({day: row[matrix.column(day)] for day in statuses},
+                             {day: STATUS_CODES[code] for day, code in statuses.items()})
+
+    def test_old_changes_are_pruned_by_the_command_not_by_loads(self):
+        old = AttendanceChange.objects.create(
+            employee_id=self.mike.pk, changed_at=timezone.now() - CHANGE_RETENTION - timedelta(hours=1)
+        )
+        AttendanceMatrix.load()
+        self.assertTrue(AttendanceChange.objects.filter(pk=old.pk).exists())
+
+        out = StringIO()
+        call_command('prune_attendance_changes', stdout=out)
+        self.assertFalse(AttendanceChange.objects.filter(pk=old.pk).exists())
+        self.assertIn('Pruned 1 attendance change rows.', out.getvalue())
+        self.assertTrue(AttendanceChange.objects.exists())
+
+    def test_chart_endpoints(self):
+        response = self.client.get('/api/charts/attendance-streaks/', {'status': 'A', 'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{
+            'employee_id': self.mike.pk, 'name': 'Mike', 'department': 'Support', 'longest': 3, 'current': 2,
+        }])
+
+        response = self.client.get('/api/charts/attendance-rolling/', {
+            'status': 'L', 'window': 2, 'department_id': self.sales.pk, 'from': self.day(1).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'labels': [self.day(1).isoformat(), self.today.isoformat()], 'rate': [0.0, 1.0], 'count': [0, 1],
+        })
+
+        for params in ({'status': 'X'}, {'window': '0'}, {'window': '²'}, {'department_id': 'x'},
+                       {'department_id': '²'}, {'from': 'soon'}):
+            response = self.client.get('/api/charts/attendance-rolling/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_report_command(self):
+        out = StringIO()
+        call_command('attendance_report', days=4, min_days=2, stdout=out)
+        self.assertIn('Mike (id %s): 3 of the last 4 days, longest streak 3, current 2' % self.mike.pk,
+                      out.getvalue())
+        self.assertNotIn('Anna', out.getvalue())
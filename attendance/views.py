@@ -1,15 +1,81 @@
 """
 ViewSet for Attendance records.
 """
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from employees.exports import ExportMixin
+from employees.views import ValuesReadMixin
+from .bulk import upsert_attendance
 from .models import Attendance
-from .serializers import AttendanceSerializer
+from .pagination import DateIdKeysetPagination
+from .serializers import AttendanceSerializer, AttendanceRowSerializer, ATTENDANCE_VALUES, attendance_row
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+employee_format_param = openapi.Parameter(
+    'employee_format',
+    openapi.IN_QUERY,
+    description="Pass 'string' to also include the legacy 'employee' field (\"Name (Department)\")",
+    type=openapi.TYPE_STRING,
+    enum=['string']
+)
+
 
 @swagger_auto_schema(tags=['Departments'])
-class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.select_related('employee').all()
+class AttendanceViewSet(ExportMixin, ValuesReadMixin, viewsets.ModelViewSet):
+    queryset = Attendance.objects.select_related('employee__department').all()
     serializer_class = AttendanceSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['employee__id', 'date', 'status']
+    read_values = ATTENDANCE_VALUES
+    pagination_class = DateIdKeysetPagination
+    # Writes also refresh the monthly rollup for the touched employee-months.
+    query_budget = {'list': 2, 'retrieve': 2, 'default': 11}
+    export_filename = 'attendance'
+    export_columns = [
+        ('id', 'id'), ('employee_id', 'employee_id'), ('employee_name', 'employee__name'),
+        ('date', 'date'), ('status', 'status'),
+    ]
+
+    def legacy_employee(self):
+        return self.request is not None and self.request.query_params.get('employee_format') == 'string'
+
+    def read_row(self, row):
+        return attendance_row(row, legacy_employee=self.legacy_employee())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['legacy_employee'] = self.legacy_employee()
+        return context
+
+    @swagger_auto_schema(manual_parameters=[employee_format_param])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(manual_parameters=[employee_format_param])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        # A JSON list posted to the collection is treated as a bulk upsert.
+        if isinstance(request.data, list):
+            return self.bulk(request)
+        return super().create(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        method='post',
+        operation_description=(
+            "Upserts many attendance rows in one request. Rows are matched on "
+            "(employee_id, date); invalid rows are reported by index without failing the batch."
+        ),
+        request_body=AttendanceRowSerializer(many=True),
+        tags=['Attendance'],
+        responses={200: openapi.Response('JSON with written count and per-row errors')}
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        written, errors = upsert_attendance(request.data)
+        response_status = status.HTTP_400_BAD_REQUEST if errors and not written else status.HTTP_200_OK
+        return Response({'written': written, 'errors': errors}, status=response_status)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'employee_project.settings')
+# Turns off persistent and pooled database connections (see DB_POOL in settings).
+os.environ['SERVER_INTERFACE'] = 'asgi'
 
 application = get_asgi_application()
@@ -0,0 +1,4 @@
+"""
+Database backends that take their connections from employee_project.db_pool. Settings
+switch ENGINE to these when DB_POOL is on.
+"""
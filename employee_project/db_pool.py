@@ -0,0 +1,276 @@
+"""
+In-process database connection pool, one per worker process and database alias.
+
+Without a pool, Django keeps one connection per thread for CONN_MAX_AGE seconds, checked
+with a ping at the start of each request when CONN_HEALTH_CHECKS is on. With DB_POOL on,
+the databases use the backends in employee_project.db_backends instead. Those take
+connections from a ConnectionPool and give them back when Django closes them, at the end
+of each request. Like CONN_MAX_AGE, the pool is only used under WSGI; settings turn both
+off for the ASGI entry point.
+
+A pool keeps up to SIZE idle connections. When all of them are in use, it opens up to
+MAX_OVERFLOW more, which are closed when given back. Beyond that, a checkout waits up to
+TIMEOUT seconds for a connection and then raises PoolTimeout. Connections older than
+MAX_LIFETIME are replaced. A connection held longer than LEAK_SECONDS is counted and
+logged once as a leak. pool_stats() reports the counters for the current process.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+logger = logging.getLogger(__name__)
+
+POOL_DEFAULTS = {
+    'SIZE': 5,
+    'MAX_OVERFLOW': 5,
+    'TIMEOUT': 10,
+    'MAX_LIFETIME': 1800,
+    'LEAK_SECONDS': 60,
+}
+COUNTERS = (
+    'checkouts', 'overflow_checkouts', 'waits', 'timeouts', 'opened', 'closed',
+    'health_check_failures', 'leaks',
+)
+
+
+class PoolTimeout(OperationalError):
+    """No connection became available within the pool's TIMEOUT."""
+
+
+class _Checkout:
+    def __init__(self, created_at):
+        self.created_at = created_at
+        self.checked_out_at = time.monotonic()
+        self.thread = threading.current_thread().name
+        self.leaked = False
+
+
+def _ping(raw_connection):
+    cursor = raw_connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+def _close(raw_connection):
+    try:
+        raw_connection.close()
+    except Exception:
+        logger.debug('Closing a pooled connection failed.', exc_info=True)
+
+
+class ConnectionPool:
+    """
+    Pool of DB-API connections opened by ``connect()``. ``options`` takes the keys of
+    POOL_DEFAULTS. With ``health_checks``, reused connections are pinged before being
+    handed out.
+    """
+
+    def __init__(self, alias, connect, options=None, health_checks=False):
+        options = {**POOL_DEFAULTS, **(options or {})}
+        self.alias = alias
+        self.connect = connect
+        self.size = options['SIZE']
+        self.max_overflow = options['MAX_OVERFLOW']
+        self.timeout = options['TIMEOUT']
+        self.max_lifetime = options['MAX_LIFETIME']
+        self.leak_seconds = options['LEAK_SECONDS']
+        self.health_checks = health_checks
+        self._idle = deque()
+        self._in_use = {}
+        self._opening = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _open_count(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def checkout(self):
+        """A connection for the calling thread; give it back with checkin()."""
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._condition:
+                self._find_leaks()
+                while not self._idle and self._open_count() >= self.size + self.max_overflow:
+                    remaining = started + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'No connection to {self.alias!r} became available within {self.timeout}s '
+                            f'({self.size} pooled + {self.max_overflow} overflow in use).'
+                        )
+                    waited = True
+                    self._condition.wait(remaining)
+                if self._idle:
+                    raw_connection, created_at = self._idle.pop()
+                else:
+                    raw_connection, created_at = None, None
+                    self._opening += 1
+
+            if raw_connection is None:
+                try:
+                    raw_connection = self.connect()
+                except BaseException:
+                    with self._condition:
+                        self._opening -= 1
+                        self._condition.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._condition:
+                    self._opening -= 1
+                    self.counters['opened'] += 1
+            elif created_at + self.max_lifetime <= time.monotonic() or not self._healthy(raw_connection):
+                _close(raw_connection)
+                with self._condition:
+                    self.counters['closed'] += 1
+                    self._condition.notify()
+                continue
+
+            with self._condition:
+                self._in_use[id(raw_connection)] = _Checkout(created_at)
+                self.counters['checkouts'] += 1
+                if self._open_count() > self.size:
+                    self.counters['overflow_checkouts'] += 1
+                if waited:
+                    wait = time.monotonic() - started
+                    self.counters['waits'] += 1
+                    self.wait_seconds += wait
+                    self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            return raw_connection
+
+    def _healthy(self, raw_connection):
+        if not self.health_checks:
+            return True
+        try:
+            _ping(raw_connection)
+        except Exception:
+            with self._condition:
+                self.counters['health_check_failures'] += 1
+            return False
+        return True
+
+    def checkin(self, raw_connection, discard=False):
+        """
+        Give back a connection from checkout(). Open transactions are rolled back.
+        Overflow connections and ``discard``-ed or expired ones are closed.
+        """
+        with self._condition:
+            checkout = self._in_use.pop(id(raw_connection), None)
+        if checkout is None:
+            # Not from this pool, e.g. opened before a fork; just close it.
+            _close(raw_connection)
+            return
+        if not discard:
+            try:
+                raw_connection.rollback()
+            except Exception:
+                discard = True
+        expired = checkout.created_at + self.max_lifetime <= time.monotonic()
+        with self._condition:
+            keep = not (discard or expired or self._closed) and len(self._idle) + len(self._in_use) < self.size
+            if keep:
+                self._idle.append((raw_connection, checkout.created_at))
+            else:
+                self.counters['closed'] += 1
+            self._condition.notify()
+        if not keep:
+            _close(raw_connection)
+
+    def _find_leaks(self):
+        now = time.monotonic()
+        for checkout in self._in_use.values():
+            held = now - checkout.checked_out_at
+            if not checkout.leaked and held > self.leak_seconds:
+                checkout.leaked = True
+                self.counters['leaks'] += 1
+                logger.warning(
+                    'A connection to %r has been checked out by thread %s for %.0fs; it may have leaked.',
+                    self.alias, checkout.thread, held,
+                )
+
+    def stats(self):
+        with self._condition:
+            self._find_leaks()
+            return {
+                **self.counters,
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'wait_ms_total': round(self.wait_seconds * 1000, 2),
+                'wait_ms_max': round(self.max_wait_seconds * 1000, 2),
+            }
+
+    def close(self):
+        """Close the idle connections; connections in use close when they are given back."""
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+            self.counters['closed'] += len(idle)
+            self._closed = True
+        for raw_connection, _ in idle:
+            _close(raw_connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = None
+
+
+def get_pool(alias, connect, options=None, health_checks=False):
+    """The current process's pool for ``alias``, created on first use."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Connections opened before a fork belong to the parent process; never reuse them.
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(alias, connect, options, health_checks)
+        return pool
+
+
+def pool_stats():
+    """Pool counters for each database alias in this process, plus the process id."""
+    with _pools_lock:
+        pools = dict(_pools) if _pools_pid == os.getpid() else {}
+    return {'pid': os.getpid(), 'pools': {alias: pool.stats() for alias, pool in pools.items()}}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    DatabaseWrapper mixin that takes connections from the alias's ConnectionPool, sized by
+    the ``POOL`` entry of the database settings, and gives them back on close().
+    """
+
+    def pool(self):
+        return get_pool(
+            self.alias,
+            lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(self.get_connection_params()),
+            self.settings_dict.get('POOL'),
+            self.settings_dict.get('CONN_HEALTH_CHECKS', False),
+        )
+
+    def get_new_connection(self, conn_params):
+        return self.pool().checkout()
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool().checkin(self.connection, discard=self.errors_occurred)
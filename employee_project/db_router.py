@@ -0,0 +1,173 @@
+"""
+Read-replica routing.
+
+Databases listed in DATABASE_REPLICAS hold copies of ``default``, the primary. Writes
+always go to the primary. Reads go to a replica only inside a request that
+ReplicaRoutingMiddleware has marked for it. That means a safe-method request to a viewset
+action listed in ``replica_actions`` (list and retrieve by default), or to a view
+decorated with @use_replica. Everything else, including management commands and job
+workers, reads from the primary.
+
+Read-your-writes: a request that writes keeps its remaining reads on the primary. The
+client's following requests also stay there for REPLICA_STICKY_SECONDS, which is tracked
+in the REPLICA_STICKY_CACHE_ALIAS cache, so that cache must be shared by every worker
+process. Users, groups, tokens and sessions are always read from the primary, so
+credentials issued a moment ago (e.g. by POST /api/token/) are accepted on the next
+request despite replication lag. A replica that refuses connections is skipped for
+REPLICA_RETRY_SECONDS, and with none left, reads fall back to the primary.
+"""
+import hashlib
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_ACTIONS = ('list', 'retrieve')
+# Authentication data: always read from the primary.
+PRIMARY_APPS = ('auth', 'authtoken', 'sessions')
+
+_routing = ContextVar('replica_routing', default=None)
+_unavailable = {}
+
+
+class RoutingState:
+    """Per-request routing: the replica chosen for reads, if any, and whether anything was written."""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+def use_replica(view):
+    """
+    Let safe-method requests to a function view read from a replica.
+    Apply it outermost, above ``@api_view``, like @query_budget.
+    """
+    view.read_replica = True
+    return view
+
+
+def reads_from_replica(view_func, method):
+    if method not in SAFE_METHODS:
+        return False
+    if getattr(view_func, 'read_replica', False):
+        return True
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    return action in getattr(getattr(view_func, 'cls', None), 'replica_actions', REPLICA_ACTIONS)
+
+
+def reading_from_replica():
+    """True while the current request's reads are served by a replica."""
+    state = _routing.get()
+    return state is not None and state.replica is not None and not state.wrote
+
+
+def choose_replica():
+    """A replica that accepts connections, or None to read from the primary."""
+    now = time.monotonic()
+    candidates = [alias for alias in replicas() if _unavailable.get(alias, 0) <= now]
+    random.shuffle(candidates)
+    for alias in candidates:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            _unavailable[alias] = now + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+            logger.warning('Replica %s is unavailable; reading from the primary.', alias, exc_info=True)
+            continue
+        return alias
+    return None
+
+
+def _sticky_key(request):
+    # Requests are not authenticated yet when routing is decided; the credentials identify the client.
+    credentials = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return 'replica:sticky:' + hashlib.md5(credentials.encode()).hexdigest()
+
+
+def _sticky_cache():
+    return caches[getattr(settings, 'REPLICA_STICKY_CACHE_ALIAS', 'default')]
+
+
+@checks.register(checks.Tags.caches)
+def check_sticky_cache(app_configs, **kwargs):
+    if not replicas() or not isinstance(_sticky_cache(), LocMemCache):
+        return []
+    return [checks.Warning(
+        'Read replicas are configured but REPLICA_STICKY_CACHE_ALIAS is a local-memory cache.',
+        hint='Each worker process would keep its own sticky flags, so a client can read its '
+             'own writes from a lagging replica. Point CACHE_URL at a shared cache such as Redis.',
+        id='employee_project.W001',
+    )]
+
+
+def begin_request():
+    """Start routing state for a request; returns the token for end_request()."""
+    return _routing.set(RoutingState())
+
+
+def route_request(request, view_func):
+    """Pick the database for the request's reads, once its view is known."""
+    state = _routing.get()
+    if state is None or not replicas() or not reads_from_replica(view_func, request.method):
+        return
+    key = _sticky_key(request)
+    if key is not None and _sticky_cache().get(key):
+        return
+    state.replica = choose_replica()
+
+
+def end_request(request, token):
+    """Keep the client on the primary for REPLICA_STICKY_SECONDS if the request wrote."""
+    state = _routing.get()
+    _routing.reset(token)
+    if state is not None and state.wrote and replicas():
+        key = _sticky_key(request)
+        if key is not None:
+            _sticky_cache().set(key, True, sticky_seconds())
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry: replica reads for marked requests, every write to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _routing.get()
+        if state is not None and state.replica is not None and not state.wrote:
+            return state.replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        # Returning the alias, not None: Django would otherwise write an object back to
+        # the database it was read from.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication.
+        return db not in replicas()
@@ -0,0 +1,232 @@
+"""
+Non-blocking structured logging, wired up through LOGGING in settings.
+
+QueuedFileHandler is a QueueHandler: the logging call only puts the record on a bounded
+queue. A QueueListener thread then formats queued records with JsonFormatter in batches
+and appends them to a size-rotated file, flushing once per batch. When the queue is full,
+records are dropped rather than blocking the caller, and the next batch notes how many were
+lost.
+
+Pass structured fields with ``extra={'fields': {...}}``. JsonFormatter writes them next to
+the time, level, logger and message.
+
+Every worker process appends to the same files. Each batch is written under an exclusive
+flock on ``<file>.lock``, and the writer reopens the file first if another process has
+rotated it, so concurrent rotation neither loses nor splits lines, and each log keeps to
+``backup_count + 1`` files.
+"""
+import copy
+import json
+import logging
+import os
+import queue
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:  # Unix only; on Windows, processes must not share a log file.
+    fcntl = None
+
+_handlers = weakref.WeakSet()
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, ``fields`` and any traceback."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that writes a list of records and flushes once, and that can share
+    its file with other processes.
+    """
+
+    @contextmanager
+    def _interprocess_lock(self):
+        if fcntl is None:
+            yield
+            return
+        # Opened per batch: a descriptor inherited across fork would share the parent's lock.
+        fd = os.open(self.baseFilename + '.lock', os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = None
+
+    def emit_batch(self, records):
+        lines = []
+        for record in records:
+            if record.levelno < self.level or not self.filter(record):
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        self.acquire()
+        try:
+            with self._interprocess_lock():
+                self._reopen_if_rotated()
+                if self.stream is None:
+                    self.stream = self._open()
+                # Other processes append too, so the file's size decides, not this stream's offset.
+                size = os.fstat(self.stream.fileno()).st_size
+                for line in lines:
+                    length = len(line.encode(self.encoding or 'utf-8'))
+                    # Same rule as shouldRollover(), without formatting the record again.
+                    if self.maxBytes > 0 and size and size + length >= self.maxBytes:
+                        self.doRollover()
+                        if self.stream is None:
+                            self.stream = self._open()
+                        size = 0
+                    self.stream.write(line)
+                    size += length
+                self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that hands ``write`` up to ``batch_size`` records at a time."""
+
+    def __init__(self, queue, write, batch_size):
+        super().__init__(queue)
+        self.write = write
+        self.batch_size = batch_size
+
+    def enqueue_sentinel(self):
+        # Unlike records, the sentinel waits for room: the thread is still draining the queue.
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        while True:
+            batch = [self.dequeue(True)]
+            while batch[-1] is not self._sentinel and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is self._sentinel
+            records = batch[:-1] if stopping else batch
+            if records:
+                self.write(records)
+            if stopping:
+                return
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    Queue records for a background thread that writes them to ``filename`` as JSON lines.
+    The file rotates at ``max_bytes``, keeping ``backup_count`` old files. At most
+    ``queue_size`` records wait in the queue, and up to ``batch_size`` are written per flush.
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5, batch_size=100, queue_size=10000):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        self.target = BatchingRotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+        )
+        self.target.setFormatter(JsonFormatter())
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._reported_drops = 0
+        super().__init__(queue.Queue(queue_size))
+        self.listener = None
+        self.start()
+        _handlers.add(self)
+
+    def start(self):
+        self.listener = BatchingQueueListener(self.queue, self._write, self.batch_size)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the writer thread.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve the message and traceback now: arguments may change once the caller moves on.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, records):
+        dropped = self.dropped
+        if dropped > self._reported_drops:
+            notice = logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f'Log queue was full; dropped {dropped - self._reported_drops} records.',
+                'fields': {'dropped': dropped - self._reported_drops},
+            })
+            self._reported_drops = dropped
+            records = [notice, *records]
+        self.target.emit_batch(records)
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None:
+            # Stopping drains the queue first.
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
+
+
+def _restart_after_fork():
+    # The writer thread does not survive a fork; give each child its own queue and thread.
+    for handler in list(_handlers):
+        if handler.listener is not None:
+            handler.queue = queue.Queue(handler.queue_size)
+            handler.start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
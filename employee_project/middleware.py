@@ -0,0 +1,303 @@
+"""
+Request middleware for the project.
+
+QueryInstrumentationMiddleware records every SQL statement a request runs, reports the
+count, total SQL time and duplicated statement shapes in a ``Server-Timing`` header and a
+structured log line, and checks them against the view's query budget.
+
+CompressionMiddleware is GZipMiddleware with Brotli preferred when the client accepts it
+and the optional ``brotli`` package is installed; views opt in with @compress_response.
+
+ReplicaRoutingMiddleware scopes read-replica routing (see db_router) to each request.
+
+AccessLogMiddleware logs one structured record per request to ``employee_project.access``,
+with its status, size, total time and the SQL time measured by QueryInstrumentationMiddleware.
+
+QueryInstrumentationMiddleware runs natively under ASGI as well. Database connections are thread-local, so for async
+requests the recorder is installed on the connections of the thread that sync_to_async
+uses for this request's queries.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import decorator_from_middleware
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import db_router
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available.
+    brotli = None
+
+logger = logging.getLogger('employee_project.sql')
+access_logger = logging.getLogger('employee_project.access')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request runs more queries than its view allows."""
+
+
+def fingerprint(sql):
+    """Normalize literals and IN-lists so statements differing only in parameters match."""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql.replace('%s', '?'))
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def query_budget(budget):
+    """
+    Declare the maximum number of queries a function view may run.
+    Apply it outermost, above ``@api_view``. Viewsets set a ``query_budget`` class
+    attribute instead: an int, or a dict keyed by action name with an optional 'default'.
+    """
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def resolve_budget(view_func, method):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'cls', None), 'query_budget', None)
+    if isinstance(budget, dict):
+        action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+        budget = budget.get(action, budget.get('default'))
+    return budget
+
+
+class _QueryRecorder:
+    def __init__(self):
+        self.statements = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.statements.append(sql)
+
+
+def _install(recorder):
+    for connection in connections.all():
+        connection.execute_wrappers.append(recorder)
+
+
+def _uninstall(recorder):
+    for connection in connections.all():
+        if recorder in connection.execute_wrappers:
+            connection.execute_wrappers.remove(recorder)
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = _QueryRecorder()
+        request.query_budget = None
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = _QueryRecorder()
+        request.query_budget = None
+        await sync_to_async(_install)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_uninstall)(recorder)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        total = len(recorder.statements)
+        sql_ms = recorder.duration * 1000
+        # Read by AccessLogMiddleware.
+        request.sql_queries = total
+        request.sql_ms = sql_ms
+        duplicates = {
+            shape: seen
+            for shape, seen in Counter(fingerprint(sql) for sql in recorder.statements).items()
+            if seen > 1
+        }
+        response['Server-Timing'] = ', '.join(filter(None, [
+            f'db;dur={sql_ms:.2f};desc="{total} queries"',
+            f'dbdup;desc="{sum(duplicates.values())} duplicate queries"' if duplicates else '',
+        ]))
+
+        budget = request.query_budget
+        over_budget = budget is not None and total > budget
+        level = logging.WARNING if over_budget else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'event': 'sql',
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': total,
+                'sql_ms': round(sql_ms, 2),
+                'budget': budget,
+                'duplicates': [{'sql': shape, 'count': seen} for shape, seen in duplicates.items()],
+            }))
+        if over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path} ran {total} queries, budget is {budget}. '
+                f'Duplicated: {list(duplicates) or "none"}'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = resolve_budget(view_func, request.method)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Scope employee_project.db_router's routing state to each request: decide once the view
+    is known whether its reads may use a replica, and after a write keep the client on the
+    primary for REPLICA_STICKY_SECONDS.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = db_router.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            db_router.end_request(request, token)
+
+    async def __acall__(self, request):
+        token = db_router.begin_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            db_router.end_request(request, token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        db_router.route_request(request, view_func)
+
+
+def _user_id(request):
+    user = getattr(request, 'user', None)
+    # Never load a user just for the log line.
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+class AccessLogMiddleware:
+    """
+    Log each request to ``employee_project.access`` once the response is ready. Put it
+    first in MIDDLEWARE so ``duration_ms`` covers the whole middleware stack. Records go
+    through the queued handler configured in LOGGING, so the request never waits on the
+    write.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.log(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.log(request, response, started)
+        return response
+
+    def log(self, request, response, started):
+        level = logging.ERROR if response.status_code >= 500 else logging.INFO
+        if not access_logger.isEnabledFor(level):
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        sql_ms = getattr(request, 'sql_ms', None)
+        match = request.resolver_match
+        access_logger.log(level, '%s %s %s', request.method, request.path, response.status_code, extra={'fields': {
+            'event': 'access',
+            'method': request.method,
+            'path': request.path,
+            'query': request.META.get('QUERY_STRING', ''),
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'bytes': None if response.streaming else len(response.content),
+            'duration_ms': round(duration_ms, 2),
+            'sql_ms': None if sql_ms is None else round(sql_ms, 2),
+            'sql_queries': getattr(request, 'sql_queries', None),
+            'user_id': _user_id(request),
+            'remote_addr': request.META.get('REMOTE_ADDR'),
+        }})
+
+
+class CompressionMiddleware(GZipMiddleware):
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < 200
+            or not _ACCEPTS_BROTLI.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(response.content))
+        # The body changed, so a strong ETag no longer holds; see GZipMiddleware.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'br'
+        return response
+
+
+compress_response = decorator_from_middleware(CompressionMiddleware)
@@ -4,7 +4,7 @@ from django.urls import path, include
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
-from rest_framework.authentication import TokenAuthentication
+from employees.authentication import CachingTokenAuthentication
 
 
 schema_view = get_schema_view(
@@ -15,7 +15,7 @@ schema_view = get_schema_view(
     ),
     public=True,
     permission_classes=[permissions.AllowAny],
-    authentication_classes=[TokenAuthentication],
+    authentication_classes=[CachingTokenAuthentication],
 )
 
 
@@ -24,6 +24,9 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('employees.urls')),
     path('api/', include('attendance.urls')),
+    path('api/', include('jobs.urls')),
+    path('api/async/', include('employees.async_urls')),
+    path('api/async/', include('attendance.async_urls')),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
 ]
 
@@ -0,0 +1,114 @@
+"""
+Performance review analytics behind the /api/performances/ analytics actions.
+
+Each result comes from one SQL statement that uses window functions over Performance rows.
+Results are memoized in the chart cache. The key holds the table's max id, max review date
+and row count, so rows written without signals (e.g. raw SQL) still start a new key. The
+performance_analytics generation covers edits that change none of these.
+"""
+from django.db.models import Avg, Count, F, Max, Q, ValueRange, Window
+from django.db.models.functions import (
+    ExtractMonth, ExtractYear, RowNumber, TruncMonth, TruncQuarter, TruncYear
+)
+
+from .cache import memoized
+from .models import Performance
+from .serializers import PERFORMANCE_VALUES, performance_row
+
+RATINGS = range(1, 6)
+PERIODS = {'month': TruncMonth, 'quarter': TruncQuarter, 'year': TruncYear}
+TREND_GROUPS = {
+    'department': ('employee__department_id', 'employee__department__name'),
+    'employee': ('employee_id', 'employee__name'),
+}
+
+
+def _stamp():
+    return Performance.objects.aggregate(last_id=Max('id'), last_date=Max('review_date'), reviews=Count('id'))
+
+
+def _scoped(department_id=None, employee_id=None):
+    # Both filters select whole employees, so no window partition is ever cut short.
+    queryset = Performance.objects.all()
+    if department_id:
+        queryset = queryset.filter(employee__department_id=department_id)
+    if employee_id:
+        queryset = queryset.filter(employee_id=employee_id)
+    return queryset
+
+
+def latest_reviews(department_id=None):
+    """Each employee's most recent review, as PerformanceSerializer renders it, by employee id."""
+    def compute():
+        rows = (
+            _scoped(department_id)
+            .annotate(position=Window(
+                RowNumber(), partition_by=[F('employee_id')], order_by=[F('review_date').desc(), F('id').desc()]
+            ))
+            .filter(position=1)
+            .values(*PERFORMANCE_VALUES)
+            .order_by('employee_id')
+        )
+        return [performance_row(row) for row in rows]
+    return memoized('performance_analytics', ('latest', department_id, _stamp()), compute)
+
+
+def rating_trends(by, window, department_id=None, employee_id=None):
+    """
+    Average rating per month for each department or employee (``by``), with the rolling
+    average over that month and the ``window - 1`` months before it. Rolling averages are
+    weighted by review, not averages of the monthly averages.
+    """
+    def compute():
+        group, name = TREND_GROUPS[by]
+        month_number = ExtractYear('review_date') * 12 + ExtractMonth('review_date')
+        rows = (
+            _scoped(department_id, employee_id)
+            .annotate(
+                period=TruncMonth('review_date'),
+                period_average=Window(Avg('rating'), partition_by=[F(group), TruncMonth('review_date')]),
+                period_reviews=Window(Count('id'), partition_by=[F(group), TruncMonth('review_date')]),
+                # A RANGE frame over the month number spans whole months, however many reviews each holds.
+                rolling_average=Window(
+                    Avg('rating'), partition_by=[F(group)], order_by=month_number,
+                    frame=ValueRange(start=-(window - 1), end=0),
+                ),
+                position=Window(
+                    RowNumber(), partition_by=[F(group), TruncMonth('review_date')], order_by=F('id').asc()
+                ),
+            )
+            .filter(position=1)
+            .values(group, name, 'period', 'period_average', 'period_reviews', 'rolling_average')
+            .order_by(group, 'period')
+        )
+        results = []
+        for row in rows:
+            if not results or results[-1]['id'] != row[group]:
+                results.append({'id': row[group], 'name': row[name], 'periods': []})
+            results[-1]['periods'].append({
+                'period': row['period'].strftime('%Y-%m'),
+                'average': round(row['period_average'], 2),
+                'reviews': row['period_reviews'],
+                'rolling_average': round(row['rolling_average'], 2),
+            })
+        return {'by': by, 'window': window, 'results': results}
+    return memoized('performance_analytics', ('trends', by, window, department_id, employee_id, _stamp()), compute)
+
+
+def rating_histogram(period, department_id=None):
+    """Number of reviews with each rating per review period (month, quarter or year)."""
+    def compute():
+        rows = (
+            _scoped(department_id)
+            .annotate(period=PERIODS[period]('review_date'))
+            .values('period')
+            .annotate(**{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in RATINGS})
+            .order_by('period')
+        )
+        histogram = {'labels': [], 'counts': {str(rating): [] for rating in RATINGS}}
+        for row in rows:
+            histogram['labels'].append(row['period'].isoformat())
+            for rating in RATINGS:
+                histogram['counts'][str(rating)].append(row[f'rating_{rating}'])
+        return histogram
+    return memoized('performance_analytics', ('histogram', period, department_id, _stamp()), compute)
@@ -7,3 +7,4 @@ class EmployeesConfig(AppConfig):
 
     def ready(self):
         import employees.signals
+        import employee_project.db_router  # registers the replica cache check
@@ -0,0 +1,17 @@
+"""
+URL routing for the async read endpoints, mirroring the paths in employees/urls.py.
+"""
+from django.urls import path
+from .async_views import (
+    department_index, employee_index, performance_index,
+    employees_per_department, monthly_attendance_summary, department_list
+)
+
+urlpatterns = [
+    path('departments/', department_index),
+    path('employees/', employee_index),
+    path('performances/', performance_index),
+    path('charts/employees-per-department/', employees_per_department),
+    path('charts/monthly-attendance/', monthly_attendance_summary),
+    path('charts/departments/', department_list),
+]
@@ -0,0 +1,154 @@
+"""
+Async read endpoints, mounted under /api/async/.
+
+Plain Django coroutine views on the async ORM, meant for an ASGI server (see
+gunicorn.conf.py) so dashboard bursts don't hold a worker per request while Postgres
+answers. Payloads match the DRF endpoints of the same name, filters are taken from the
+matching viewset, and authentication is token-only.
+"""
+from functools import wraps
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, JsonResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from employee_project.db_router import use_replica
+from employee_project.middleware import query_budget
+from . import charts
+from .authentication import aauthenticate
+from .cache import async_cached_response
+from .roles import aget_group_names
+from .serializers import EMPLOYEE_VALUES, PERFORMANCE_VALUES, employee_row, performance_row
+from .views import (
+    CursorResultsSetPagination, DepartmentViewSet, EmployeeViewSet, PerformanceViewSet,
+    include_employee_count, parse_window
+)
+
+
+def async_endpoint(require_auth=False):
+    """
+    Wrap a GET-only coroutine view: authenticate the token, enforce ``require_auth``, turn
+    DRF API exceptions into JSON errors and returned data into a JsonResponse.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                authenticated = await aauthenticate(request)
+                request.user = authenticated[0] if authenticated else AnonymousUser()
+                if require_auth and authenticated is None:
+                    raise exceptions.NotAuthenticated()
+                result = await view(request, *args, **kwargs)
+            except exceptions.APIException as error:
+                detail = error.detail if isinstance(error.detail, (dict, list)) else {'detail': error.detail}
+                return JsonResponse(detail, status=error.status_code, safe=False)
+            if isinstance(result, HttpResponse):
+                return result
+            return JsonResponse(result, safe=False)
+        return wrapper
+    return decorator
+
+
+def read_queryset(viewset_class, request, values):
+    """The viewset's list queryset, filtered from the query string, as values() rows."""
+    view = viewset_class(request=Request(request), format_kwarg=None, action='list', args=(), kwargs={})
+    return view.filter_queryset(view.get_queryset()).values(*values)
+
+
+async def id_keyset_page(request, queryset, read_row):
+    """
+    One page, newest first, as {'next', 'results'}. ``after`` holds the last id of the
+    previous page, so every page is a single range scan on the primary key. Other orderings
+    are refused rather than silently ignored.
+    """
+    if api_settings.ORDERING_PARAM in request.GET:
+        raise exceptions.ValidationError(
+            {api_settings.ORDERING_PARAM: ['Async lists are always ordered newest first.']}
+        )
+    pagination = CursorResultsSetPagination
+    try:
+        page_size = int(request.GET[pagination.page_size_query_param])
+    except (KeyError, ValueError):
+        page_size = pagination.page_size
+    page_size = max(1, min(page_size, pagination.max_page_size))
+    after = request.GET.get('after')
+    if after is not None:
+        try:
+            queryset = queryset.filter(id__lt=int(after))
+        except ValueError:
+            raise exceptions.NotFound('Invalid cursor')
+
+    rows = [row async for row in queryset.order_by('-id')[:page_size + 1].aiterator()]
+    next_link = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_link = replace_query_param(request.build_absolute_uri(), 'after', rows[-1]['id'])
+    return {'next': next_link, 'results': [read_row(row) for row in rows]}
+
+
+# ----------------------
+# Charts
+# ----------------------
+
+@use_replica
+@query_budget(2)
+@async_endpoint()
+@async_cached_response('employees_per_department')
+async def employees_per_department(request):
+    return await charts.aemployees_per_department()
+
+
+@use_replica
+@query_budget(3)
+@async_endpoint()
+@async_cached_response('monthly_attendance_summary')
+async def monthly_attendance_summary(request):
+    window, error = parse_window(request.GET)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+    if 'Employee' in await aget_group_names(request.user):
+        # Employees are linked to their login by email.
+        return await charts.amonthly_attendance(employee_email=request.user.email, **window)
+    return await charts.amonthly_attendance(department_id=request.GET.get('department_id'), **window)
+
+
+@use_replica
+@query_budget(2)
+@async_endpoint()
+@async_cached_response('department_list')
+async def department_list(request):
+    return await charts.adepartment_list()
+
+
+# ----------------------
+# Read-only lists
+# ----------------------
+
+@use_replica
+@query_budget(2)
+@async_endpoint(require_auth=True)
+async def department_index(request):
+    values = ('id', 'name', 'employee_count') if include_employee_count(request) else ('id', 'name')
+    queryset = read_queryset(DepartmentViewSet, request, values)
+    return await id_keyset_page(request, queryset, dict)
+
+
+@use_replica
+@query_budget(2)
+@async_endpoint(require_auth=True)
+async def employee_index(request):
+    queryset = read_queryset(EmployeeViewSet, request, EMPLOYEE_VALUES)
+    return await id_keyset_page(request, queryset, employee_row)
+
+
+@use_replica
+@query_budget(2)
+@async_endpoint(require_auth=True)
+async def performance_index(request):
+    queryset = read_queryset(PerformanceViewSet, request, PERFORMANCE_VALUES)
+    return await id_keyset_page(request, queryset, performance_row)
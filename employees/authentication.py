@@ -0,0 +1,91 @@
+"""
+Token authentication backed by an in-process cache.
+Keeps token key -> the user's and token's field values in a bounded LRU with a TTL, so
+most requests skip the Token + User join. Each hit builds fresh instances from those
+values, so nothing a request caches on its user (permissions, prefetches, ``_state``)
+is shared with other requests. The receivers in employees/signals.py drop entries when a token is
+deleted or when its user is saved or deleted. Other worker processes keep accepting a
+revoked token until their entry expires, so TOKEN_CACHE_TTL is kept to a few seconds.
+"""
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from .cache import TTLCache
+
+_tokens = TTLCache(
+    ttl=getattr(settings, 'TOKEN_CACHE_TTL', 5),
+    maxsize=getattr(settings, 'TOKEN_CACHE_MAX_SIZE', 10000),
+)
+
+
+def _freeze(user, token):
+    """Cache entry for a token: its user's pk, then the model, database and field values of both."""
+    return (
+        user.pk, user._state.db,
+        type(user), tuple(getattr(user, field.attname) for field in user._meta.concrete_fields),
+        type(token), tuple(getattr(token, field.attname) for field in token._meta.concrete_fields),
+    )
+
+
+def _thaw(entry):
+    _, db, user_model, user_values, token_model, token_values = entry
+    user = user_model.from_db(db, [field.attname for field in user_model._meta.concrete_fields], user_values)
+    token = token_model.from_db(db, [field.attname for field in token_model._meta.concrete_fields], token_values)
+    token.user = user
+    return user, token
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement for TokenAuthentication that caches successful lookups."""
+
+    def authenticate_credentials(self, key):
+        cached = _tokens.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            _tokens.set(key, _freeze(user, token))
+            return user, token
+        user, token = _thaw(cached)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user, token
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of CachingTokenAuthentication.authenticate for plain Django async views.
+    Returns ``(user, token)``, or None when no token was sent.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return None
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain invalid characters.')
+
+    cached = _tokens.get(key)
+    if cached is None:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        user = token.user
+        if user.is_active:
+            _tokens.set(key, _freeze(user, token))
+    else:
+        user, token = _thaw(cached)
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+    return user, token
+
+
+def forget_tokens(key=None, user_id=None):
+    """Drop the cached entry for a token key and/or every entry belonging to a user."""
+    if key is not None:
+        _tokens.delete(key)
+    if user_id is not None:
+        _tokens.delete_matching(lambda _, entry: entry[0] == user_id)
@@ -0,0 +1,271 @@
+"""
+Response cache for the chart and dropdown endpoints.
+
+Entries live in the Django cache alias named by ``CHART_CACHE_ALIAS`` (local memory unless
+``CACHE_URL`` points elsewhere) and are keyed by endpoint, query parameters and role.
+Each endpoint has a generation stamp; the receivers in employees/signals.py bump it when a
+model the endpoint depends on changes, which orphans every entry of the old generation.
+
+TTLCache is a separate, process-local cache for small hot lookups such as user roles.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag, urlencode
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from employee_project.db_router import reading_from_replica, sticky_seconds
+
+# Endpoint name -> model names whose changes invalidate it.
+CHART_DEPENDENCIES = {
+    'employees_per_department': {'Department', 'Employee'},
+    'department_list': {'Department'},
+    'monthly_attendance_summary': {'Employee', 'Attendance'},
+    'dashboard': {'Department', 'Employee', 'Attendance'},
+    'attendance_rolling': {'Employee', 'Attendance'},
+    'attendance_streaks': {'Department', 'Employee', 'Attendance'},
+    'performance_analytics': {'Department', 'Employee', 'Performance'},
+}
+
+CACHE_TIMEOUT = 300
+STAT_NAMES = ('hits', 'misses', 'not_modified')
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry expiry and optional LRU bound."""
+
+    def __init__(self, ttl, maxsize=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """Drop every entry for which ``predicate(key, value)`` is true."""
+        with self._lock:
+            for key in [key for key, (value, _) in self._data.items() if predicate(key, value)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def get_cache():
+    return caches[getattr(settings, 'CHART_CACHE_ALIAS', 'default')]
+
+
+def resolve_role(user):
+    """
+    Coarse role used to partition cache entries. 'employee' is checked first because the
+    views scope data to the user whenever is_employee() holds, even for staff and HR.
+    """
+    if not user or not user.is_authenticated:
+        return 'anonymous'
+    from .roles import get_group_names
+    groups = get_group_names(user)
+    if 'Employee' in groups:
+        return 'employee'
+    if user.is_staff:
+        return 'admin'
+    if 'HR' in groups:
+        return 'hr'
+    return 'user'
+
+
+def _generation(cache, endpoint):
+    key = f'charts:generation:{endpoint}'
+    generation = cache.get(key)
+    if generation is None:
+        generation = (uuid4().hex, int(time.time()))
+        cache.add(key, generation, None)
+        generation = cache.get(key, generation)
+    return generation
+
+
+def invalidate_charts(model_name):
+    """Start a new generation for every endpoint that depends on ``model_name``."""
+    cache = get_cache()
+    for endpoint, dependencies in CHART_DEPENDENCIES.items():
+        if model_name in dependencies:
+            cache.set(f'charts:generation:{endpoint}', (uuid4().hex, int(time.time())), None)
+
+
+def _timeout(modified):
+    # A replica may not have applied the write that started this generation yet, so what
+    # it returns right after one is only kept until the replica has caught up.
+    if reading_from_replica() and time.time() - modified < sticky_seconds():
+        return sticky_seconds()
+    return CACHE_TIMEOUT
+
+
+def memoized(endpoint, key, compute):
+    """
+    Return ``compute()``, cached under ``key`` (any repr-able value) until the next
+    invalidation of ``endpoint``. Unlike cached_response, the result is shared by all roles.
+    """
+    cache = get_cache()
+    token, modified = _generation(cache, endpoint)
+    cache_key = 'charts:memo:' + hashlib.md5(f'{endpoint}|{token}|{key!r}'.encode()).hexdigest()
+    result = cache.get(cache_key)
+    if result is None:
+        result = compute()
+        cache.set(cache_key, result, _timeout(modified))
+    return result
+
+
+def _count(cache, name):
+    key = f'charts:stats:{name}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def cache_stats():
+    cache = get_cache()
+    stats = {name: cache.get(f'charts:stats:{name}', 0) for name in STAT_NAMES}
+    served = stats['hits'] + stats['not_modified']
+    lookups = served + stats['misses']
+    stats['hit_ratio'] = round(served / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or f'W/{etag}' in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def _response_key(endpoint, token, request):
+    role = resolve_role(request.user)
+    # Employee-role responses are scoped to the requesting user.
+    scope = f'{role}:{request.user.pk}' if role == 'employee' else role
+    params = urlencode(sorted(request.GET.lists()), doseq=True)
+    return 'charts:response:' + hashlib.md5(
+        f'{endpoint}|{token}|{scope}|{params}'.encode()
+    ).hexdigest()
+
+
+def _make_entry(data, modified):
+    body = json.dumps(data, sort_keys=True, default=str)
+    return data, quote_etag(hashlib.md5(body.encode()).hexdigest()), modified
+
+
+def _cache_headers(response, etag, modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Authorization', 'Cookie'))
+    return response
+
+
+def cached_response(endpoint):
+    """
+    Cache the 200 responses of a DRF function view under ``endpoint``.
+    Apply it directly to the view function, beneath ``@api_view``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cache = get_cache()
+            token, modified = _generation(cache, endpoint)
+            key = _response_key(endpoint, token, request)
+
+            entry = cache.get(key)
+            hit = entry is not None
+            if not hit:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                entry = _make_entry(response.data, modified)
+                cache.set(key, entry, _timeout(modified))
+            data, etag, modified = entry
+
+            if _not_modified(request, etag, modified):
+                _count(cache, 'not_modified')
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                _count(cache, 'hits' if hit else 'misses')
+                response = Response(data)
+            return _cache_headers(response, etag, modified)
+        return wrapper
+    return decorator
+
+
+def async_cached_response(endpoint):
+    """
+    Async form of cached_response for the views in employees/async_views.py.
+    The view returns the response data, or an HttpResponse to bypass the cache. Entries
+    are shared with the sync endpoint of the same name.
+    """
+    from .roles import aget_group_names
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            cache = get_cache()
+            token, modified = await sync_to_async(_generation)(cache, endpoint)
+            await aget_group_names(request.user)  # memoized for resolve_role
+            key = _response_key(endpoint, token, request)
+
+            entry = await cache.aget(key)
+            hit = entry is not None
+            if not hit:
+                result = await view(request, *args, **kwargs)
+                if isinstance(result, HttpResponse):
+                    return result
+                entry = _make_entry(result, modified)
+                await cache.aset(key, entry, _timeout(modified))
+            data, etag, modified = entry
+
+            if _not_modified(request, etag, modified):
+                await sync_to_async(_count)(cache, 'not_modified')
+                response = HttpResponseNotModified()
+            else:
+                await sync_to_async(_count)(cache, 'hits' if hit else 'misses')
+                response = JsonResponse(data, safe=False)
+            return _cache_headers(response, etag, modified)
+        return wrapper
+    return decorator
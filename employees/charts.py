@@ -0,0 +1,192 @@
+"""
+Aggregations behind the chart endpoints.
+Every query groups in the database, so each returns one row per department or month.
+Each function has an ``a``-prefixed coroutine twin for the async views; both build the
+same querysets and differ only in how the rows are fetched. The querysets use values()
+rather than values_list(), whose aiterator() is not async-safe on Django 4.2.
+The attendance_rolling and attendance_streaks charts read the in-process attendance
+matrix (attendance/matrix.py) instead and have no async twin.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from attendance.matrix import get_matrix
+from attendance.models import Attendance, AttendanceMonthlyRollup
+from attendance.rollup import month_start, next_month
+from .models import Department, Employee
+
+STATUS_SERIES = (('present', 'P'), ('absent', 'A'), ('late', 'L'))
+DASHBOARD_FIELDS = ('departments', 'employees_per_department', 'monthly_attendance')
+
+
+def _employees_per_department_query():
+    # employee_count is maintained on Department, so this is a plain read with no join.
+    return Department.objects.values('id', 'name', 'employee_count').order_by('id')
+
+
+def _employees_per_department(rows):
+    labels = [row['name'] for row in rows]
+    counts = [row['employee_count'] for row in rows]
+    return {'labels': labels, 'counts': counts, 'total': sum(counts)}
+
+
+def employees_per_department():
+    return _employees_per_department(list(_employees_per_department_query()))
+
+
+async def aemployees_per_department():
+    return _employees_per_department([row async for row in _employees_per_department_query().aiterator()])
+
+
+def monthly_attendance(employee_email=None, department_id=None, start=None, end=None):
+    """
+    Present/absent/late counts per month, optionally bounded to ``start``..``end`` inclusive.
+
+    Whole months come from the rollup table. When a bound falls mid-month, only that
+    partial month is counted from Attendance, so the scan stays bounded to two months.
+    """
+    totals = {}
+    for rows in _monthly_attendance_queries(employee_email, department_id, start, end):
+        for row in rows:
+            _add_row(totals, row)
+    return _monthly_summary(totals)
+
+
+async def amonthly_attendance(employee_email=None, department_id=None, start=None, end=None):
+    totals = {}
+    for rows in _monthly_attendance_queries(employee_email, department_id, start, end):
+        async for row in rows.aiterator():
+            _add_row(totals, row)
+    return _monthly_summary(totals)
+
+
+def _monthly_attendance_queries(employee_email, department_id, start, end):
+    rollup = AttendanceMonthlyRollup.objects.all()
+    records = Attendance.objects.all()
+    if employee_email is not None:
+        rollup = rollup.filter(employee__email=employee_email)
+        records = records.filter(employee__email=employee_email)
+    elif department_id:
+        rollup = rollup.filter(department_id=department_id)
+        records = records.filter(employee__department_id=department_id)
+
+    # Whole months covered by the window: [first_month, end_month).
+    first_month = start if start is None or start.day == 1 else next_month(start)
+    end_month = None if end is None else month_start(end + timedelta(days=1))
+    if first_month is not None:
+        rollup = rollup.filter(month__gte=first_month)
+    if end_month is not None:
+        rollup = rollup.filter(month__lt=end_month)
+
+    queries = []
+    if first_month is None or end_month is None or first_month < end_month:
+        queries.append(rollup.values('month').annotate(**{
+            name: Sum('count', filter=Q(status=code)) for name, code in STATUS_SERIES
+        }))
+
+    partial_ranges = []
+    if first_month is not None and end_month is not None and first_month >= end_month:
+        partial_ranges.append((start, end))
+    else:
+        if start is not None and start != first_month:
+            partial_ranges.append((start, first_month - timedelta(days=1)))
+        if end is not None and end_month is not None and end >= end_month:
+            partial_ranges.append((end_month, end))
+    for range_start, range_end in partial_ranges:
+        queries.append(records.filter(date__range=(range_start, range_end))
+                       .annotate(month=TruncMonth('date'))
+                       .values('month')
+                       .annotate(**{
+                           name: Count('id', filter=Q(status=code)) for name, code in STATUS_SERIES
+                       }))
+    return [query.order_by('month') for query in queries]
+
+
+def _monthly_summary(totals):
+    months = sorted(totals)
+    summary = {'labels': [month.strftime('%b %Y') for month in months]}
+    for position, (name, _) in enumerate(STATUS_SERIES):
+        summary[name] = [totals[month][position] for month in months]
+    return summary
+
+
+def _add_row(totals, row):
+    counts = totals.setdefault(row['month'], [0] * len(STATUS_SERIES))
+    for position, (name, _) in enumerate(STATUS_SERIES):
+        counts[position] += row[name] or 0
+
+
+def department_list():
+    return list(Department.objects.values('id', 'name').order_by('id'))
+
+
+async def adepartment_list():
+    return [row async for row in Department.objects.values('id', 'name').order_by('id').aiterator()]
+
+
+def dashboard(fields=DASHBOARD_FIELDS, employee_email=None, department_id=None, start=None, end=None):
+    """
+    The chart datasets named in ``fields``, keyed by field.
+    The department list and the per-department counts share one annotated query.
+    """
+    data = {}
+    if 'departments' in fields or 'employees_per_department' in fields:
+        rows = list(_employees_per_department_query())
+        if 'departments' in fields:
+            data['departments'] = [{'id': row['id'], 'name': row['name']} for row in rows]
+        if 'employees_per_department' in fields:
+            data['employees_per_department'] = _employees_per_department(rows)
+    if 'monthly_attendance' in fields:
+        data['monthly_attendance'] = monthly_attendance(employee_email, department_id, start, end)
+    return data
+
+
+def _matrix_rows(matrix, employee_email, department_id):
+    if employee_email is not None:
+        return matrix.select(employee_ids=Employee.objects.filter(email=employee_email).values_list('pk', flat=True))
+    return matrix.select(department_id=department_id or None)
+
+
+def attendance_rolling(status, window, employee_email=None, department_id=None, start=None, end=None):
+    """
+    Daily share of attendance records with ``status`` over a trailing ``window`` of days,
+    for the employees in scope.
+    """
+    matrix = get_matrix()
+    rows = _matrix_rows(matrix, employee_email, department_id)
+    dates, rates, counts = matrix.rolling_rate(status, window, rows, start, end)
+    return {
+        'labels': [day.isoformat() for day in dates],
+        'rate': np.round(rates, 4).tolist(),
+        'count': counts.tolist(),
+    }
+
+
+def attendance_streaks(status, limit, employee_email=None, department_id=None, start=None, end=None):
+    """
+    The ``limit`` employees with the longest run of consecutive days with ``status``,
+    with the run each has going on the last day.
+    """
+    matrix = get_matrix()
+    rows = _matrix_rows(matrix, employee_email, department_id)
+    longest, current = matrix.streaks(status, rows, start, end)
+    employee_ids = matrix.employee_ids[rows]
+    # Longest streak first, then the current one, then employee id.
+    order = np.lexsort((employee_ids, -current, -longest))
+    order = order[longest[order] > 0][:limit]
+    names = {
+        pk: (name, department)
+        for pk, name, department in Employee.objects.filter(pk__in=employee_ids[order].tolist())
+        .values_list('pk', 'name', 'department__name')
+    }
+    results = []
+    for employee_id, run, ongoing in zip(employee_ids[order].tolist(), longest[order].tolist(),
+                                         current[order].tolist()):
+        if employee_id in names:
+            name, department = names[employee_id]
+            results.append({'employee_id': employee_id, 'name': name, 'department': department,
+                            'longest': run, 'current': ongoing})
+    return {'status': status, 'results': results}
@@ -0,0 +1,187 @@
+"""
+Management command comparing per-request latency with a new database connection per
+request, persistent connections (CONN_MAX_AGE), the connection pool (DB_POOL) and the
+ASGI deployment.
+
+Cheap views are called directly, with request_started and request_finished sent around
+each call as the WSGI handler does. Connections are therefore opened, reused or given back
+to the pool exactly as under gunicorn. The asgi mode instead sends the signals and calls
+the view through sync_to_async, as ASGIHandler does, with the settings asgi.py forces: no
+persistent connections and no pool. Unless --warm is given, the token and chart caches
+are invalidated before each request so that every request reaches the database.
+"""
+import threading
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from employee_project.db_pool import close_pools, pool_stats
+from employees.authentication import forget_tokens
+from employees.cache import invalidate_charts
+from employees.views import current_user_view, department_list
+
+MODES = ('new', 'persistent', 'pooled', 'asgi')
+ENDPOINTS = {
+    'department_list': department_list,
+    'current_user_view': current_user_view,
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def render(view, request):
+    response = view(request)
+    response.render()
+    return response
+
+
+def wsgi_request(view, request):
+    request_started.send(sender=WSGIHandler, environ=request.META)
+    try:
+        return render(view, request)
+    finally:
+        request_finished.send(sender=WSGIHandler)
+
+
+async def asgi_request(view, request):
+    await sync_to_async(request_started.send, thread_sensitive=True)(sender=ASGIHandler, scope={'type': 'http'})
+    try:
+        return await sync_to_async(render, thread_sensitive=True)(view, request)
+    finally:
+        await sync_to_async(request_finished.send, thread_sensitive=True)(sender=ASGIHandler)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-request latency with and without persistent and pooled database connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint and mode.')
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Threads sending requests at once, as in a threaded worker.')
+        parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated: {', '.join(MODES)}.")
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--pool-size', type=int, default=5)
+        parser.add_argument('--pool-max-overflow', type=int, default=5)
+        parser.add_argument('--warm', action='store_true', help='Keep the token and chart caches between requests.')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}.")
+        alias = options['database']
+        if alias not in connections.settings:
+            raise CommandError(f'Unknown database {alias!r}.')
+        stock_engines = {pooled: stock for stock, pooled in settings.POOLED_ENGINES.items()}
+        engine = connections.settings[alias]['ENGINE']
+        engine = stock_engines.get(engine, engine)
+        if 'pooled' in modes and engine not in settings.POOLED_ENGINES:
+            raise CommandError(f'No pooled backend for {engine}.')
+
+        user = User.objects.create_user(username='bench-connections', password='unused')
+        try:
+            token, _ = Token.objects.get_or_create(user=user)
+            self.stdout.write(
+                f"{'mode':<12}{'endpoint':<20}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>10}{'opened':>8}"
+            )
+            for mode in modes:
+                settings_dict = {**connections.settings[alias], 'ENGINE': engine}
+                if mode in ('new', 'asgi'):
+                    settings_dict['CONN_MAX_AGE'] = 0
+                elif mode == 'persistent':
+                    settings_dict['CONN_MAX_AGE'] = 600
+                else:
+                    settings_dict.update(
+                        ENGINE=settings.POOLED_ENGINES[engine],
+                        CONN_MAX_AGE=0,
+                        POOL={'SIZE': options['pool_size'], 'MAX_OVERFLOW': options['pool_max_overflow']},
+                    )
+                for name, view in ENDPOINTS.items():
+                    if mode == 'pooled':
+                        close_pools()
+                    self.run(mode, name, view, alias, settings_dict, token, options)
+                    if mode == 'pooled':
+                        stats = pool_stats()['pools'].get(alias, {})
+                        self.stdout.write(
+                            f"{'':<12}pool: {stats.get('checkouts', 0)} checkouts, "
+                            f"{stats.get('overflow_checkouts', 0)} overflow, {stats.get('waits', 0)} waits "
+                            f"({stats.get('wait_ms_total', 0)} ms), {stats.get('timeouts', 0)} timeouts"
+                        )
+            close_pools()
+        finally:
+            forget_tokens(user_id=user.pk)
+            user.delete()
+
+    def run(self, mode, name, view, alias, settings_dict, token, options):
+        factory = APIRequestFactory()
+        per_thread = max(1, options['requests'] // options['threads'])
+        latencies = []
+        opened = []
+        errors = []
+        lock = threading.Lock()
+        # Each thread runs its own event loop for asgi; its sync_to_async calls come back to the thread.
+        handle = async_to_sync(asgi_request) if mode == 'asgi' else wsgi_request
+
+        def count_opened(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    opened.append(1)
+
+        def worker():
+            original = connections[alias]
+            connections[alias] = load_backend(settings_dict['ENGINE']).DatabaseWrapper(dict(settings_dict), alias)
+            samples = []
+            try:
+                for _ in range(per_thread):
+                    if not options['warm']:
+                        forget_tokens(key=token.key)
+                        invalidate_charts('Department')
+                    request = factory.get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+                    started = time.perf_counter()
+                    response = handle(view, request)
+                    samples.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise CommandError(f'{name} returned {response.status_code}.')
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections[alias].close()
+                connections[alias] = original
+                with lock:
+                    latencies.extend(samples)
+
+        connection_created.connect(count_opened)
+        started = time.perf_counter()
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_opened)
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise errors[0]
+
+        # The pool reuses connections without opening them, but Django still signals each checkout.
+        opens = pool_stats()['pools'].get(alias, {}).get('opened', 0) if mode == 'pooled' else len(opened)
+        self.stdout.write(
+            f'{mode:<12}{name:<20}'
+            f'{percentile(latencies, 0.5) * 1000:9.2f}{percentile(latencies, 0.95) * 1000:9.2f}'
+            f'{percentile(latencies, 0.99) * 1000:9.2f}{len(latencies) / elapsed:10.1f}{opens:8}'
+        )
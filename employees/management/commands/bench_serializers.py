@@ -0,0 +1,91 @@
+"""
+Management command comparing DRF serializers with the values()-based read path.
+Seeds rows inside a transaction that is rolled back, so the configured database is left untouched.
+"""
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from employees.models import Department, Employee, Performance
+from employees.serializers import (
+    EmployeeSerializer, PerformanceSerializer,
+    EMPLOYEE_VALUES, PERFORMANCE_VALUES, employee_row, performance_row
+)
+
+
+def timed(build, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = build()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+class Command(BaseCommand):
+    help = 'Benchmark serializer output against the values()-based read path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Employees (and reviews) to serialize.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per variant; the best is reported.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            departments = [Department.objects.create(name=f'bench-serializers-{i}') for i in range(5)]
+            employees = Employee.objects.bulk_create(
+                Employee(
+                    name=f'Bench Employee {i}', email=f'bench-serializers-{i}@example.com',
+                    phone_number='0000000000', address='Bench Street',
+                    date_of_joining=date(2020, 1, 1) + timedelta(days=i % 1000),
+                    department=departments[i % len(departments)],
+                )
+                for i in range(rows)
+            )
+            Performance.objects.bulk_create(
+                Performance(employee=employee, rating=1 + i % 5, review_date=date(2024, 1, 1))
+                for i, employee in enumerate(employees)
+            )
+            employee_ids = [employee.pk for employee in employees]
+
+            employee_instances = list(
+                Employee.objects.select_related('department').filter(pk__in=employee_ids).order_by('id')
+            )
+            employee_values = list(
+                Employee.objects.filter(pk__in=employee_ids).order_by('id').values(*EMPLOYEE_VALUES)
+            )
+            performance_instances = list(
+                Performance.objects.select_related('employee__department')
+                .filter(employee_id__in=employee_ids).order_by('id')
+            )
+            performance_values = list(
+                Performance.objects.filter(employee_id__in=employee_ids).order_by('id').values(*PERFORMANCE_VALUES)
+            )
+            # Rows are fetched up front so only serialization is timed.
+            cases = (
+                (
+                    'employees',
+                    lambda: EmployeeSerializer(employee_instances, many=True).data,
+                    lambda: [employee_row(row) for row in employee_values],
+                ),
+                (
+                    'performances',
+                    lambda: PerformanceSerializer(performance_instances, many=True).data,
+                    lambda: [performance_row(row) for row in performance_values],
+                ),
+            )
+            renderer = JSONRenderer()
+            for label, slow, fast in cases:
+                slow_time, slow_data = timed(slow, repeat)
+                fast_time, fast_data = timed(fast, repeat)
+                identical = renderer.render(slow_data) == renderer.render(fast_data)
+                self.stdout.write(
+                    f'{label:<13} serializer {slow_time * 1000:8.1f} ms   '
+                    f'values path {fast_time * 1000:8.1f} ms   '
+                    f'speedup {slow_time / fast_time:5.1f}x   identical={identical}'
+                )
+            transaction.set_rollback(True)
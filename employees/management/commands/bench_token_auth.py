@@ -0,0 +1,63 @@
+"""
+Management command comparing request throughput of TokenAuthentication and
+CachingTokenAuthentication.
+Runs inside a transaction that is rolled back, so the configured database is left untouched.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from employees.authentication import CachingTokenAuthentication, forget_tokens
+
+
+def build_view(authentication_class):
+    class WhoAmI(APIView):
+        authentication_classes = [authentication_class]
+        permission_classes = [IsAuthenticated]
+
+        def get(self, request):
+            return Response({'id': request.user.id})
+
+    return WhoAmI.as_view()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark requests/sec with and without the token authentication cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per run.')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench-token-auth', password='unused')
+            token, _ = Token.objects.get_or_create(user=user)
+            forget_tokens(key=token.key)
+            for label, authentication_class in (
+                ('TokenAuthentication', TokenAuthentication),
+                ('CachingTokenAuthentication', CachingTokenAuthentication),
+            ):
+                view = build_view(authentication_class)
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(total):
+                        request = factory.get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+                        response = view(request)
+                        assert response.status_code == 200, response.status_code
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label:<28} {total / elapsed:10.1f} req/s   '
+                    f'{len(queries) / total:.2f} queries/request'
+                )
+            transaction.set_rollback(True)
+        forget_tokens(user_id=user.pk)
@@ -0,0 +1,132 @@
+"""
+Management command printing the query plans behind each viewset's list endpoint.
+
+Every scenario runs the real view with APIRequestFactory against the configured (seeded)
+database, captures the SQL it sends to the primary and to each read replica, and runs
+EXPLAIN on each SELECT against the database that served it: EXPLAIN ANALYZE on
+PostgreSQL, EXPLAIN QUERY PLAN on SQLite. Plans that fall back to a full table scan are
+listed at the end so index use can be checked after a migration or a filter change.
+SQLite also reports a LIMITed walk in rowid order as SCAN, and the full-text index exists
+only on PostgreSQL, so run it against PostgreSQL for a definitive answer.
+"""
+import re
+from contextlib import ExitStack
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from attendance.models import Attendance
+from attendance.views import AttendanceViewSet
+from employees.models import Employee
+from employee_project.db_router import replicas
+from employees.views import DepartmentViewSet, EmployeeViewSet, PerformanceViewSet
+
+# (name, viewset, query string); {placeholders} are filled from the seeded data.
+SCENARIOS = [
+    ('departments', DepartmentViewSet, ''),
+    ('employees', EmployeeViewSet, ''),
+    ('employees-by-department', EmployeeViewSet, 'department__id={department_id}'),
+    ('employees-by-joining-date', EmployeeViewSet, 'date_of_joining={date_of_joining}'),
+    ('employees-ordered-by-name', EmployeeViewSet, 'ordering=name'),
+    ('employees-ordered-by-joining-date', EmployeeViewSet, 'ordering=-date_of_joining'),
+    ('employees-search', EmployeeViewSet, 'search={search}'),
+    ('performances', PerformanceViewSet, ''),
+    ('attendance', AttendanceViewSet, ''),
+    ('attendance-by-date', AttendanceViewSet, 'date={attendance_date}'),
+    ('attendance-by-status', AttendanceViewSet, 'status=A'),
+    ('attendance-by-employee', AttendanceViewSet, 'employee__id={employee_id}'),
+]
+
+# Plan lines that mean a table was read in full rather than through an index.
+FULL_SCAN = {
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+}
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the SQL generated by each viewset's list endpoint against the current database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', default='', help='Comma-separated scenario names to run.')
+        parser.add_argument('--no-analyze', action='store_true',
+                            help='On PostgreSQL, show estimated plans without executing the queries.')
+
+    def handle(self, *args, **options):
+        # Queries are captured on every database the router can send reads to.
+        self.aliases = [DEFAULT_DB_ALIAS, *replicas()]
+        for alias in self.aliases:
+            if connections[alias].vendor not in FULL_SCAN:
+                raise CommandError(f'EXPLAIN output is not supported for {connections[alias].vendor} ({alias}).')
+        employee = Employee.objects.order_by('pk').first()
+        latest = Attendance.objects.order_by('-date').first()
+        if employee is None or latest is None:
+            raise CommandError('No data to explain against; run seed_data first.')
+        values = {
+            'department_id': employee.department_id,
+            'date_of_joining': employee.date_of_joining.isoformat(),
+            'search': employee.name.split()[0][:4],
+            'employee_id': employee.pk,
+            'attendance_date': latest.date.isoformat(),
+        }
+        only = {name for name in options['only'].split(',') if name}
+        self.analyze = not options['no_analyze']
+
+        full_scans = []
+        # Pagination links are built for the factory's 'testserver' host.
+        with override_settings(ALLOWED_HOSTS=['testserver']), transaction.atomic():
+            user = User.objects.create_superuser(username='explain-queries', password=None)
+            for name, viewset, query in SCENARIOS:
+                if only and name not in only:
+                    continue
+                for table in self.explain_scenario(name, viewset, query.format(**values), user):
+                    full_scans.append((name, table))
+            transaction.set_rollback(True)
+
+        if full_scans:
+            self.stdout.write(self.style.WARNING('Full table scans:'))
+            for name, table in full_scans:
+                self.stdout.write(f'  {name}: {table}')
+        else:
+            self.stdout.write(self.style.SUCCESS('Every explained query used an index.'))
+
+    def explain_scenario(self, name, viewset, query, user):
+        request = APIRequestFactory().get(f'/?{query}', secure=True)
+        force_authenticate(request, user=user)
+        with ExitStack() as stack:
+            captures = {
+                alias: stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in self.aliases
+            }
+            viewset.as_view({'get': 'list'})(request).render()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {name} ?{query}"))
+        full_scans = []
+        for alias, queries in captures.items():
+            vendor = connections[alias].vendor
+            for captured in queries.captured_queries:
+                sql = captured['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                plan = self.explain(alias, sql)
+                self.stdout.write(sql if alias == DEFAULT_DB_ALIAS else f'[{alias}] {sql}')
+                self.stdout.write('\n'.join(f'    {line}' for line in plan))
+                for line in plan:
+                    match = FULL_SCAN[vendor].search(line)
+                    if match:
+                        full_scans.append(match.group(1))
+        return full_scans
+
+    def explain(self, alias, sql):
+        connection = connections[alias]
+        if connection.vendor == 'postgresql':
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if self.analyze else 'EXPLAIN '
+        else:
+            prefix = 'EXPLAIN QUERY PLAN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        # PostgreSQL returns one text column; SQLite returns (id, parent, notused, detail).
+        return [row[-1] for row in rows]
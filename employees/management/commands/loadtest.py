@@ -0,0 +1,132 @@
+"""
+Management command load-testing running deployments over HTTP.
+
+Each target is a NAME=BASE_URL pair, e.g. the WSGI deployment at
+``wsgi=http://127.0.0.1:8001/api`` and the ASGI one at ``asgi=http://127.0.0.1:8002/api/async``.
+For every concurrency level, that many clients with keep-alive connections request the
+read paths round-robin, and throughput, p50/p99 latency and error counts are reported.
+"""
+import json
+import threading
+import time
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .run_benchmarks import percentile
+
+DEFAULT_PATHS = (
+    'charts/employees-per-department/',
+    'charts/monthly-attendance/',
+    'charts/departments/',
+    'departments/',
+    'employees/',
+    'performances/',
+    'attendance/',
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput and tail latency of deployments (e.g. WSGI vs ASGI) under concurrent load.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='NAME=BASE_URL',
+                            help='Deployment to test; repeat for each one to compare.')
+        parser.add_argument('--token', default=None, help='API token sent with every request.')
+        parser.add_argument('--concurrency', default='1,10,50,100',
+                            help='Comma-separated numbers of concurrent clients.')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client per level.')
+        parser.add_argument('--paths', default=','.join(DEFAULT_PATHS),
+                            help='Comma-separated paths, relative to each BASE_URL.')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+        parser.add_argument('--output', default=None, help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        targets = []
+        for spec in options['target']:
+            name, _, base_url = spec.partition('=')
+            if not base_url.startswith(('http://', 'https://')):
+                raise CommandError(f'--target must look like NAME=http://host:port/prefix, got {spec!r}.')
+            targets.append((name, base_url.rstrip('/') + '/'))
+        levels = [int(level) for level in options['concurrency'].split(',') if level]
+        paths = [path.lstrip('/') for path in options['paths'].split(',') if path]
+        headers = {'Authorization': f"Token {options['token']}"} if options['token'] else {}
+
+        results = {}
+        for name, base_url in targets:
+            results[name] = {}
+            # Warm-up: open database connections and fill caches before anything is timed.
+            self.run_level(base_url, paths, headers, 1, len(paths), options['timeout'])
+            for level in levels:
+                stats = self.run_level(base_url, paths, headers, level, options['requests'], options['timeout'])
+                results[name][str(level)] = stats
+                self.stdout.write(
+                    f"{name:<8} c={level:<4} {stats['rps']:9.1f} req/s  p50 {stats['p50_ms']:8.2f} ms  "
+                    f"p99 {stats['p99_ms']:8.2f} ms  errors {stats['errors']}"
+                )
+
+        if len(targets) > 1:
+            self.compare(results, [name for name, _ in targets], levels)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_level(self, base_url, paths, headers, clients, requests, timeout):
+        url = urlsplit(base_url)
+        connection_class = HTTPSConnection if url.scheme == 'https' else HTTPConnection
+        samples = []
+        errors = []
+        lock = threading.Lock()
+        start = threading.Barrier(clients + 1)
+
+        def client(offset):
+            connection = connection_class(url.netloc, timeout=timeout)
+            latencies, failures = [], 0
+            start.wait()
+            for number in range(requests):
+                path = url.path + paths[(offset + number) % len(paths)]
+                began = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        failures += 1
+                except OSError:
+                    failures += 1
+                    connection.close()
+                    connection = connection_class(url.netloc, timeout=timeout)
+                latencies.append((time.perf_counter() - began) * 1000)
+            connection.close()
+            with lock:
+                samples.extend(latencies)
+                errors.append(failures)
+
+        threads = [threading.Thread(target=client, args=(offset,)) for offset in range(clients)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        return {
+            'requests': len(samples),
+            'rps': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(samples, 0.50), 3),
+            'p99_ms': round(percentile(samples, 0.99), 3),
+            'errors': sum(errors),
+        }
+
+    def compare(self, results, names, levels):
+        baseline = names[0]
+        for name in names[1:]:
+            for level in levels:
+                base, other = results[baseline][str(level)], results[name][str(level)]
+                self.stdout.write(
+                    f"{name} vs {baseline} at c={level}: "
+                    f"throughput x{other['rps'] / base['rps']:.2f}, "
+                    f"p99 x{other['p99_ms'] / base['p99_ms']:.2f}"
+                )
@@ -0,0 +1,41 @@
+"""
+Management command to check Department.employee_count against the Employee table.
+Use after loading employees with raw SQL or any other path that bypasses EmployeeQuerySet
+and the model signals.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, Q
+
+from employees.models import Department, recount_employee_counts
+
+
+class Command(BaseCommand):
+    help = 'Report departments whose employee_count has drifted, and repair them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drift; exit with an error if any is found.')
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Department.objects
+            .annotate(actual=Count('employees'))
+            .filter(~Q(employee_count=F('actual')))
+            .values('id', 'name', 'employee_count', 'actual')
+            .order_by('id')
+        )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All department employee counts are correct.'))
+            return
+
+        for row in drifted:
+            self.stdout.write(
+                f"{row['name']} (id {row['id']}): stored {row['employee_count']}, actual {row['actual']}"
+            )
+        if options['check']:
+            raise CommandError(f'{len(drifted)} department employee count(s) have drifted.')
+
+        # The recount is one UPDATE from the Employee table, so writes landing between the
+        # check above and this statement are still counted correctly.
+        repaired = recount_employee_counts([row['id'] for row in drifted])
+        self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} department employee count(s).'))
@@ -0,0 +1,284 @@
+"""
+Management command benchmarking every API route at several data sizes.
+
+Each size is seeded into a throwaway test database with seed_data, then every scenario is
+requested through the Django test client. Latency percentiles, query counts and peak
+Python memory are written as JSON, and a saved baseline can be used to flag regressions.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from io import StringIO
+from itertools import count
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+import attendance.urls
+import employees.urls
+from attendance.models import Attendance
+from employees.models import Department, Employee, Performance
+
+DEFAULT_SIZES = '1000,100000,1000000'
+BENCH_PASSWORD = 'bench-password'
+SEED_END_DATE = date(2025, 6, 30)
+
+
+class Scenario:
+    """One request shape; ``path``/``data`` are callables taking the benchmark context."""
+
+    def __init__(self, name, method, path, data=None, requests=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.requests = requests
+
+
+def _unique(prefix, context):
+    return f"{prefix}-{next(context['counter'])}"
+
+
+def _new_employee(context):
+    return {
+        'name': 'Bench Hire', 'email': f"{_unique('hire', context)}@example.com",
+        'phone_number': '0000000000', 'address': 'Bench Street',
+        'date_of_joining': '2024-01-01', 'department_id': context['department'].pk,
+    }
+
+
+def _new_attendance(context):
+    day = SEED_END_DATE + timedelta(days=next(context['counter']))
+    return {'employee_id': context['employee'].pk, 'date': day.isoformat(), 'status': 'P'}
+
+
+def _bulk_attendance(context):
+    day = SEED_END_DATE + timedelta(days=next(context['counter']))
+    return [
+        {'employee_id': employee_id, 'date': day.isoformat(), 'status': 'L'}
+        for employee_id in context['employee_ids'][:100]
+    ]
+
+
+SCENARIOS = [
+    Scenario('api-root', 'get', lambda c: '/api/'),
+    Scenario('departments-list', 'get', lambda c: '/api/departments/'),
+    Scenario('departments-retrieve', 'get', lambda c: f"/api/departments/{c['department'].pk}/"),
+    Scenario('departments-create', 'post', lambda c: '/api/departments/',
+             lambda c: {'name': _unique('Bench Department', c)}),
+    Scenario('employees-list', 'get', lambda c: '/api/employees/'),
+    Scenario('employees-list-filtered', 'get',
+             lambda c: f"/api/employees/?department__id={c['department'].pk}&ordering=name"),
+    Scenario('employees-search', 'get', lambda c: '/api/employees/?search=an'),
+    Scenario('employees-typeahead', 'get', lambda c: '/api/employees/search/?q=an'),
+    Scenario('employees-retrieve', 'get', lambda c: f"/api/employees/{c['employee'].pk}/"),
+    Scenario('employees-create', 'post', lambda c: '/api/employees/', _new_employee),
+    Scenario('employees-bulk-create', 'post', lambda c: '/api/employees/',
+             lambda c: [_new_employee(c) for _ in range(100)], requests=10),
+    Scenario('employees-export', 'get', lambda c: '/api/employees/export/csv/', requests=5),
+    Scenario('performances-list', 'get', lambda c: '/api/performances/'),
+    Scenario('performances-retrieve', 'get', lambda c: f"/api/performances/{c['performance'].pk}/"),
+    Scenario('performances-create', 'post', lambda c: '/api/performances/',
+             lambda c: {'employee_id': c['employee'].pk, 'rating': 3, 'review_date': '2025-01-01'}),
+    Scenario('performances-export', 'get', lambda c: '/api/performances/export/ndjson/', requests=5),
+    Scenario('attendance-list', 'get', lambda c: '/api/attendance/'),
+    Scenario('attendance-list-filtered', 'get',
+             lambda c: f"/api/attendance/?status=A&employee__id={c['employee'].pk}"),
+    Scenario('attendance-retrieve', 'get', lambda c: f"/api/attendance/{c['attendance'].pk}/"),
+    Scenario('attendance-create', 'post', lambda c: '/api/attendance/', _new_attendance),
+    Scenario('attendance-bulk', 'post', lambda c: '/api/attendance/bulk/', _bulk_attendance),
+    Scenario('attendance-export', 'get', lambda c: '/api/attendance/export/csv/', requests=3),
+    Scenario('charts-page', 'get', lambda c: '/api/charts/'),
+    Scenario('charts-employees-per-department', 'get', lambda c: '/api/charts/employees-per-department/'),
+    Scenario('charts-monthly-attendance', 'get', lambda c: '/api/charts/monthly-attendance/'),
+    Scenario('charts-monthly-attendance-window', 'get',
+             lambda c: f"/api/charts/monthly-attendance/?department_id={c['department'].pk}"
+                       f"&from=2025-02-15&to=2025-05-10"),
+    Scenario('charts-departments', 'get', lambda c: '/api/charts/departments/'),
+    Scenario('charts-dashboard', 'get', lambda c: '/api/charts/dashboard/'),
+    Scenario('charts-cache-stats', 'get', lambda c: '/api/charts/cache-stats/'),
+    Scenario('token-auth', 'post', lambda c: '/api/token/',
+             lambda c: {'username': c['user'].username, 'password': BENCH_PASSWORD}, requests=10),
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API route at several dataset sizes and compare against a baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                            help='Comma-separated attendance row counts to seed.')
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per scenario.')
+        parser.add_argument('--only', default='', help='Comma-separated scenario names to run.')
+        parser.add_argument('--output', default='benchmark_results.json', help='Where to write results.')
+        parser.add_argument('--baseline', default=None, help='Previous results file to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative slowdown/memory growth before flagging.')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Ignore p95 slowdowns smaller than this many milliseconds.')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error when a regression is flagged.')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        only = {name for name in options['only'].split(',') if name}
+        scenarios = [scenario for scenario in SCENARIOS if not only or scenario.name in only]
+
+        self.coverage_checked = False
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = {
+                'meta': {
+                    'created': timezone.now().isoformat(),
+                    'django': django.get_version(),
+                    'python': platform.python_version(),
+                    'database': connection.vendor,
+                    'requests': options['requests'],
+                },
+                'results': {},
+            }
+            for size in sizes:
+                results['results'][str(size)] = self.run_size(size, scenarios, options['requests'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['baseline']:
+            regressions = self.compare(
+                results, options['baseline'], options['tolerance'], options['min_delta_ms']
+            )
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} benchmark regression(s) flagged.')
+
+    def report_coverage(self, context):
+        routes = {
+            'api/' + str(pattern.pattern).lstrip('^')
+            for pattern in employees.urls.urlpatterns + attendance.urls.urlpatterns
+            if 'format' not in str(pattern.pattern)
+        }
+        covered = {resolve(scenario.path(context).split('?')[0]).route for scenario in SCENARIOS}
+        for route in sorted(routes - covered):
+            self.stderr.write(f'Route not covered by any scenario: {route}')
+
+    def seed(self, size):
+        call_command('flush', interactive=False, verbosity=0)
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        days = min(size, 100)
+        call_command(
+            'seed_data', employees=max(1, size // days), days=days, departments=10,
+            batch_size=2000, seed=size, end_date=SEED_END_DATE, stdout=StringIO(),
+        )
+        user = User.objects.create_superuser(username='bench-admin', password=BENCH_PASSWORD)
+        token = Token.objects.get(user=user)
+        employee = Employee.objects.order_by('pk').first()
+        return {
+            'counter': count(1),
+            'user': user,
+            'token': token,
+            'department': employee.department,
+            'employee': employee,
+            'employee_ids': list(Employee.objects.order_by('pk').values_list('pk', flat=True)[:100]),
+            'performance': Performance.objects.filter(employee=employee).first(),
+            'attendance': Attendance.objects.filter(employee=employee).first(),
+        }
+
+    def run_size(self, size, scenarios, default_requests):
+        self.stdout.write(f'Seeding {size} attendance rows...')
+        context = self.seed(size)
+        if not self.coverage_checked:
+            self.report_coverage(context)
+            self.coverage_checked = True
+        client = Client(HTTP_AUTHORIZATION=f"Token {context['token'].key}")
+        measurements = {}
+        for scenario in scenarios:
+            measurements[scenario.name] = self.measure(client, scenario, context, scenario.requests or default_requests)
+            stats = measurements[scenario.name]
+            self.stdout.write(
+                f"  {size:>9} {scenario.name:<34} p50 {stats['p50_ms']:8.2f} ms  "
+                f"p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+                f"{stats['queries']:3d} queries  {stats['peak_kb']:9.1f} KiB  [{stats['status']}]"
+            )
+        return measurements
+
+    def request(self, client, scenario, context):
+        path = scenario.path(context)
+        if scenario.method == 'get':
+            response = client.get(path, secure=True)
+        else:
+            response = client.post(path, data=json.dumps(scenario.data(context)),
+                                   content_type='application/json', secure=True)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, client, scenario, context, requests):
+        self.request(client, scenario, context)  # warm-up
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            self.request(client, scenario, context)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request(client, scenario, context)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'status': response.status_code,
+            'p50_ms': round(percentile(samples, 0.50), 3),
+            'p95_ms': round(percentile(samples, 0.95), 3),
+            'p99_ms': round(percentile(samples, 0.99), 3),
+            'mean_ms': round(statistics.fmean(samples), 3),
+            'queries': len(queries),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, results, baseline_path, tolerance, min_delta_ms=0.0):
+        with open(baseline_path) as handle:
+            baseline = json.load(handle)['results']
+        regressions = []
+        for size, scenarios in results['results'].items():
+            for name, current in scenarios.items():
+                previous = baseline.get(size, {}).get(name)
+                if previous is None:
+                    continue
+                problems = []
+                allowed_p95 = previous['p95_ms'] + max(previous['p95_ms'] * tolerance, min_delta_ms)
+                if current['p95_ms'] > allowed_p95:
+                    problems.append(f"p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+                if current['queries'] > previous['queries']:
+                    problems.append(f"queries {previous['queries']} -> {current['queries']}")
+                if current['peak_kb'] > previous['peak_kb'] * (1 + tolerance):
+                    problems.append(f"peak {previous['peak_kb']} -> {current['peak_kb']} KiB")
+                if problems:
+                    regressions.append((size, name, problems))
+                    self.stderr.write(f"REGRESSION {size} {name}: {'; '.join(problems)}")
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline.'))
+        return regressions
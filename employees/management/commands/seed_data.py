@@ -1,70 +1,130 @@
 """
 Management command to seed the database with fake data.
-Generates departments, employees, attendance for the last 30 days, and three performance reviews per employee.
+Generates departments, employees, daily attendance for the last N days, and three performance
+reviews per employee. Rows are written with bulk_create in batches; fake data can be built
+across a process pool, and a fixed --seed makes the output reproducible (it also pins
+the default --end-date).
 """
-from django.core.management.base import BaseCommand
-from faker import Faker
-import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
-from employees.models import Department, Employee, Performance
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
 from attendance.models import Attendance
+from attendance.rollup import rebuild_rollup
+from employees.cache import invalidate_charts
+from employees.models import Department, Employee, Performance
+from employees.seeding import SEEDED_END_DATE, build_chunk, department_names
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 class Command(BaseCommand):
     help = 'Seed database with departments, employees, attendance, and performance records.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=50, help='Number of employees to create.')
+        parser.add_argument('--days', type=int, default=30, help='Days of attendance per employee.')
+        parser.add_argument('--departments', type=int, default=5, help='Number of departments to use.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Employees generated per chunk and rows per INSERT.')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible output.')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes used to generate fake data.')
+        parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                            help=f'Last attendance date (YYYY-MM-DD); defaults to {SEEDED_END_DATE} '
+                                 'with --seed, so seeded runs are reproducible, and to today without.')
+
     def handle(self, *args, **options):
-        fake = Faker()
+        employee_total = options['employees']
+        days = options['days']
+        batch_size = options['batch_size']
+        workers = options['workers']
+        end_date = options['end_date']
+        if end_date is None:
+            end_date = SEEDED_END_DATE if options['seed'] is not None else date.today()
+        if min(employee_total, days, options['departments'], batch_size, workers) < 1:
+            raise CommandError('--employees, --days, --departments, --batch-size and --workers must be positive.')
+
+        started = time.perf_counter()
         # Create or fetch predefined departments
-        department_names = ['HR', 'Engineering', 'Sales', 'Marketing', 'Finance']
         departments = [
             Department.objects.get_or_create(name=name)[0]
-            for name in department_names
+            for name in department_names(options['departments'])
         ]
 
-        # Create employees with assigned departments
-        employees = []
-        for _ in range(50):
-            department = random.choice(departments)
-            employee = Employee.objects.create(
-                name=fake.name(),
-                email=fake.unique.email(),
-                phone_number=fake.phone_number(),
-                address=fake.address(),
-                date_of_joining=fake.date_between(start_date='-5y', end_date='today'),
-                department=department
-            )
-            employees.append(employee)
-
-        # Generate attendance entries for each employee over the past 30 days
-        for employee in employees:
-            for days_ago in range(30):
-                entry_date = date.today() - timedelta(days=days_ago)
-                status = random.choices(
-                    population=['P', 'A', 'L'],
-                    weights=[0.8, 0.1, 0.1],
-                    k=1
-                )[0]
-                Attendance.objects.create(
-                    employee=employee,
-                    date=entry_date,
-                    status=status
-                )
-
-        # Create three performance reviews per employee
-        for employee in employees:
-            for _ in range(3):
-                review_date = fake.date_between(
-                    start_date=employee.date_of_joining,
-                    end_date='today'
-                )
-                rating = random.randint(1, 5)
-                Performance.objects.create(
-                    employee=employee,
-                    rating=rating,
-                    review_date=review_date
-                )
+        # Numbering continues after existing employees so generated emails stay unique.
+        first_number = Employee.objects.count()
+        chunks = [
+            (options['seed'], index, first_number + start, min(batch_size, employee_total - start),
+             len(departments), days, end_date)
+            for index, start in enumerate(range(0, employee_total, batch_size))
+        ]
 
+        counts = {'employees': 0, 'attendance': 0, 'performance': 0}
+        if workers == 1:
+            for chunk in chunks:
+                self.write_chunk(build_chunk(*chunk), departments, end_date, batch_size, counts)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Submit a bounded window of chunks so generated data never piles up in memory.
+                for window in batched(chunks, workers * 2):
+                    for employees in executor.map(build_chunk, *zip(*window)):
+                        self.write_chunk(employees, departments, end_date, batch_size, counts)
+
+        # bulk_create skips model signals, so refresh derived data once at the end.
+        rebuild_rollup()
+        for model_name in ('Department', 'Employee', 'Attendance'):
+            invalidate_charts(model_name)
+
+        elapsed = time.perf_counter() - started
+        rows = sum(counts.values())
+        self.stdout.write(
+            f"Created {counts['employees']} employees, {counts['attendance']} attendance records "
+            f"and {counts['performance']} reviews in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/sec)."
+        )
         self.stdout.write(
             self.style.SUCCESS('Database seeding completed successfully.')
         )
+
+    def write_chunk(self, employees, departments, end_date, batch_size, counts):
+        with transaction.atomic():
+            created = Employee.objects.bulk_create(
+                [
+                    Employee(
+                        name=data['name'],
+                        email=data['email'],
+                        phone_number=data['phone_number'],
+                        address=data['address'],
+                        date_of_joining=data['date_of_joining'],
+                        department=departments[data['department_index']],
+                    )
+                    for data in employees
+                ],
+                batch_size=batch_size,
+            )
+            counts['employees'] += len(created)
+
+            # Generate attendance entries for each employee, going back from end_date
+            attendance = (
+                Attendance(employee_id=employee.pk, date=end_date - timedelta(days=days_ago), status=status)
+                for employee, data in zip(created, employees)
+                for days_ago, status in enumerate(data['statuses'])
+            )
+            for batch in batched(attendance, batch_size):
+                counts['attendance'] += len(Attendance.objects.bulk_create(batch))
+
+            reviews = [
+                Performance(employee_id=employee.pk, rating=rating, review_date=review_date)
+                for employee, data in zip(created, employees)
+                for review_date, rating in data['reviews']
+            ]
+            counts['performance'] += len(Performance.objects.bulk_create(reviews, batch_size=batch_size))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_alter_employee_phone_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['department', 'id'], name='employee_dept_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['date_of_joining', 'id'], name='employee_joined_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['name', 'id'], name='employee_name_id_idx'),
+        ),
+        # Drop the single-column FK index only once employee_dept_id_idx can take over.
+        migrations.AlterField(
+            model_name='employee',
+            name='department',
+            field=models.ForeignKey(db_index=False, help_text='Department to which the employee belongs', on_delete=django.db.models.deletion.CASCADE, related_name='employees', to='employees.department'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The vector is built in the database so every write path, bulk_create and raw SQL
+# included, keeps it current. Email is indexed whole and split into its parts so that
+# prefixes of the local part and the domain match too.
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION employees_employee_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B') ||
+        setweight(to_tsvector('simple', translate(coalesce(NEW.email, ''), '@.+-_', '     ')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employees_employee_search_vector_trg
+    BEFORE INSERT OR UPDATE OF name, email ON employees_employee
+    FOR EACH ROW EXECUTE PROCEDURE employees_employee_search_vector();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS employees_employee_search_vector_trg ON employees_employee;
+DROP FUNCTION IF EXISTS employees_employee_search_vector();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_TRIGGER)
+    # Assigning name to itself fires the trigger for existing rows.
+    schema_editor.execute('UPDATE employees_employee SET name = name')
+    schema_editor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS employee_search_vector_idx '
+        'ON employees_employee USING gin (search_vector)'
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS employee_search_vector_idx')
+    schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('employees', '0003_employee_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, help_text='Full-text vector of name and email, maintained by a database trigger', null=True
+            ),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_employees(apps, schema_editor):
+    Department = apps.get_model('employees', 'Department')
+    Employee = apps.get_model('employees', 'Employee')
+    actual = (
+        Employee.objects.filter(department=OuterRef('pk'))
+        .order_by().values('department').annotate(total=Count('pk')).values('total')
+    )
+    Department.objects.using(schema_editor.connection.alias).update(
+        employee_count=Coalesce(Subquery(actual), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='employee_count',
+            field=models.PositiveIntegerField(
+                default=0, editable=False,
+                help_text='Number of employees in the department, maintained on every employee write'
+            ),
+        ),
+        migrations.RunPython(count_employees, migrations.RunPython.noop),
+    ]
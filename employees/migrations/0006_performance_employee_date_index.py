@@ -0,0 +1,24 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_department_employee_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['employee', 'review_date', 'id'], name='performance_emp_date_idx'),
+        ),
+        # Drop the single-column FK index only once performance_emp_date_idx can take over.
+        migrations.AlterField(
+            model_name='performance',
+            name='employee',
+            field=models.ForeignKey(db_index=False, help_text='Employee under review', on_delete=django.db.models.deletion.CASCADE, related_name='performances', to='employees.employee'),
+        ),
+    ]
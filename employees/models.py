@@ -2,7 +2,22 @@
 Models defining Employee domain entities: Department, Employee, and Performance.
 Each model encapsulates distinct data and relationships.
 """
-from django.db import models
+from collections import Counter
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+
+# Sent by EmployeeQuerySet after bulk_create(), delete() and department-changing update() /
+# bulk_update(), which bypass post_save or send post_delete row by row. Receivers get
+# ``employee_ids`` and ``department_changed`` (True when the rows may have moved between
+# departments).
+employees_bulk_written = Signal()
+# Sent by Performance.delete() and PerformanceQuerySet.delete(). A post_delete receiver
+# would make every Employee cascade load and delete the reviews one batch at a time.
+performances_deleted = Signal()
 
 
 class Department(models.Model):
@@ -12,11 +27,109 @@ class Department(models.Model):
         unique=True,
         help_text="Name of the department"
     )
+    employee_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of employees in the department, maintained on every employee write"
+    )
 
     def __str__(self) -> str:
         return self.name
 
 
+def adjust_employee_counts(deltas, using='default'):
+    """Apply ``{department_id: change}`` to Department.employee_count in one F() update."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta and pk is not None}
+    if not deltas:
+        return
+    Department.objects.using(using).filter(pk__in=deltas).update(
+        employee_count=F('employee_count') + Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            default=Value(0),
+        )
+    )
+
+
+def recount_employee_counts(department_ids=None, using='default'):
+    """
+    Set employee_count from the Employee table, for the given departments or all of them.
+    Returns the number of departments updated.
+    """
+    departments = Department.objects.using(using).all()
+    if department_ids is not None:
+        departments = departments.filter(pk__in=department_ids)
+    actual = (
+        Employee.objects.filter(department=OuterRef('pk'))
+        .order_by().values('department').annotate(total=Count('pk')).values('total')
+    )
+    return departments.update(employee_count=Coalesce(Subquery(actual), Value(0)))
+
+
+class EmployeeQuerySet(models.QuerySet):
+    """
+    Keeps Department.employee_count current on bulk writes, which skip model signals.
+    Single-object saves and deletes are handled by receivers in signals.py.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Which rows were actually inserted is unknown; recount the departments involved.
+                recount_employee_counts({obj.department_id for obj in objs}, using=self.db)
+            else:
+                adjust_employee_counts(Counter(obj.department_id for obj in created), using=self.db)
+            employees_bulk_written.send(
+                sender=self.model, employee_ids=[obj.pk for obj in created if obj.pk is not None],
+                department_changed=False, using=self.db,
+            )
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # Counts are fixed up by update(), which bulk_update() runs per batch.
+        objs = list(objs)
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        for obj in objs:
+            obj._loaded_department_id = obj.department_id
+        return updated
+
+    def update(self, **kwargs):
+        if not {'department', 'department_id'} & set(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(self.order_by().values_list('pk', 'department_id'))
+            affected = {department_id for _, department_id in rows}
+            updated = super().update(**kwargs)
+            target = kwargs.get('department_id', kwargs.get('department'))
+            target = getattr(target, 'pk', target)
+            if isinstance(target, int):
+                recount_employee_counts(affected | {target}, using=self.db)
+            else:
+                # An expression, e.g. bulk_update()'s CASE, may move rows to any department.
+                recount_employee_counts(using=self.db)
+            employees_bulk_written.send(
+                sender=self.model, employee_ids=[pk for pk, _ in rows],
+                department_changed=True, using=self.db,
+            )
+        return updated
+
+    def delete(self):
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(self.order_by().values_list('pk', 'department_id'))
+            result = super().delete()
+            removed = Counter(department_id for _, department_id in rows)
+            adjust_employee_counts({pk: -total for pk, total in removed.items()}, using=self.db)
+            employees_bulk_written.send(
+                sender=self.model, employee_ids=[pk for pk, _ in rows],
+                department_changed=False, using=self.db,
+            )
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Employee(models.Model):
     """Model representing an employee with personal and departmental details."""
     name = models.CharField(
@@ -41,19 +154,64 @@ class Employee(models.Model):
         Department,
         on_delete=models.CASCADE,
         related_name='employees',
+        db_index=False,  # employee_dept_id_idx leads with department_id
         help_text="Department to which the employee belongs"
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text vector of name and email, maintained by a database trigger"
+    )
+
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        # Matched to EmployeeViewSet: department__id / date_of_joining filters and name /
+        # date_of_joining ordering, each with id as the cursor tiebreaker. The GIN index
+        # and trigger behind search_vector are PostgreSQL-only and live in migration 0004.
+        indexes = [
+            models.Index(fields=['department', 'id'], name='employee_dept_id_idx'),
+            models.Index(fields=['date_of_joining', 'id'], name='employee_joined_id_idx'),
+            models.Index(fields=['name', 'id'], name='employee_name_id_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded department so receivers can detect department changes.
+        instance._loaded_department_id = instance.__dict__.get('department_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        # post_save adjusts Department.employee_count; keep it in the same transaction.
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_department_id = self.department_id
 
     def __str__(self) -> str:
         return f"{self.name} ({self.department.name})"
 
 
+class PerformanceQuerySet(models.QuerySet):
+    """Sends performances_deleted after a queryset delete()."""
+
+    def delete(self):
+        result = super().delete()
+        performances_deleted.send(sender=self.model, using=self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Performance(models.Model):
     """Model capturing performance review entries for employees."""
     employee = models.ForeignKey(
         Employee,
         on_delete=models.CASCADE,
         related_name='performances',
+        db_index=False,
         help_text="Employee under review"
     )
     rating = models.PositiveSmallIntegerField(
@@ -64,5 +222,19 @@ class Performance(models.Model):
         help_text="Date when the performance review was conducted"
     )
 
+    objects = PerformanceQuerySet.as_manager()
+
+    class Meta:
+        # The analytics windows partition by employee and order by review date; the index
+        # also serves employee_id lookups in place of the foreign key's own index.
+        indexes = [
+            models.Index(fields=['employee', 'review_date', 'id'], name='performance_emp_date_idx'),
+        ]
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        performances_deleted.send(sender=type(self), using=kwargs.get('using') or self._state.db)
+        return result
+
     def __str__(self) -> str:
         return f"{self.employee.name}: {self.rating} on {self.review_date}"
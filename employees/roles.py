@@ -0,0 +1,55 @@
+"""
+Role resolution for users.
+Group names are loaded with one query, memoized on the user object for the rest of the
+request and shared across requests through a process-level TTL cache. The receivers in
+employees/signals.py clear entries when group membership changes.
+"""
+from django.conf import settings
+
+from .cache import TTLCache
+
+_group_names = TTLCache(
+    ttl=getattr(settings, 'ROLE_CACHE_TTL', 60),
+    maxsize=getattr(settings, 'ROLE_CACHE_MAX_SIZE', 10000),
+)
+
+
+def get_group_names(user):
+    """Return the frozenset of group names for ``user`` (empty for anonymous users)."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    names = getattr(user, '_group_names', None)
+    if names is None:
+        names = _group_names.get(user.pk)
+        if names is None:
+            names = frozenset(user.groups.values_list('name', flat=True))
+            _group_names.set(user.pk, names)
+        user._group_names = names
+    return names
+
+
+async def aget_group_names(user):
+    """Async form of get_group_names; sets the same per-user memo."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    names = getattr(user, '_group_names', None)
+    if names is None:
+        names = _group_names.get(user.pk)
+        if names is None:
+            names = frozenset([name async for name in user.groups.values_list('name', flat=True)])
+            _group_names.set(user.pk, names)
+        user._group_names = names
+    return names
+
+
+def has_role(user, role):
+    return role in get_group_names(user)
+
+
+def forget_roles(user_ids=None):
+    """Drop cached group names for ``user_ids``, or for everyone when omitted."""
+    if user_ids is None:
+        _group_names.clear()
+        return
+    for user_id in user_ids:
+        _group_names.delete(user_id)
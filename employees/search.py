@@ -0,0 +1,85 @@
+"""
+Employee search.
+
+On PostgreSQL, ?search= is answered from ``Employee.search_vector`` (kept current by a
+trigger, see migration 0004) through its GIN index, with every term treated as a prefix
+so "ann sm" finds "Anna Smith". On other databases it falls back to SearchFilter's
+icontains over ``search_fields``. ``ranked_matches`` backs the typeahead endpoint.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from rest_framework import filters
+
+# Must match the configuration the trigger builds the vector with.
+SEARCH_CONFIG = 'simple'
+# Only this many matches are ranked, so one- and two-letter prefixes stay fast at scale.
+RANK_CANDIDATES = 1000
+
+_LEXEME = re.compile(r'[^\W_]+')
+
+
+def prefix_tsquery(terms):
+    """Build a raw tsquery matching every word of ``terms`` as a prefix, e.g. 'ann':* & 'sm':*."""
+    lexemes = [lexeme.lower() for term in terms for lexeme in _LEXEME.findall(term)]
+    return ' & '.join(f"'{lexeme}':*" for lexeme in lexemes)
+
+
+def uses_full_text(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def _search_query(terms):
+    tsquery = prefix_tsquery(terms)
+    return SearchQuery(tsquery, search_type='raw', config=SEARCH_CONFIG) if tsquery else None
+
+
+class EmployeeSearchFilter(filters.SearchFilter):
+    """SearchFilter that uses the full-text index on PostgreSQL."""
+
+    search_description = (
+        'On PostgreSQL, matches employees whose name or email contains a word starting with each '
+        'term ("ann sm" finds "Anna Smith", "son" does not find "Johnson"). On other databases, '
+        'matches each term as a case-insensitive substring of the name or email.'
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not uses_full_text(queryset):
+            return super().filter_queryset(request, queryset, view)
+        query = _search_query(terms)
+        if query is None:
+            return queryset.none()
+        return queryset.filter(search_vector=query)
+
+
+def ranked_matches(queryset, text):
+    """
+    Employees matching the typeahead ``text``, best match first. Name matches outrank
+    email matches; ties are broken by name and id so results are stable between keystrokes.
+    """
+    terms = text.split()
+    if not terms:
+        return queryset.none()
+
+    if uses_full_text(queryset):
+        query = _search_query(terms)
+        if query is None:
+            return queryset.none()
+        candidates = queryset.filter(search_vector=query).values('pk')[:RANK_CANDIDATES]
+        return (
+            queryset.filter(pk__in=candidates)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', 'name', 'id')
+        )
+
+    for term in terms:
+        queryset = queryset.filter(Q(name__icontains=term) | Q(email__icontains=term))
+    return queryset.annotate(rank=Case(
+        When(name__istartswith=terms[0], then=Value(2)),
+        When(email__istartswith=terms[0], then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )).order_by('-rank', 'name', 'id')
@@ -0,0 +1,64 @@
+"""
+Fake data generation for the seed_data command.
+Kept free of model imports so chunks can be built in worker processes. Each chunk gets
+its own seed derived from the run seed and chunk index, so the output does not depend on
+how many workers are used.
+"""
+import random
+from datetime import date, timedelta
+
+from faker import Faker
+
+DEFAULT_DEPARTMENT_NAMES = ['HR', 'Engineering', 'Sales', 'Marketing', 'Finance']
+ATTENDANCE_STATUSES = ['P', 'A', 'L']
+ATTENDANCE_WEIGHTS = [0.8, 0.1, 0.1]
+REVIEWS_PER_EMPLOYEE = 3
+# Last attendance date of seeded runs, so a given --seed always produces the same rows.
+SEEDED_END_DATE = date(2025, 1, 31)
+
+_fake = None
+
+
+def department_names(count):
+    names = DEFAULT_DEPARTMENT_NAMES[:count]
+    names += [f'Department {number}' for number in range(len(names) + 1, count + 1)]
+    return names
+
+
+def _worker_faker():
+    # One Faker per process; constructing it is far more expensive than reseeding it.
+    global _fake
+    if _fake is None:
+        _fake = Faker()
+    return _fake
+
+
+def build_chunk(seed, chunk_index, first_number, count, department_count, days, end_date):
+    """
+    Build ``count`` employees numbered from ``first_number`` as plain dicts.
+    Each dict carries its attendance as a string of status codes, one per day going back
+    from ``end_date``, and its performance reviews as (review_date, rating) pairs.
+    """
+    chunk_seed = None if seed is None else seed * 1_000_003 + chunk_index
+    fake = _worker_faker()
+    fake.seed_instance(chunk_seed)
+    rng = random.Random(chunk_seed)
+    earliest_joining = end_date - timedelta(days=5 * 365)
+
+    employees = []
+    for number in range(first_number, first_number + count):
+        joined = fake.date_between(start_date=earliest_joining, end_date=end_date)
+        employees.append({
+            'name': fake.name(),
+            'email': f'{fake.user_name()}.{number}@{fake.free_email_domain()}',
+            'phone_number': fake.phone_number(),
+            'address': fake.address(),
+            'date_of_joining': joined,
+            'department_index': rng.randrange(department_count),
+            'statuses': ''.join(rng.choices(ATTENDANCE_STATUSES, weights=ATTENDANCE_WEIGHTS, k=days)),
+            'reviews': [
+                (fake.date_between(start_date=joined, end_date=end_date), rng.randint(1, 5))
+                for _ in range(REVIEWS_PER_EMPLOYEE)
+            ],
+        })
+    return employees
@@ -2,21 +2,161 @@
 Serializers for Employee domain models.
 Handles validation and conversion between model instances and JSON payloads.
 """
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from .models import Department, Employee, Performance
 
 
 class DepartmentSerializer(serializers.ModelSerializer):
-    """Serializer for Department objects."""
+    """
+    Serializer for Department objects. ``employee_count`` is only included when the
+    context sets ``include_employee_count``.
+    """
     class Meta:
         model = Department
-        fields = ['id', 'name']
+        fields = ['id', 'name', 'employee_count']
+        read_only_fields = ['employee_count']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('include_employee_count'):
+            fields.pop('employee_count')
+        return fields
+
+
+MAX_BULK_EMPLOYEES = 1000
+BULK_BATCH_SIZE = 500
+
+
+def parse_pk(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def payload_ids(data):
+    """The valid integer ``id`` values of the objects in a bulk payload."""
+    if not isinstance(data, list):
+        return set()
+    ids = (parse_pk(item.get('id')) for item in data if isinstance(item, dict))
+    return {pk for pk in ids if pk is not None}
+
+
+class DepartmentIdField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that, under EmployeeListSerializer, reads departments from the
+    list's ``in_bulk`` lookup instead of running a query per item.
+    """
+
+    def to_internal_value(self, data):
+        departments = getattr(self.root, 'departments', None)
+        if departments is None:
+            return super().to_internal_value(data)
+        pk = parse_pk(data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in departments:
+            self.fail('does_not_exist', pk_value=data)
+        return departments[pk]
+
+
+class EmployeeListSerializer(serializers.ListSerializer):
+    """
+    Bulk create and partial update for ``EmployeeSerializer(many=True)``.
+
+    Departments are resolved with one ``in_bulk`` query and emails are checked with one
+    query per batch instead of lookups per item. For updates, ``instance`` holds the
+    employees to change and every item carries its ``id``. Errors are reported per item in
+    payload order, and nothing is written unless every item is valid.
+    """
+    departments = None
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or (self.max_length is not None and len(data) > self.max_length):
+            # ListSerializer reports malformed and oversized payloads.
+            return super().to_internal_value(data)
+
+        items = [item if isinstance(item, dict) else {} for item in data]
+        self.departments = Department.objects.in_bulk(
+            {pk for pk in (parse_pk(item.get('department_id')) for item in items) if pk is not None}
+        )
+        self.instances = {employee.pk: employee for employee in self.instance or ()}
+        self.targets = []
+        validated, errors = [], []
+        for item in data:
+            try:
+                validated.append(self.run_child_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                errors.append(exc.detail)
+            finally:
+                self.child.instance = None
+        self.check_emails(items, validated, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        pk = parse_pk(data.get('id')) if isinstance(data, dict) else None
+        target = self.instances.pop(pk, None)
+        self.targets.append(target)
+        if target is None:
+            # Popped above, so a repeated id is reported like an unknown one.
+            raise serializers.ValidationError({'id': ['Unknown, missing or repeated employee id.']})
+        self.child.instance = target
+        return super().run_child_validation(data)
+
+    def check_emails(self, items, validated, errors):
+        """Reject emails taken by other employees or repeated in the batch, with one query."""
+        emails = [attrs.get('email') if attrs else None for attrs in validated]
+        owners = dict(
+            Employee.objects.filter(email__in={email for email in emails if email})
+            .values_list('email', 'pk')
+        )
+        field = Employee._meta.get_field('email')
+        taken = field.error_messages['unique'] % {
+            'model_name': Employee._meta.verbose_name, 'field_label': field.verbose_name,
+        }
+        seen = set()
+        for index, email in enumerate(emails):
+            if not email:
+                continue
+            own_pk = self.targets[index].pk if self.targets else None
+            if email in seen:
+                errors[index] = {**errors[index], 'email': ['Duplicate email in this batch.']}
+            elif owners.get(email, own_pk) != own_pk:
+                errors[index] = {**errors[index], 'email': [taken]}
+            seen.add(email)
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            return Employee.objects.bulk_create(
+                [Employee(**attrs) for attrs in validated_data], batch_size=BULK_BATCH_SIZE
+            )
+
+    def update(self, instance, validated_data):
+        fields = set()
+        for employee, attrs in zip(self.targets, validated_data):
+            for field, value in attrs.items():
+                setattr(employee, field, value)
+                fields.add(field)
+        if fields:
+            with transaction.atomic():
+                Employee.objects.bulk_update(self.targets, sorted(fields), batch_size=BULK_BATCH_SIZE)
+        return self.targets
 
 
 class EmployeeSerializer(serializers.ModelSerializer):
     """Serializer for Employee objects, including nested department name."""
     department = DepartmentSerializer(read_only=True)
-    department_id = serializers.PrimaryKeyRelatedField(
+    department_id = DepartmentIdField(
         queryset=Department.objects.all(),
         source='department',
         write_only=True,
@@ -30,6 +170,17 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'address', 'date_of_joining',
             'department', 'department_id'
         ]
+        list_serializer_class = EmployeeListSerializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if isinstance(self.parent, EmployeeListSerializer):
+            # EmployeeListSerializer.check_emails covers the whole batch in one query.
+            fields['email'].validators = [
+                validator for validator in fields['email'].validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
 
 
 class PerformanceSerializer(serializers.ModelSerializer):
@@ -46,3 +197,45 @@ class PerformanceSerializer(serializers.ModelSerializer):
         model = Performance
         fields = ['id', 'employee', 'employee_id', 'rating', 'review_date']
 
+
+
+# ----------------------
+# Read-only fast path
+# ----------------------
+# List/retrieve responses are built from values() rows by the functions below instead of
+# the serializers above. The output must stay identical to EmployeeSerializer and
+# PerformanceSerializer, so keep both in sync when fields change.
+
+EMPLOYEE_VALUES = (
+    'id', 'name', 'email', 'phone_number', 'address', 'date_of_joining',
+    'department_id', 'department__name',
+)
+PERFORMANCE_VALUES = ('id', 'rating', 'review_date') + tuple(
+    f'employee__{field}' for field in EMPLOYEE_VALUES
+)
+
+
+def employee_row(row, prefix=''):
+    """Representation of an Employee from a values() row, as EmployeeSerializer renders it."""
+    return {
+        'id': row[prefix + 'id'],
+        'name': row[prefix + 'name'],
+        'email': row[prefix + 'email'],
+        'phone_number': row[prefix + 'phone_number'],
+        'address': row[prefix + 'address'],
+        'date_of_joining': row[prefix + 'date_of_joining'].isoformat(),
+        'department': {
+            'id': row[prefix + 'department_id'],
+            'name': row[prefix + 'department__name'],
+        },
+    }
+
+
+def performance_row(row):
+    """Representation of a Performance from a values() row, as PerformanceSerializer renders it."""
+    return {
+        'id': row['id'],
+        'employee': employee_row(row, prefix='employee__'),
+        'rating': row['rating'],
+        'review_date': row['review_date'].isoformat(),
+    }
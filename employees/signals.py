@@ -1,9 +1,85 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group, User
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+from attendance.models import Attendance, attendance_bulk_written
+from .authentication import forget_tokens
+from .cache import invalidate_charts
+from .models import (
+    Department, Employee, Performance, adjust_employee_counts, employees_bulk_written, performances_deleted
+)
+from .roles import forget_roles
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.get_or_create(user=instance)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_tokens(key=instance.key)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, **kwargs):
+    # Covers deactivation as well as any other change to the cached user row.
+    forget_tokens(user_id=instance.pk)
+
+
+@receiver(post_save, sender=Employee)
+def count_saved_employee(sender, instance, created=False, using='default', **kwargs):
+    if created:
+        adjust_employee_counts({instance.department_id: 1}, using=using)
+        return
+    loaded_department_id = getattr(instance, '_loaded_department_id', None)
+    if loaded_department_id not in (None, instance.department_id):
+        adjust_employee_counts({loaded_department_id: -1, instance.department_id: 1}, using=using)
+
+
+@receiver(post_delete, sender=Employee)
+def count_deleted_employee(sender, instance, origin=None, using='default', **kwargs):
+    # EmployeeQuerySet.delete() adjusts counts once per department, and rows deleted
+    # along with their department need no adjustment.
+    if isinstance(origin, (QuerySet, Department)):
+        return
+    adjust_employee_counts({instance.department_id: -1}, using=using)
+
+
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Employee)
+@receiver(post_save, sender=Performance)
+@receiver(post_save, sender=Attendance)
+def invalidate_chart_cache(sender, **kwargs):
+    invalidate_charts(sender.__name__)
+
+
+# Attendance and Performance deletes arrive through these instead of post_delete, so that
+# cascades stay single DELETEs. Their charts also depend on Employee, which covers cascades.
+@receiver(attendance_bulk_written)
+@receiver(employees_bulk_written)
+@receiver(performances_deleted)
+def invalidate_chart_cache_on_bulk_write(sender, **kwargs):
+    invalidate_charts(sender.__name__)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def forget_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        instance.__dict__.pop('_group_names', None)
+        forget_roles([instance.pk])
+    elif pk_set is not None:
+        forget_roles(pk_set)
+    else:
+        # group.user_set.clear(): the affected users are not listed.
+        forget_roles()
+
+
+@receiver([post_save, post_delete], sender=Group)
+def forget_roles_on_group_rename(sender, **kwargs):
+    forget_roles()
@@ -1,8 +1,42 @@
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework import status
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.models import Session
 from rest_framework.authtoken.models import Token
 from employees.models import Department, Employee, Performance
+from employees.roles import forget_roles
+from employees.serializers import EmployeeSerializer, PerformanceSerializer
+from employees.seeding import SEEDED_END_DATE
+from rest_framework.renderers import JSONRenderer
+from datetime import date
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from employees.views import is_employee, is_hr
+from attendance.models import Attendance, AttendanceMonthlyRollup
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from io import StringIO
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock, skipUnless
+from django.db.utils import load_backend
+from employee_project import db_router
+from employee_project.db_pool import ConnectionPool, PoolTimeout, close_pools, pool_stats
+from employee_project.db_router import ReplicaRouter
+from employee_project.log import QueuedFileHandler
+from employee_project.middleware import QueryBudgetExceeded, ReplicaRoutingMiddleware, fingerprint, resolve_budget
+from employees.views import DepartmentViewSet, EmployeeViewSet, current_user_view, department_list
+from jobs.views import JobViewSet
+from employees.search import prefix_tsquery
+from employees.authentication import CachingTokenAuthentication, aauthenticate
+from asgiref.sync import async_to_sync
 
 
 
@@ -51,6 +85,105 @@ class EmployeeAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class EmployeeBulkAPITests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.departments = [Department.objects.create(name=f'Dept {n}') for n in range(3)]
+
+    def item(self, number, department):
+        return {
+            'name': f'Hire {number}', 'email': f'hire{number}@example.com', 'phone_number': '1',
+            'address': 'A', 'date_of_joining': '2024-01-01', 'department_id': department.id,
+        }
+
+    def test_bulk_create_runs_constant_queries(self):
+        self.client.get('/api/employees/')  # warm the token cache
+        payload = [self.item(n, self.departments[n % 3]) for n in range(60)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/employees/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 60)
+        self.assertEqual(response.data[1]['department'], {'id': self.departments[1].id, 'name': 'Dept 1'})
+        self.assertLessEqual(len(queries), 8)
+        self.assertEqual(
+            list(Department.objects.order_by('id').values_list('employee_count', flat=True)), [20, 20, 20]
+        )
+
+    def test_bulk_create_reports_item_errors_and_writes_nothing(self):
+        Employee.objects.create(
+            name='Existing', email='taken@example.com', phone_number='1', address='A',
+            date_of_joining='2024-01-01', department=self.departments[0]
+        )
+        payload = [
+            self.item(1, self.departments[0]),
+            {**self.item(2, self.departments[0]), 'department_id': 999999},
+            {**self.item(3, self.departments[0]), 'email': 'taken@example.com'},
+            {**self.item(4, self.departments[0]), 'email': 'hire1@example.com'},
+        ]
+        response = self.client.post('/api/employees/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.assertIn('department_id', response.data['errors'][0]['errors'])
+        self.assertIn('already exists', str(response.data['errors'][1]['errors']['email'][0]))
+        self.assertIn('Duplicate', str(response.data['errors'][2]['errors']['email'][0]))
+        self.assertEqual(Employee.objects.count(), 1)
+
+    def test_bulk_partial_update(self):
+        created = self.client.post(
+            '/api/employees/', [self.item(n, self.departments[0]) for n in range(3)], format='json'
+        ).data
+        attendance = Attendance.objects.create(employee_id=created[0]['id'], date='2025-01-02', status='P')
+        payload = [
+            {'id': created[0]['id'], 'department_id': self.departments[2].id},
+            {'id': created[1]['id'], 'name': 'Renamed', 'email': created[1]['email']},
+        ]
+        response = self.client.patch('/api/employees/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['department']['id'], self.departments[2].id)
+        self.assertEqual(Employee.objects.get(pk=created[1]['id']).name, 'Renamed')
+        self.assertEqual(
+            list(Department.objects.order_by('id').values_list('employee_count', flat=True)), [2, 0, 1]
+        )
+        self.assertEqual(
+            AttendanceMonthlyRollup.objects.get(employee_id=attendance.employee_id).department_id,
+            self.departments[2].id
+        )
+
+        response = self.client.patch('/api/employees/', [
+            {'id': created[2]['id'], 'email': created[0]['email']},
+            {'id': 999999, 'name': 'Ghost'},
+            {'id': created[2]['id'], 'name': 'Twice'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1, 2])
+
+    def test_bulk_delete(self):
+        created = self.client.post(
+            '/api/employees/', [self.item(n, self.departments[n % 2]) for n in range(4)], format='json'
+        ).data
+        ids = [employee['id'] for employee in created]
+        response = self.client.delete('/api/employees/', [ids[0], 999999], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [{'index': 1, 'errors': {'id': ['Unknown employee id.']}}])
+
+        response = self.client.delete('/api/employees/', ids[:3], format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Employee.objects.values_list('pk', flat=True)), [ids[3]])
+        self.assertEqual(
+            list(Department.objects.order_by('id').values_list('employee_count', flat=True)), [0, 1, 0]
+        )
+
+    def test_bulk_writes_require_admin(self):
+        user = User.objects.create_user(username='staffless', password='pass')
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/employees/', [self.item(1, self.departments[0])], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete('/api/employees/', [1], format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+
+
 class PerformanceAPITests(APITestCase):
     def setUp(self):
         self.admin = User.objects.create_superuser(username='admin', password='adminpass')
@@ -75,3 +208,995 @@ class PerformanceAPITests(APITestCase):
         Performance.objects.create(employee=self.employee, rating=5, review_date='2023-05-01')
         response = self.client.get('/api/performances/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class PerformanceAnalyticsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(self.admin)
+        self.qa = Department.objects.create(name='QA')
+        self.ops = Department.objects.create(name='Ops')
+        self.eve = Employee.objects.create(
+            name='Eve', email='eve@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.qa
+        )
+        self.bob = Employee.objects.create(
+            name='Bob', email='bob@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.qa
+        )
+        self.ann = Employee.objects.create(
+            name='Ann', email='ann@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.ops
+        )
+        for employee, rating, review_date in [
+            (self.eve, 2, '2024-01-10'), (self.eve, 4, '2024-01-20'), (self.bob, 5, '2024-02-05'),
+            (self.eve, 3, '2024-04-01'), (self.ann, 1, '2024-02-01'),
+        ]:
+            Performance.objects.create(employee=employee, rating=rating, review_date=review_date)
+
+    def test_latest_review_per_employee(self):
+        response = self.client.get('/api/performances/latest/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['employee']['name'], row['review_date']) for row in response.data],
+            [('Eve', '2024-04-01'), ('Bob', '2024-02-05'), ('Ann', '2024-02-01')]
+        )
+        response = self.client.get('/api/performances/latest/', {'department_id': self.ops.id})
+        self.assertEqual([row['rating'] for row in response.data], [1])
+
+    def test_rolling_trends_by_department_and_employee(self):
+        response = self.client.get('/api/performances/trends/', {'window': 2, 'department_id': self.qa.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': self.qa.id, 'name': 'QA', 'periods': [
+            {'period': '2024-01', 'average': 3.0, 'reviews': 2, 'rolling_average': 3.0},
+            {'period': '2024-02', 'average': 5.0, 'reviews': 1, 'rolling_average': 3.67},
+            # March has no reviews, so the two-month window holds April alone.
+            {'period': '2024-04', 'average': 3.0, 'reviews': 1, 'rolling_average': 3.0},
+        ]}])
+
+        response = self.client.get('/api/performances/trends/', {'by': 'employee', 'employee_id': self.eve.id})
+        periods = response.data['results'][0]['periods']
+        self.assertEqual([period['rolling_average'] for period in periods], [3.0, 3.0])
+
+        for params in ({'by': 'team'}, {'window': '0'}, {'department_id': 'qa'}, {'department_id': '²'},
+                       {'department_id': '-1'}):
+            response = self.client.get('/api/performances/trends/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_histogram_per_period(self):
+        response = self.client.get('/api/performances/histogram/', {'period': 'quarter'})
+        self.assertEqual(response.data['labels'], ['2024-01-01', '2024-04-01'])
+        self.assertEqual(response.data['counts'], {
+            '1': [1, 0], '2': [1, 0], '3': [0, 1], '4': [1, 0], '5': [1, 0],
+        })
+
+    def test_results_are_memoized_until_reviews_change(self):
+        self.client.get('/api/performances/histogram/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/performances/histogram/')
+        # Only the max id / date / count stamp is read.
+        self.assertEqual(len(queries), 1)
+
+        # Rows inserted without signals still change the stamp.
+        Performance.objects.bulk_create([Performance(employee=self.ann, rating=5, review_date='2024-05-01')])
+        response = self.client.get('/api/performances/histogram/', {'period': 'year'})
+        self.assertEqual(response.data['counts']['5'], [2])
+        review = Performance.objects.get(employee=self.bob)
+        review.rating = 1
+        review.save()
+        response = self.client.get('/api/performances/histogram/', {'period': 'year'})
+        self.assertEqual(response.data['counts']['5'], [1])
+
+
+class ChartAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Ops')
+        other = Department.objects.create(name='Legal')
+        self.employee = Employee.objects.create(
+            name='Ann', email='ann@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.department
+        )
+        outsider = Employee.objects.create(
+            name='Bob', email='bob@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=other
+        )
+        for day, status_code in [('2025-01-01', 'P'), ('2025-01-02', 'L'), ('2025-02-01', 'A')]:
+            Attendance.objects.create(employee=self.employee, date=day, status=status_code)
+        Attendance.objects.create(employee=outsider, date='2025-01-01', status='P')
+
+    def test_monthly_attendance_summary(self):
+        response = self.client.get('/api/charts/monthly-attendance/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'labels': ['Jan 2025', 'Feb 2025'],
+            'present': [2, 0],
+            'absent': [0, 1],
+            'late': [1, 0],
+        })
+
+    def test_monthly_attendance_summary_by_department(self):
+        response = self.client.get(f'/api/charts/monthly-attendance/?department_id={self.department.id}')
+        self.assertEqual(response.data['present'], [1, 0])
+
+    def test_monthly_attendance_summary_date_window(self):
+        Attendance.objects.create(employee=self.employee, date='2025-03-10', status='P')
+        Attendance.objects.create(employee=self.employee, date='2025-03-20', status='L')
+        response = self.client.get('/api/charts/monthly-attendance/?from=2025-01-02&to=2025-03-15')
+        self.assertEqual(response.data, {
+            'labels': ['Jan 2025', 'Feb 2025', 'Mar 2025'],
+            'present': [0, 0, 1],
+            'absent': [0, 1, 0],
+            'late': [1, 0, 0],
+        })
+        response = self.client.get('/api/charts/monthly-attendance/?from=2025-02-01&to=2025-02-28')
+        self.assertEqual(response.data['labels'], ['Feb 2025'])
+
+    def test_monthly_attendance_summary_rejects_bad_window(self):
+        response = self.client.get('/api/charts/monthly-attendance/?from=2025-13-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/charts/monthly-attendance/?from=2025-03-01&to=2025-01-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_monthly_attendance_summary_returns_one_row_per_month(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/charts/monthly-attendance/?from=2025-01-01&to=2025-02-28')
+        self.assertEqual(len(queries), 1)
+        self.assertIn('GROUP BY', queries[0]['sql'])
+
+
+class DashboardAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        departments = [Department.objects.create(name=f'Department {number}') for number in range(8)]
+        for number, department in enumerate(departments):
+            employee = Employee.objects.create(
+                name=f'Person {number}', email=f'person{number}@example.com', phone_number='1',
+                address='Street', date_of_joining='2023-01-01', department=department
+            )
+            Attendance.objects.create(employee=employee, date='2025-01-01', status='P')
+        self.department = departments[0]
+
+    def test_dashboard_matches_individual_endpoints(self):
+        response = self.client.get('/api/charts/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'departments': self.client.get('/api/charts/departments/').data,
+            'employees_per_department': self.client.get('/api/charts/employees-per-department/').data,
+            'monthly_attendance': self.client.get('/api/charts/monthly-attendance/').data,
+        })
+
+    def test_dashboard_shares_department_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/charts/dashboard/')
+        self.assertEqual(len(queries), 2)
+
+    def test_field_selection(self):
+        response = self.client.get(
+            f'/api/charts/dashboard/?fields=monthly_attendance&department_id={self.department.id}'
+        )
+        self.assertEqual(list(response.data), ['monthly_attendance'])
+        self.assertEqual(response.data['monthly_attendance']['present'], [1])
+        response = self.client.get('/api/charts/dashboard/?fields=departments,salaries')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/charts/dashboard/?from=2025-02-30')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_gzip_compression(self):
+        import gzip
+        response = self.client.get('/api/charts/dashboard/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), json.loads(
+            self.client.get('/api/charts/dashboard/').content
+        ))
+
+    def test_brotli_compression(self):
+        from employee_project import middleware
+        if middleware.brotli is None:
+            self.skipTest('brotli is not installed')
+        response = self.client.get('/api/charts/dashboard/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertIn('departments', json.loads(middleware.brotli.decompress(response.content)))
+
+
+class DepartmentEmployeeCountTests(APITestCase):
+    def setUp(self):
+        self.it = Department.objects.create(name='IT')
+        self.hr = Department.objects.create(name='HR')
+
+    def hire(self, number, department):
+        return Employee(
+            name=f'Employee {number}', email=f'e{number}@example.com', phone_number='1',
+            address='A', date_of_joining='2024-01-01', department=department
+        )
+
+    def assertCounts(self, it, hr):
+        self.assertEqual(
+            list(Department.objects.order_by('id').values_list('employee_count', flat=True)), [it, hr]
+        )
+
+    def test_single_object_writes(self):
+        employee = self.hire(1, self.it)
+        employee.save()
+        self.hire(2, self.it).save()
+        self.assertCounts(2, 0)
+        employee.department = self.hr
+        employee.save()
+        self.assertCounts(1, 1)
+        Employee.objects.get(pk=employee.pk).delete()
+        self.assertCounts(1, 0)
+
+    def test_bulk_writes(self):
+        created = Employee.objects.bulk_create([self.hire(n, self.it) for n in range(4)])
+        self.assertCounts(4, 0)
+        for employee in created[:2]:
+            employee.department = self.hr
+        Employee.objects.bulk_update(created, ['department'])
+        self.assertCounts(2, 2)
+        Employee.objects.filter(pk=created[2].pk).update(department=self.hr)
+        self.assertCounts(1, 3)
+        Employee.objects.filter(department=self.hr).delete()
+        self.assertCounts(1, 0)
+
+    def test_reconcile_command_reports_and_repairs_drift(self):
+        Employee.objects.bulk_create([self.hire(n, self.it) for n in range(3)])
+        Department.objects.filter(pk=self.it.pk).update(employee_count=7)
+        Department.objects.filter(pk=self.hr.pk).update(employee_count=1)
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile_employee_counts', check=True, stdout=out)
+        self.assertIn('IT (id %d): stored 7, actual 3' % self.it.pk, out.getvalue())
+        self.assertCounts(7, 1)
+
+        call_command('reconcile_employee_counts', stdout=StringIO())
+        self.assertCounts(3, 0)
+        out = StringIO()
+        call_command('reconcile_employee_counts', stdout=out)
+        self.assertIn('correct', out.getvalue())
+
+    def test_chart_and_serializer_read_the_counter(self):
+        Employee.objects.bulk_create([self.hire(n, self.hr) for n in range(2)])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/charts/employees-per-department/')
+        self.assertEqual(response.data['counts'], [0, 2])
+        self.assertNotIn('COUNT(', ' '.join(query['sql'].upper() for query in queries.captured_queries))
+
+        admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(admin)
+        response = self.client.get(f'/api/departments/{self.hr.pk}/')
+        self.assertNotIn('employee_count', response.data)
+        response = self.client.get(f'/api/departments/{self.hr.pk}/', {'include': 'employee_count'})
+        self.assertEqual(response.data['employee_count'], 2)
+
+
+class ChartCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Ops')
+
+    def test_cached_until_dependency_changes(self):
+        response = self.client.get('/api/charts/employees-per-department/')
+        self.assertEqual(response.data['total'], 0)
+        with self.assertNumQueries(0):
+            self.client.get('/api/charts/employees-per-department/')
+
+        Employee.objects.create(
+            name='Ann', email='ann@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.department
+        )
+        response = self.client.get('/api/charts/employees-per-department/')
+        self.assertEqual(response.data['total'], 1)
+
+    def test_unrelated_changes_keep_entries(self):
+        self.client.get('/api/charts/departments/')
+        Employee.objects.create(
+            name='Ann', email='ann@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.department
+        )
+        with self.assertNumQueries(0):
+            self.client.get('/api/charts/departments/')
+
+    def test_staff_in_employee_group_gets_a_personal_entry(self):
+        # The view scopes to the user's own attendance for anyone in the Employee group, staff included.
+        mine = Employee.objects.create(
+            name='Ann', email='ann@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.department
+        )
+        other = Employee.objects.create(
+            name='Bob', email='bob@example.com', phone_number='0000000000',
+            address='XYZ Lane', date_of_joining='2022-06-15', department=self.department
+        )
+        Attendance.objects.create(employee=mine, date='2025-01-01', status='P')
+        Attendance.objects.create(employee=other, date='2025-01-01', status='A')
+        staff_employee = User.objects.create_user(username='ann', email='ann@example.com', is_staff=True)
+        staff_employee.groups.add(Group.objects.create(name='Employee'))
+        self.client.force_authenticate(staff_employee)
+        response = self.client.get('/api/charts/monthly-attendance/')
+        self.assertEqual((response.data['present'], response.data['absent']), ([1], [0]))
+
+        self.client.force_authenticate(User.objects.create_superuser(username='admin', password='adminpass'))
+        response = self.client.get('/api/charts/monthly-attendance/')
+        self.assertEqual((response.data['present'], response.data['absent']), ([1], [1]))
+
+    def test_conditional_requests_and_stats(self):
+        response = self.client.get('/api/charts/departments/')
+        self.assertIn('Last-Modified', response)
+        response = self.client.get('/api/charts/departments/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/charts/cache-stats/')
+        self.assertEqual(response.data['misses'], 1)
+        self.assertEqual(response.data['not_modified'], 1)
+        self.assertEqual(response.data['hit_ratio'], 0.5)
+
+
+class RoleResolutionTests(APITestCase):
+    def setUp(self):
+        forget_roles()
+        self.user = User.objects.create_user(username='emp', password='emppass')
+        self.user.groups.add(Group.objects.create(name='Employee'))
+
+    def test_group_names_are_loaded_once(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(is_employee(user))
+            self.assertFalse(is_hr(user))
+        # A fresh user object (next request) is served by the process cache.
+        with self.assertNumQueries(0):
+            self.assertTrue(is_employee(self.fresh_user()))
+
+    def fresh_user(self):
+        return User(pk=self.user.pk, username=self.user.username)
+
+    def test_group_changes_invalidate_cache(self):
+        self.assertFalse(is_hr(self.fresh_user()))
+        self.user.groups.add(Group.objects.create(name='HR'))
+        self.assertTrue(is_hr(self.fresh_user()))
+        Group.objects.get(name='HR').user_set.remove(self.user)
+        self.assertFalse(is_hr(self.fresh_user()))
+
+    def test_chart_request_resolves_roles_with_one_query(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/charts/monthly-attendance/')
+        group_queries = [q for q in queries if 'auth_group' in q['sql']]
+        self.assertEqual(len(group_queries), 1)
+
+
+class CachingTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='readerpass')
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/departments/')
+        return response, [q for q in queries if 'authtoken_token' in q['sql']]
+
+    def test_token_lookup_is_cached(self):
+        response, lookups = self.token_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response, lookups = self.token_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(lookups, [])
+
+    def test_deleted_token_is_rejected(self):
+        self.token_queries()
+        self.token.delete()
+        response, _ = self.token_queries()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hits_share_no_instances(self):
+        authentication = CachingTokenAuthentication()
+        first_user, first_token = authentication.authenticate_credentials(self.token.key)
+        hits = [authentication.authenticate_credentials(self.token.key) for _ in range(2)]
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION='Token ' + self.token.key)
+        hits.append(async_to_sync(aauthenticate)(request))
+        users = [first_user] + [user for user, _ in hits]
+        tokens = [first_token] + [token for _, token in hits]
+        self.assertEqual({user.pk for user in users}, {self.user.pk})
+        self.assertEqual(len({id(user) for user in users}), len(users))
+        self.assertEqual(len({id(user._state) for user in users}), len(users))
+        self.assertEqual(len({id(token) for token in tokens}), len(tokens))
+        for user, token in hits:
+            self.assertFalse(user._state.adding)
+            self.assertIs(token.user, user)
+
+    def test_deactivated_user_is_rejected(self):
+        self.token_queries()
+        self.user.is_active = False
+        self.user.save()
+        response, _ = self.token_queries()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class FastReadPathTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(self.admin)
+        departments = [Department.objects.create(name=name) for name in ('QA', 'R&D "Labs"')]
+        for i in range(12):
+            employee = Employee.objects.create(
+                name=f'Émile {i}', email=f'emile{i}@example.com', phone_number='0000000000',
+                address=f'{i} Rue <Haute>\nParis', date_of_joining=date(2020, 1, 1 + i),
+                department=departments[i % 2]
+            )
+            Performance.objects.create(employee=employee, rating=1 + i % 5, review_date=date(2024, 1 + i, 1))
+
+    def assertListMatches(self, url, serializer_class, queryset):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = dict(response.data, results=serializer_class(queryset, many=True).data)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def assertRetrieveMatches(self, url, serializer_class, instance):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, JSONRenderer().render(serializer_class(instance).data))
+
+    def test_employee_list_and_retrieve_match_serializer(self):
+        self.assertListMatches('/api/employees/', EmployeeSerializer, Employee.objects.order_by('-id')[:10])
+        employee = Employee.objects.first()
+        self.assertRetrieveMatches(f'/api/employees/{employee.id}/', EmployeeSerializer, employee)
+
+    def test_performance_list_and_retrieve_match_serializer(self):
+        self.assertListMatches(
+            '/api/performances/', PerformanceSerializer, Performance.objects.order_by('-id')[:10]
+        )
+        performance = Performance.objects.first()
+        self.assertRetrieveMatches(f'/api/performances/{performance.id}/', PerformanceSerializer, performance)
+
+    def test_performance_list_uses_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/performances/')
+        self.assertEqual(len(queries), 1)
+
+    def test_missing_object_returns_404(self):
+        self.assertEqual(self.client.get('/api/employees/999999/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/performances/abc/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EmployeeSearchTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        department = Department.objects.create(name='IT')
+        for name, email in (('Anna Smith', 'anna@example.com'), ('Hannah Jones', 'hjones@example.com'),
+                            ('Bob Stone', 'annabel@example.com')):
+            Employee.objects.create(
+                name=name, email=email, phone_number='1', address='A',
+                date_of_joining='2024-01-01', department=department
+            )
+
+    def test_prefix_tsquery_sanitizes_terms(self):
+        self.assertEqual(prefix_tsquery(['Ann', "sm'ith&"]), "'ann':* & 'sm':* & 'ith':*")
+        self.assertEqual(prefix_tsquery(['!:*()']), '')
+
+    def test_typeahead_ranks_name_matches_first(self):
+        response = self.client.get('/api/employees/search/', {'q': 'ann'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['name'] for row in response.data], ['Anna Smith', 'Bob Stone', 'Hannah Jones'])
+        self.assertEqual(response.data[0]['department']['name'], 'IT')
+
+    def test_typeahead_requires_every_term_and_honours_limit(self):
+        response = self.client.get('/api/employees/search/', {'q': 'ann smi'})
+        self.assertEqual([row['name'] for row in response.data], ['Anna Smith'])
+        response = self.client.get('/api/employees/search/', {'q': 'ann', 'limit': '1'})
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(self.client.get('/api/employees/search/').data, [])
+
+    def test_list_search_falls_back_to_substring_match(self):
+        response = self.client.get('/api/employees/', {'search': 'jones'})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Hannah Jones'])
+
+
+class ExportAPITests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(self.admin)
+        self.it = Department.objects.create(name='IT')
+        hr = Department.objects.create(name='HR')
+        for i, department in enumerate([self.it, hr, self.it]):
+            employee = Employee.objects.create(
+                name=f'Person {i}', email=f'person{i}@example.com', phone_number='0000000000',
+                address='Street', date_of_joining='2023-01-01', department=department
+            )
+            Performance.objects.create(employee=employee, rating=3, review_date='2024-06-01')
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_employee_export_accepts_list_filters(self):
+        lines = self.read(f'/api/employees/export/csv/?department__id={self.it.id}&ordering=-name')
+        self.assertEqual(lines[0], 'id,name,email,phone_number,address,date_of_joining,department_id,department_name')
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ['Person 2', 'Person 0'])
+
+    def test_csv_header_is_sent_before_the_rows_are_queried(self):
+        response = self.client.get('/api/employees/export/csv/')
+        chunks = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            self.assertEqual(next(chunks).decode().splitlines(), [
+                'id,name,email,phone_number,address,date_of_joining,department_id,department_name'
+            ])
+        self.assertEqual(len(b''.join(chunks).decode().splitlines()), 3)
+
+    def test_performance_export_ndjson(self):
+        lines = self.read('/api/performances/export/ndjson/')
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['employee_name'], 'Person 0')
+
+    def test_export_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get('/api/employees/export/csv/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SeedDataCommandTests(APITestCase):
+    def seed(self):
+        call_command('seed_data', employees=4, days=3, departments=2, batch_size=3, seed=11, stdout=StringIO())
+        return list(Employee.objects.order_by('id').values_list('name', 'department__name', 'date_of_joining'))
+
+    def test_seeding_is_deterministic_and_feeds_rollup(self):
+        first = self.seed()
+        self.assertEqual(len(first), 4)
+        self.assertEqual(Attendance.objects.count(), 12)
+        self.assertEqual(Performance.objects.count(), 12)
+        self.assertEqual(sum(AttendanceMonthlyRollup.objects.values_list('count', flat=True)), 12)
+
+        Employee.objects.all().delete()
+        self.assertEqual(self.seed(), first)
+
+    def test_seeded_runs_default_to_a_fixed_end_date(self):
+        self.seed()
+        self.assertEqual(Attendance.objects.latest('date').date, SEEDED_END_DATE)
+
+        call_command('seed_data', employees=1, days=1, departments=1, stdout=StringIO())
+        self.assertEqual(Attendance.objects.latest('date').date, date.today())
+
+
+class ExplainQueriesCommandTests(APITestCase):
+    def test_filters_use_access_path_indexes(self):
+        call_command('seed_data', employees=6, days=3, departments=2, seed=5, stdout=StringIO())
+        out = StringIO()
+        call_command(
+            'explain_queries', stdout=out,
+            only='employees-by-department,employees-by-joining-date,employees-ordered-by-name,attendance-by-status',
+        )
+        output = out.getvalue()
+        for index in ('employee_dept_id_idx', 'employee_joined_id_idx', 'employee_name_id_idx',
+                      'attendance_status_date_id_idx'):
+            self.assertIn(index, output)
+        self.assertNotIn('Full table scans', output)
+        self.assertFalse(User.objects.filter(username='explain-queries').exists())
+
+
+class BenchmarkComparisonTests(APITestCase):
+    def test_regressions_are_flagged_against_baseline(self):
+        from employees.management.commands.run_benchmarks import Command
+        baseline = {'results': {'1000': {
+            'employees-list': {'p95_ms': 10.0, 'queries': 1, 'peak_kb': 100.0},
+            'charts-departments': {'p95_ms': 1.0, 'queries': 0, 'peak_kb': 20.0},
+        }}}
+        current = {'results': {'1000': {
+            'employees-list': {'p95_ms': 20.0, 'queries': 3, 'peak_kb': 100.0},
+            'charts-departments': {'p95_ms': 1.5, 'queries': 0, 'peak_kb': 20.0},
+        }}}
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as handle:
+            json.dump(baseline, handle)
+            handle.flush()
+            command = Command(stdout=StringIO(), stderr=StringIO())
+            regressions = command.compare(current, handle.name, tolerance=0.25, min_delta_ms=1.0)
+        self.assertEqual([(size, name) for size, name, _ in regressions], [('1000', 'employees-list')])
+        self.assertEqual(len(regressions[0][2]), 2)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        departments = [Department.objects.create(name=f'Dept {number}') for number in range(3)]
+        for number in range(15):
+            employee = Employee.objects.create(
+                name=f'Person {number}', email=f'person{number}@example.com', phone_number='1',
+                address='Street', date_of_joining='2023-01-01', department=departments[number % 3]
+            )
+            Performance.objects.create(employee=employee, rating=3, review_date='2024-01-01')
+        self.department = departments[0]
+        self.employee = employee
+        self.performance = Performance.objects.filter(employee=employee).first()
+
+    def test_reads_and_writes_stay_within_budget(self):
+        # Lists are larger than a page so a per-row query would blow the budget.
+        requests = [
+            ('get', '/api/departments/', None),
+            ('get', f'/api/departments/{self.department.id}/', None),
+            ('post', '/api/departments/', {'name': 'Legal'}),
+            ('get', '/api/employees/', None),
+            ('get', f'/api/employees/{self.employee.id}/', None),
+            ('post', '/api/employees/', {
+                'name': 'New', 'email': 'new@example.com', 'phone_number': '1', 'address': 'Street',
+                'date_of_joining': '2024-01-01', 'department_id': self.department.id,
+            }),
+            ('patch', f'/api/employees/{self.employee.id}/', {'name': 'Renamed'}),
+            ('get', '/api/performances/', None),
+            ('get', f'/api/performances/{self.performance.id}/', None),
+            ('post', '/api/performances/', {'employee_id': self.employee.id, 'rating': 4, 'review_date': '2024-06-01'}),
+            ('get', '/api/charts/employees-per-department/', None),
+            ('get', '/api/charts/monthly-attendance/', None),
+            ('get', '/api/charts/departments/', None),
+            ('get', '/api/charts/cache-stats/', None),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                response = getattr(self.client, method)(url, data, format='json')
+                self.assertLess(response.status_code, 400)
+                self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_over_budget_raises_in_strict_mode(self):
+        with mock.patch.object(DepartmentViewSet, 'query_budget', {'list': 0}):
+            with self.assertRaisesRegex(QueryBudgetExceeded, 'budget is 0'):
+                self.client.get('/api/departments/')
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_only_logs_outside_strict_mode(self):
+        with mock.patch.object(DepartmentViewSet, 'query_budget', 0):
+            with self.assertLogs('employee_project.sql', level='WARNING') as logs:
+                response = self.client.get('/api/departments/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['budget'], 0)
+        self.assertGreater(record['queries'], 0)
+
+    def test_every_api_route_declares_a_budget(self):
+        import attendance.urls
+        import employees.async_urls
+        import employees.urls
+        import jobs.urls
+        from employees.views import charts_view
+        patterns = (
+            employees.urls.urlpatterns + attendance.urls.urlpatterns + jobs.urls.urlpatterns
+            + employees.async_urls.urlpatterns
+        )
+        for pattern in patterns:
+            if pattern.callback is charts_view or pattern.name == 'api-root':
+                continue
+            with self.subTest(route=str(pattern.pattern)):
+                self.assertIsNotNone(resolve_budget(pattern.callback, 'GET'))
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'a'"),
+            fingerprint("SELECT *  FROM t WHERE id = 22 AND name = 'b''c'"),
+        )
+
+
+class AsyncReadEndpointTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        departments = [Department.objects.create(name=f'Dept {number}') for number in range(3)]
+        for number in range(9):
+            employee = Employee.objects.create(
+                name=f'Person {number}', email=f'person{number}@example.com', phone_number='1',
+                address='Street', date_of_joining='2023-01-01', department=departments[number % 3]
+            )
+            Performance.objects.create(employee=employee, rating=number % 5 + 1, review_date='2024-01-01')
+            Attendance.objects.create(employee=employee, date=date(2025, 1, 15), status='P')
+
+    def test_lists_match_sync_endpoints(self):
+        for path in ('departments/', 'employees/', 'performances/', 'attendance/', 'employees/?search=Person 1'):
+            with self.subTest(path=path):
+                sync = self.client.get('/api/' + path)
+                async_ = self.client.get('/api/async/' + path)
+                self.assertEqual(async_.status_code, status.HTTP_200_OK)
+                self.assertEqual(async_.json()['results'], sync.json()['results'])
+
+    def test_keyset_pages_cover_every_row(self):
+        seen = []
+        url = '/api/async/employees/?page_size=4'
+        while url:
+            page = self.client.get(url).json()
+            seen += [row['id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(seen, list(Employee.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_ordering_is_rejected(self):
+        response = self.client.get('/api/async/employees/?ordering=name')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.json())
+
+    def test_charts_share_cache_with_sync_endpoints(self):
+        for path in ('employees-per-department/', 'monthly-attendance/', 'departments/'):
+            with self.subTest(path=path):
+                sync = self.client.get('/api/charts/' + path)
+                async_ = self.client.get('/api/async/charts/' + path)
+                self.assertEqual(async_.json(), sync.json())
+                self.assertEqual(async_['ETag'], sync['ETag'])
+                revalidated = self.client.get('/api/async/charts/' + path, HTTP_IF_NONE_MATCH=sync['ETag'])
+                self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_authentication_and_methods(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/api/async/employees/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get('/api/async/charts/departments/').status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION='Token not-a-token')
+        self.assertEqual(self.client.get('/api/async/charts/departments/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.assertEqual(self.client.post('/api/async/employees/').status_code, 405)
+        response = self.client.get('/api/async/charts/monthly-attendance/?from=2025-02-30')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    async def test_asgi_stack_stays_within_budget(self):
+        headers = {'Authorization': 'Token ' + self.token.key}
+        for path in ('employees/', 'attendance/', 'charts/monthly-attendance/'):
+            response = await self.async_client.get('/api/async/' + path, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[12] queries"')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+@mock.patch('employee_project.db_router.choose_replica', return_value='replica1')
+class ReplicaRoutingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def route(self, method, view_func, write=False, token='abc', model=Employee):
+        """Run a request through ReplicaRoutingMiddleware; returns the read alias before and after any write."""
+        router = ReplicaRouter()
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view_func, (), {})
+            seen.append(router.db_for_read(model))
+            if write:
+                self.assertEqual(router.db_for_write(model), 'default')
+            seen.append(router.db_for_read(model))
+            return HttpResponse()
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(RequestFactory().generic(method, '/', HTTP_AUTHORIZATION=f'Token {token}'))
+        return seen
+
+    def test_reads_of_marked_views_use_the_replica(self, choose_replica):
+        self.assertEqual(self.route('GET', EmployeeViewSet.as_view({'get': 'list'})), ['replica1', 'replica1'])
+        self.assertEqual(self.route('GET', EmployeeViewSet.as_view({'get': 'search'})), ['replica1', 'replica1'])
+        self.assertEqual(self.route('GET', department_list), ['replica1', 'replica1'])
+        self.assertEqual(self.route('GET', current_user_view), ['default', 'default'])
+        self.assertEqual(self.route('GET', JobViewSet.as_view({'get': 'list'})), ['default', 'default'])
+        self.assertEqual(self.route('POST', EmployeeViewSet.as_view({'post': 'create'})), ['default', 'default'])
+        # Outside a request, e.g. in management commands and job workers, reads use the primary.
+        self.assertEqual(ReplicaRouter().db_for_read(Employee), 'default')
+
+    def test_reads_stay_on_the_primary_after_a_write(self, choose_replica):
+        listing = EmployeeViewSet.as_view({'get': 'list'})
+        self.assertEqual(self.route('GET', listing, write=True), ['replica1', 'default'])
+        self.assertEqual(self.route('GET', listing), ['default', 'default'])
+        self.assertEqual(self.route('GET', listing, token='other'), ['replica1', 'replica1'])
+        with self.settings(REPLICA_STICKY_SECONDS=0):
+            self.route('POST', EmployeeViewSet.as_view({'post': 'create'}), write=True, token='third')
+        self.assertEqual(self.route('GET', listing, token='third'), ['replica1', 'replica1'])
+
+    def test_authentication_data_is_read_from_the_primary(self, choose_replica):
+        # A token issued a moment ago must authenticate even if the replica has not caught up.
+        listing = EmployeeViewSet.as_view({'get': 'list'})
+        for model in (User, Group, Token, Session):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self.route('GET', listing, model=model), ['default', 'default'])
+
+    def test_check_warns_about_a_per_process_sticky_cache(self, choose_replica):
+        self.assertEqual([warning.id for warning in db_router.check_sticky_cache(None)], ['employee_project.W001'])
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(db_router.check_sticky_cache(None), [])
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaFallbackTests(APITestCase):
+    def test_unavailable_replica_falls_back_to_the_primary(self):
+        replica = mock.Mock()
+        replica.ensure_connection.side_effect = OperationalError('connection refused')
+        self.addCleanup(db_router._unavailable.clear)
+        with mock.patch('employee_project.db_router.connections', {'replica1': replica}):
+            with self.assertLogs('employee_project.db_router', 'WARNING'):
+                self.assertIsNone(db_router.choose_replica())
+            # Skipped without another connection attempt until REPLICA_RETRY_SECONDS pass.
+            self.assertIsNone(db_router.choose_replica())
+        self.assertEqual(replica.ensure_connection.call_count, 1)
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'set REPLICA_DATABASE_URLS to run against a replica')
+class ReplicaEndToEndTests(APITransactionTestCase):
+    # Committed transactions, so the replica connection sees the rows written on the primary.
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+
+    def test_list_reads_replica_until_the_client_writes(self):
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            self.assertEqual(self.client.get('/api/departments/').status_code, status.HTTP_200_OK)
+        self.assertTrue(replica_queries)
+        self.client.post('/api/departments/', {'name': 'Ops'})
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            response = self.client.get('/api/departments/')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertFalse(replica_queries)
+
+
+class ConnectionPoolTests(APITestCase):
+    def pool(self, **options):
+        health_checks = options.pop('health_checks', False)
+        return ConnectionPool('test', lambda: sqlite3.connect(':memory:'), options, health_checks)
+
+    def test_connections_are_reused(self):
+        pool = self.pool()
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertIs(pool.checkout(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['checkouts'], stats['opened'], stats['in_use']), (2, 1, 1))
+
+    def test_overflow_is_closed_on_checkin_and_exhaustion_times_out(self):
+        pool = self.pool(SIZE=1, MAX_OVERFLOW=1, TIMEOUT=0.05)
+        pooled, overflow = pool.checkout(), pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        pool.checkin(overflow)
+        pool.checkin(pooled)
+        stats = pool.stats()
+        self.assertEqual((stats['overflow_checkouts'], stats['timeouts'], stats['waits']), (1, 1, 0))
+        self.assertEqual((stats['idle'], stats['closed']), (1, 1))
+
+    def test_broken_connections_fail_the_health_check(self):
+        pool = self.pool(health_checks=True)
+        broken = pool.checkout()
+        pool.checkin(broken)
+        broken.close()
+        self.assertIsNot(pool.checkout(), broken)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+    def test_long_checkouts_are_reported_as_leaks(self):
+        pool = self.pool(LEAK_SECONDS=0)
+        pool.checkout()
+        with self.assertLogs('employee_project.db_pool', level='WARNING'):
+            self.assertEqual(pool.stats()['leaks'], 1)
+        self.assertEqual(pool.stats()['leaks'], 1)
+
+    def test_pooled_backend_gives_connections_back_on_close(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(close_pools)
+        wrapper = load_backend('employee_project.db_backends.sqlite3').DatabaseWrapper(
+            {**connections.settings['default'], 'NAME': f'{directory.name}/pooled.sqlite3', 'POOL': {'SIZE': 1}},
+            'pooled',
+        )
+        wrapper.ensure_connection()
+        raw_connection = wrapper.connection
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(wrapper.connection, raw_connection)
+        wrapper.close()
+        stats = pool_stats()['pools']['pooled']
+        self.assertEqual((stats['checkouts'], stats['opened'], stats['idle']), (2, 1, 1))
+
+    def test_stats_endpoint_is_admin_only(self):
+        admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/db-pool-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('pools', response.data)
+        self.client.force_authenticate(User.objects.create_user(username='plain', password='pass'))
+        self.assertEqual(self.client.get('/api/db-pool-stats/').status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LoggingPipelineTests(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = f'{directory.name}/app.log'
+        self.logger = logging.getLogger('employees.tests.pipeline')
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, 'propagate', True)
+
+    def handler(self, **options):
+        handler = QueuedFileHandler(self.filename, **options)
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+        self.addCleanup(handler.close)
+        return handler
+
+    def lines(self, filename):
+        with open(filename, encoding='utf-8') as log_file:
+            return [json.loads(line) for line in log_file]
+
+    def test_records_are_written_as_json_and_rotated(self):
+        handler = self.handler(max_bytes=2000, backup_count=3, batch_size=10)
+        for number in range(40):
+            self.logger.warning('record %s', number, extra={'fields': {'number': number}})
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            self.logger.exception('failed')
+        handler.close()
+        records = [
+            record for suffix in ('.3', '.2', '.1', '') if os.path.exists(self.filename + suffix)
+            for record in self.lines(self.filename + suffix)
+        ]
+        self.assertTrue(os.path.exists(self.filename + '.1'))
+        self.assertEqual([record['number'] for record in records[:-1]], list(range(40)))
+        self.assertEqual(records[0]['message'], 'record 0')
+        self.assertEqual(records[0]['level'], 'WARNING')
+        self.assertIn('ValueError: boom', records[-1]['exception'])
+
+    def test_full_queue_drops_records_instead_of_blocking(self):
+        handler = self.handler(queue_size=1)
+        handler.listener.stop()
+        for number in range(3):
+            self.logger.warning('record %s', number)
+        self.assertEqual(handler.dropped, 2)
+        handler.start()
+        self.logger.warning('after')
+        handler.close()
+        records = self.lines(self.filename)
+        self.assertEqual(records[0]['dropped'], 2)
+        self.assertEqual([record['message'] for record in records[1:]], ['record 0', 'after'])
+
+    @skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_processes_share_the_file_and_rotate_without_losing_lines(self):
+        handler = self.handler(max_bytes=2000, backup_count=1000, batch_size=1)
+        children = []
+        for child in range(4):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    for number in range(300):
+                        self.logger.warning('record', extra={'fields': {'child': child, 'number': number}})
+                    handler.close()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        for pid in children:
+            os.waitpid(pid, 0)
+        handler.close()
+        records = [
+            record for suffix in ['', *(f'.{number}' for number in range(1, 1001))]
+            if os.path.exists(self.filename + suffix)
+            for record in self.lines(self.filename + suffix)
+        ]
+        self.assertTrue(os.path.exists(self.filename + '.1'))
+        self.assertEqual(
+            sorted((record['child'], record['number']) for record in records),
+            [(child, number) for child in range(4) for number in range(300)],
+        )
+
+    def test_requests_are_access_logged_with_timings(self):
+        admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_authenticate(admin)
+        with self.assertLogs('employee_project.access', level='INFO') as logs:
+            self.client.get('/api/departments/?ordering=name')
+        fields = logs.records[0].fields
+        self.assertEqual((fields['method'], fields['path'], fields['status']), ('GET', '/api/departments/', 200))
+        self.assertEqual(fields['query'], 'ordering=name')
+        self.assertEqual(fields['user_id'], admin.pk)
+        self.assertGreater(fields['sql_queries'], 0)
+        self.assertGreaterEqual(fields['duration_ms'], fields['sql_ms'])
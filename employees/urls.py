@@ -6,10 +6,20 @@ from .views import DepartmentViewSet, EmployeeViewSet, PerformanceViewSet
 from django.urls import path
 from .views import (
     charts_view, employees_per_department,
-    monthly_attendance_summary, department_list
+    monthly_attendance_summary, department_list, dashboard, chart_cache_stats,
+    attendance_rolling, attendance_streaks, db_pool_stats
 )
 
-router = routers.DefaultRouter()
+class BulkRouter(routers.DefaultRouter):
+    """DefaultRouter that also routes PATCH and DELETE on a collection to bulk actions."""
+    routes = [
+        route._replace(mapping={**route.mapping, 'patch': 'bulk_partial_update', 'delete': 'bulk_destroy'})
+        if route.name == '{basename}-list' else route
+        for route in routers.DefaultRouter.routes
+    ]
+
+
+router = BulkRouter()
 router.register(r'departments', DepartmentViewSet)
 router.register(r'employees', EmployeeViewSet)
 router.register(r'performances', PerformanceViewSet)
@@ -20,5 +30,10 @@ urlpatterns += [
     path('charts/', charts_view),
     path('charts/employees-per-department/', employees_per_department),
     path('charts/monthly-attendance/', monthly_attendance_summary),
-    path('charts/departments/', department_list)
+    path('charts/departments/', department_list),
+    path('charts/dashboard/', dashboard),
+    path('charts/attendance-rolling/', attendance_rolling),
+    path('charts/attendance-streaks/', attendance_streaks),
+    path('charts/cache-stats/', chart_cache_stats),
+    path('db-pool-stats/', db_pool_stats),
 ]
\ No newline at end of file
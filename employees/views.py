@@ -1,12 +1,9 @@
 # employees/views.py
 from django.shortcuts import render
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
 from rest_framework import viewsets, filters, pagination, status
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import action, api_view, permission_classes, authentication_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django_filters.rest_framework import DjangoFilterBackend
@@ -14,24 +11,35 @@ from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User, Group
 from django.core.exceptions import PermissionDenied
 from django.utils.timezone import now
+from django.utils.dateparse import parse_date
 from django.shortcuts import render, redirect
+from rest_framework.generics import get_object_or_404
 from django.contrib.auth.decorators import login_required
 import logging
 
 from .models import Department, Employee, Performance
-from .serializers import DepartmentSerializer, EmployeeSerializer, PerformanceSerializer
-from attendance.models import Attendance
+from .serializers import (
+    DepartmentSerializer, EmployeeSerializer, PerformanceSerializer,
+    EMPLOYEE_VALUES, MAX_BULK_EMPLOYEES, PERFORMANCE_VALUES, employee_row, parse_pk, payload_ids,
+    performance_row
+)
+from . import analytics, charts
+from .authentication import CachingTokenAuthentication
+from .cache import cache_stats, cached_response
+from .exports import ExportMixin
+from .roles import has_role
+from .search import EmployeeSearchFilter, ranked_matches
+from attendance.matrix import STATUS_CODES, window_days
+from employee_project.db_pool import pool_stats
+from employee_project.db_router import use_replica
+from employee_project.middleware import compress_response, query_budget
 
 
 # ----------------------
 # Logging Setup
 # ----------------------
+# Handlers are configured by LOGGING in settings.
 logger = logging.getLogger(__name__)
-handler = logging.FileHandler('user_registration.log')
-formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
 
 
 # ----------------------
@@ -40,6 +48,8 @@ logger.setLevel(logging.INFO)
 
 class CursorResultsSetPagination(pagination.CursorPagination):
     page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
     ordering = '-id'
 
 
@@ -48,44 +58,307 @@ class CursorResultsSetPagination(pagination.CursorPagination):
 # ----------------------
 
 def is_hr(user):
-    return user.groups.filter(name='HR').exists()
+    return has_role(user, 'HR')
 
 def is_employee(user):
-    return user.groups.filter(name='Employee').exists()
+    return has_role(user, 'Employee')
+
+
+# ----------------------
+# Read Fast Path
+# ----------------------
+
+class ValuesReadMixin:
+    """
+    Serve list and retrieve from ``values(*read_values)`` rows passed through ``read_row``,
+    skipping model instances and per-field serializer calls. Writes use serializer_class.
+    """
+    read_values = ()
+    read_row = None
+
+    def get_read_queryset(self):
+        return self.filter_queryset(self.get_queryset()).values(*self.read_values)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_read_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([self.read_row(row) for row in page])
+        return Response([self.read_row(row) for row in queryset])
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.get_read_queryset(),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        return Response(self.read_row(row))
 
 
 # ----------------------
 # ViewSets (with role-based access + cursor pagination)
 # ----------------------
 
+include_param = openapi.Parameter(
+    'include',
+    openapi.IN_QUERY,
+    description="Pass 'employee_count' to include each department's number of employees",
+    type=openapi.TYPE_STRING,
+    enum=['employee_count']
+)
+
+
+def include_employee_count(request):
+    return request is not None and request.GET.get('include') == 'employee_count'
+
+
+def bulk_error_response(detail):
+    """400 response for a rejected bulk payload, listing per-item errors by index."""
+    if isinstance(detail, list):
+        detail = {'errors': [{'index': index, 'errors': errors} for index, errors in enumerate(detail) if errors]}
+    return Response(detail, status=status.HTTP_400_BAD_REQUEST)
+
+
 class DepartmentViewSet(viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    query_budget = {'list': 2, 'retrieve': 2, 'default': 4}
     filter_backends = [filters.SearchFilter]
     pagination_class = CursorResultsSetPagination
     permission_classes = [IsAuthenticated]
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_employee_count'] = include_employee_count(self.request)
+        return context
+
+    @swagger_auto_schema(manual_parameters=[include_param])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(manual_parameters=[include_param])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ExportMixin, ValuesReadMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.select_related('department').all()
     serializer_class = EmployeeSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
+    # Bulk writes are constant in the number of items; deletes also clear cascaded rows.
+    query_budget = {
+        'list': 2, 'retrieve': 2, 'search': 2, 'create': 8,
+        'bulk_partial_update': 14, 'bulk_destroy': 14, 'default': 4,
+    }
+    replica_actions = ('list', 'retrieve', 'export', 'search')
+    read_values = EMPLOYEE_VALUES
+    read_row = staticmethod(employee_row)
+    export_filename = 'employees'
+    export_columns = [
+        ('id', 'id'), ('name', 'name'), ('email', 'email'), ('phone_number', 'phone_number'),
+        ('address', 'address'), ('date_of_joining', 'date_of_joining'),
+        ('department_id', 'department_id'), ('department_name', 'department__name'),
+    ]
+    filter_backends = [EmployeeSearchFilter, filters.OrderingFilter, DjangoFilterBackend]
     filterset_fields = ['department__id', 'date_of_joining']
     search_fields = ['name', 'email']
     ordering_fields = ['name', 'date_of_joining']
     pagination_class = CursorResultsSetPagination
+    search_limit = 10
+    max_search_limit = 50
 
     def get_permissions(self):
         if self.request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
             return [IsAdminUser()]
         return [IsAuthenticated()]
 
-
-class PerformanceViewSet(viewsets.ModelViewSet):
-    queryset = Performance.objects.select_related('employee').all()
+    @swagger_auto_schema(
+        operation_description=(
+            "Creates one employee, or every employee in a JSON list (at most 1000). "
+            "A list is written in one transaction only if every item is valid; otherwise "
+            "errors are reported by index."
+        ),
+        request_body=EmployeeSerializer(many=True),
+        responses={201: EmployeeSerializer(many=True)}
+    )
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True, max_length=MAX_BULK_EMPLOYEES)
+        if not serializer.is_valid():
+            return bulk_error_response(serializer.errors)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Partially updates many employees. Send a JSON list of objects, each with the "
+            "'id' of the employee to change and the fields to set. All items are written in "
+            "one transaction, or none if any is invalid."
+        ),
+        request_body=EmployeeSerializer(many=True, partial=True),
+        responses={200: EmployeeSerializer(many=True)}
+    )
+    def bulk_partial_update(self, request, *args, **kwargs):
+        employees = list(self.get_queryset().filter(pk__in=payload_ids(request.data)))
+        serializer = self.get_serializer(
+            employees, data=request.data, many=True, partial=True, max_length=MAX_BULK_EMPLOYEES
+        )
+        if not serializer.is_valid():
+            return bulk_error_response(serializer.errors)
+        serializer.save()
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Deletes many employees. Send a JSON list of employee ids; nothing is deleted "
+            "if any id is invalid."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+        responses={204: openapi.Response('Employees deleted')}
+    )
+    def bulk_destroy(self, request, *args, **kwargs):
+        data = request.data
+        if not isinstance(data, list) or not data or len(data) > MAX_BULK_EMPLOYEES:
+            return Response(
+                {'non_field_errors': [f'Expected a list of 1 to {MAX_BULK_EMPLOYEES} employee ids.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ids = [parse_pk(value) for value in data]
+        existing = set(self.get_queryset().filter(pk__in=[pk for pk in ids if pk is not None])
+                       .values_list('pk', flat=True))
+        errors, seen = [], set()
+        for pk in ids:
+            if pk is None or pk not in existing:
+                errors.append({'id': ['Unknown employee id.']})
+            elif pk in seen:
+                errors.append({'id': ['Duplicate employee id in this batch.']})
+            else:
+                errors.append({})
+            seen.add(pk)
+        if any(errors):
+            return bulk_error_response(errors)
+        Employee.objects.filter(pk__in=existing).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Typeahead search: employees whose name or email words start with the typed "
+            "terms, best match first."
+        ),
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Text typed so far",
+                              type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Maximum results (default 10, max 50)",
+                              type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: EmployeeSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], filter_backends=[], pagination_class=None)
+    def search(self, request):
+        try:
+            limit = int(request.GET.get('limit', self.search_limit))
+        except ValueError:
+            limit = self.search_limit
+        limit = max(1, min(limit, self.max_search_limit))
+        matches = ranked_matches(self.get_queryset(), request.GET.get('q', ''))
+        return Response([self.read_row(row) for row in matches.values(*self.read_values)[:limit]])
+
+
+class PerformanceViewSet(ExportMixin, ValuesReadMixin, viewsets.ModelViewSet):
+    queryset = Performance.objects.select_related('employee__department').all()
     serializer_class = PerformanceSerializer
+    query_budget = {'list': 2, 'retrieve': 2, 'latest': 3, 'trends': 3, 'histogram': 3, 'default': 4}
+    replica_actions = ('list', 'retrieve', 'export', 'latest', 'trends', 'histogram')
+    read_values = PERFORMANCE_VALUES
+    read_row = staticmethod(performance_row)
+    export_filename = 'performances'
+    export_columns = [
+        ('id', 'id'), ('employee_id', 'employee_id'), ('employee_name', 'employee__name'),
+        ('rating', 'rating'), ('review_date', 'review_date'),
+    ]
     pagination_class = CursorResultsSetPagination
     permission_classes = [IsAuthenticated]
+    max_trend_window = 24
+
+    def analytics_scope(self, request, *names):
+        """Read the optional integer id filters in ``names``. Returns (scope, error)."""
+        scope = {}
+        for name in names:
+            value = request.GET.get(name)
+            scope[name] = parse_int(value) if value else None
+            if value and scope[name] is None:
+                return {}, f"'{name}' must be a non-negative integer."
+        return scope, None
+
+    @swagger_auto_schema(
+        operation_description="Each employee's most recent review, ordered by employee id.",
+        manual_parameters=[
+            openapi.Parameter('department_id', openapi.IN_QUERY, description="Only employees of this department",
+                              type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: PerformanceSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'], filter_backends=[], pagination_class=None)
+    def latest(self, request):
+        scope, error = self.analytics_scope(request, 'department_id')
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.latest_reviews(**scope))
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Average rating per month for each department or employee, with a rolling "
+            "average over the last `window` months."
+        ),
+        manual_parameters=[
+            openapi.Parameter('by', openapi.IN_QUERY, description="Group by department (default) or employee",
+                              type=openapi.TYPE_STRING, enum=list(analytics.TREND_GROUPS)),
+            openapi.Parameter('window', openapi.IN_QUERY, description="Months in the rolling average (default 3)",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('department_id', openapi.IN_QUERY, description="Only employees of this department",
+                              type=openapi.TYPE_INTEGER),
+            openapi.Parameter('employee_id', openapi.IN_QUERY, description="Only this employee (by=employee)",
+                              type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: openapi.Response('JSON with by, window and results')}
+    )
+    @action(detail=False, methods=['get'], filter_backends=[], pagination_class=None)
+    def trends(self, request):
+        by = request.GET.get('by') or 'department'
+        if by not in analytics.TREND_GROUPS:
+            return Response({"error": f"'by' must be one of: {', '.join(analytics.TREND_GROUPS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # An employee filter would cut department partitions short.
+        scope, error = self.analytics_scope(request, *(
+            ('department_id', 'employee_id') if by == 'employee' else ('department_id',)
+        ))
+        if not error:
+            window, error = parse_positive_int(request.GET, 'window', 3, self.max_trend_window)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.rating_trends(by, window, **scope))
+
+    @swagger_auto_schema(
+        operation_description="Number of reviews with each rating (1-5) per review period.",
+        manual_parameters=[
+            openapi.Parameter('period', openapi.IN_QUERY, description="Review period (default month)",
+                              type=openapi.TYPE_STRING, enum=list(analytics.PERIODS)),
+            openapi.Parameter('department_id', openapi.IN_QUERY, description="Only employees of this department",
+                              type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: openapi.Response('JSON with labels and counts per rating')}
+    )
+    @action(detail=False, methods=['get'], filter_backends=[], pagination_class=None)
+    def histogram(self, request):
+        period = request.GET.get('period') or 'month'
+        if period not in analytics.PERIODS:
+            return Response({"error": f"'period' must be one of: {', '.join(analytics.PERIODS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        scope, error = self.analytics_scope(request, 'department_id')
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.rating_histogram(period, **scope))
 
 
 # ----------------------
@@ -98,10 +371,56 @@ def charts_view(request):
 
     
 
+# ----------------------
+# Chart Request Parsing
+# ----------------------
+
+def parse_int(value, minimum=0):
+    """
+    ``value`` as an int of at least ``minimum``, or None. str.isdigit() is no check: it
+    accepts characters such as '²' that int() rejects.
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= minimum else None
+
+
+def parse_window(params):
+    """
+    Read the optional 'from'/'to' dates from query params.
+    Returns (window, error): keyword arguments for charts.monthly_attendance, or a message.
+    """
+    window = {}
+    for param, key in (('from', 'start'), ('to', 'end')):
+        value = params.get(param)
+        if value:
+            try:
+                window[key] = parse_date(value)
+            except ValueError:
+                window[key] = None
+            if window[key] is None:
+                return {}, f"'{param}' must be a date in YYYY-MM-DD format."
+    if window.get('start') and window.get('end') and window['start'] > window['end']:
+        return {}, "'from' must not be after 'to'."
+    return window, None
+
+
+def attendance_scope(request):
+    """Employees only see their own attendance; everyone else may filter by department."""
+    if is_employee(request.user):
+        # Employees are linked to their login by email.
+        return {'employee_email': request.user.email}
+    return {'department_id': request.GET.get('department_id')}
+
+
 # ----------------------
 # API: Employees Per Department (w/ total summary)
 # ----------------------
 
+@use_replica
+@query_budget(2)
 @swagger_auto_schema(
     method='get',
     operation_description="Returns count of employees grouped by department with total",
@@ -110,24 +429,18 @@ def charts_view(request):
 )
 
 @api_view(['GET'])
-@permission_classes([AllowAny]) 
+@permission_classes([AllowAny])
+@cached_response('employees_per_department')
 def employees_per_department(request):
-
-    data = (
-        Department.objects
-        .annotate(employee_count=Count('employees'))
-        .values_list('name', 'employee_count')
-    )
-    labels = [name for name, _ in data]
-    counts = [count for _, count in data]
-    total = sum(counts)
-    return Response({'labels': labels, 'counts': counts, 'total': total})
+    return Response(charts.employees_per_department())
 
 
 # ----------------------
 # API: Monthly Attendance Overview (Chart)
 # ----------------------
 
+@use_replica
+@query_budget(3)
 @swagger_auto_schema(
     method='get',
     operation_description="Returns monthly attendance summary, optional department filter.",
@@ -138,52 +451,40 @@ def employees_per_department(request):
             openapi.IN_QUERY,
             description="Filter by department",
             type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'from',
+            openapi.IN_QUERY,
+            description="First date to include (YYYY-MM-DD)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE
+        ),
+        openapi.Parameter(
+            'to',
+            openapi.IN_QUERY,
+            description="Last date to include (YYYY-MM-DD)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE
         )
     ],
     responses={200: openapi.Response('JSON with present, absent, late counts')}
 )
 @api_view(['GET'])
-@permission_classes([AllowAny]) 
+@permission_classes([AllowAny])
+@cached_response('monthly_attendance_summary')
 def monthly_attendance_summary(request):
-    user = request.user
-    department_id = request.GET.get('department_id')
-
-    queryset = Attendance.objects.select_related('employee')
-    if is_employee(user):
-        queryset = queryset.filter(employee__user=user)
-    elif department_id:
-        queryset = queryset.filter(employee__department_id=department_id)
-
-    data = (
-        queryset
-        .annotate(month=TruncMonth('date'))
-        .values('month', 'status')
-        .order_by('month')
-    )
-
-    from collections import defaultdict
-    summary = defaultdict(lambda: {'P': 0, 'A': 0, 'L': 0})
-    for record in data:
-        month = record['month'].strftime('%b %Y')
-        summary[month][record['status']] += 1
-
-    labels = list(summary.keys())
-    present = [summary[m]['P'] for m in labels]
-    absent = [summary[m]['A'] for m in labels]
-    late = [summary[m]['L'] for m in labels]
-
-    return Response({
-        'labels': labels,
-        'present': present,
-        'absent': absent,
-        'late': late
-    })
+    window, error = parse_window(request.GET)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(charts.monthly_attendance(**attendance_scope(request), **window))
 
 
 # ----------------------
 # API: Department Dropdown List
 # ----------------------
 
+@use_replica
+@query_budget(2)
 @swagger_auto_schema(
     method='get',
     operation_description="Returns department ID and name list.",
@@ -192,17 +493,241 @@ def monthly_attendance_summary(request):
 )
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('department_list')
 def department_list(request):
-    departments = Department.objects.values_list('id', 'name')
-    return Response([{'id': id_, 'name': name} for id_, name in departments])
+    return Response(charts.department_list())
+
+
+# ----------------------
+# API: Dashboard (all chart datasets in one response)
+# ----------------------
+
+@use_replica
+@query_budget(4)
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Returns the department list, employees per department and monthly attendance in one "
+        "response. Compressed with Brotli or gzip when the client accepts it."
+    ),
+    tags=['Charts'],
+    manual_parameters=[
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated datasets to include: " + ", ".join(charts.DASHBOARD_FIELDS),
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'department_id',
+            openapi.IN_QUERY,
+            description="Filter monthly attendance by department",
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'from',
+            openapi.IN_QUERY,
+            description="First attendance date to include (YYYY-MM-DD)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE
+        ),
+        openapi.Parameter(
+            'to',
+            openapi.IN_QUERY,
+            description="Last attendance date to include (YYYY-MM-DD)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE
+        )
+    ],
+    responses={200: openapi.Response('JSON keyed by the selected datasets')}
+)
+@compress_response
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_response('dashboard')
+def dashboard(request):
+    fields = charts.DASHBOARD_FIELDS
+    if request.GET.get('fields'):
+        fields = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+        unknown = sorted(set(fields) - set(charts.DASHBOARD_FIELDS))
+        if unknown:
+            return Response({"error": f"Unknown fields: {', '.join(unknown)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+    window = {}
+    if 'monthly_attendance' in fields:
+        window, error = parse_window(request.GET)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        window.update(attendance_scope(request))
+    return Response(charts.dashboard(fields, **window))
+
+
+# ----------------------
+# API: Attendance Matrix Analytics
+# ----------------------
+
+def parse_positive_int(params, name, default, maximum):
+    """Read an optional integer query param in 1..maximum. Returns (value, error)."""
+    value = params.get(name)
+    if not value:
+        return default, None
+    number = parse_int(value, minimum=1)
+    if number is None or number > maximum:
+        return None, f"'{name}' must be an integer from 1 to {maximum}."
+    return number, None
+
+
+def parse_matrix_scope(request):
+    """Status, date window and scope shared by the matrix charts. Returns (options, error)."""
+    attendance_status = request.GET.get('status') or 'A'
+    if attendance_status not in STATUS_CODES:
+        return {}, f"'status' must be one of: {', '.join(STATUS_CODES)}."
+    department_id = request.GET.get('department_id')
+    if department_id and parse_int(department_id) is None:
+        return {}, "'department_id' must be a non-negative integer."
+    window, error = parse_window(request.GET)
+    if error:
+        return {}, error
+    return {'status': attendance_status, **window, **attendance_scope(request)}, None
+
+
+matrix_parameters = [
+    openapi.Parameter(
+        'status',
+        openapi.IN_QUERY,
+        description="Attendance status to analyse: P, A or L (default A)",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'department_id',
+        openapi.IN_QUERY,
+        description="Only employees of this department",
+        type=openapi.TYPE_INTEGER
+    ),
+    openapi.Parameter(
+        'from',
+        openapi.IN_QUERY,
+        description="First date to include (YYYY-MM-DD)",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE
+    ),
+    openapi.Parameter(
+        'to',
+        openapi.IN_QUERY,
+        description="Last date to include (YYYY-MM-DD)",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE
+    )
+]
+
+
+@use_replica
+@query_budget(6)
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Returns, for each day, the share of attendance records with the given status over "
+        "a trailing window of days. Covers the last ATTENDANCE_MATRIX_DAYS days."
+    ),
+    tags=['Charts'],
+    manual_parameters=matrix_parameters + [
+        openapi.Parameter(
+            'window',
+            openapi.IN_QUERY,
+            description="Days in the trailing window (default 7)",
+            type=openapi.TYPE_INTEGER
+        )
+    ],
+    responses={200: openapi.Response('JSON with labels (dates), rate and count')}
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_response('attendance_rolling')
+def attendance_rolling(request):
+    options, error = parse_matrix_scope(request)
+    if not error:
+        options['window'], error = parse_positive_int(request.GET, 'window', 7, window_days())
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(charts.attendance_rolling(**options))
+
+
+@use_replica
+@query_budget(6)
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Returns the employees with the longest run of consecutive days with the given "
+        "status, and the run each has going on the last day."
+    ),
+    tags=['Charts'],
+    manual_parameters=matrix_parameters + [
+        openapi.Parameter(
+            'limit',
+            openapi.IN_QUERY,
+            description="Employees to return (default 10, max 100)",
+            type=openapi.TYPE_INTEGER
+        )
+    ],
+    responses={200: openapi.Response('JSON with status and results')}
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_response('attendance_streaks')
+def attendance_streaks(request):
+    options, error = parse_matrix_scope(request)
+    if not error:
+        options['limit'], error = parse_positive_int(request.GET, 'limit', 10, 100)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(charts.attendance_streaks(**options))
+
+
+# ----------------------
+# API: Chart Cache Statistics
+# ----------------------
+
+@query_budget(1)
+@swagger_auto_schema(
+    method='get',
+    operation_description="Returns hit, miss and 304 counters for the chart response cache.",
+    tags=['Charts'],
+    responses={200: openapi.Response('JSON with hits, misses, not_modified and hit_ratio')}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def chart_cache_stats(request):
+    return Response(cache_stats())
+
+
+# ----------------------
+# API: Database Connection Pool Statistics
+# ----------------------
+
+@query_budget(1)
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Returns the connection pool counters (checkouts, waits, timeouts, leaks) of the worker "
+        "process that serves the request. Empty unless DB_POOL is on."
+    ),
+    tags=['Monitoring'],
+    responses={200: openapi.Response('JSON with the process id and counters per database alias')}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    return Response(pool_stats())
 
 
 # ----------------------
 # API: Current Authenticated User Info
 # ----------------------
 
+@query_budget(1)
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachingTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def current_user_view(request):
     user = request.user
@@ -261,7 +786,9 @@ def register_user(request):
     user.save()
 
     token, _ = Token.objects.get_or_create(user=user)
-    logger.info(f"New user registered: {username}, role={role}")
+    logger.info("New user registered: %s, role=%s", username, role, extra={'fields': {
+        'event': 'user_registered', 'user_id': user.pk, 'username': username, 'role': role,
+    }})
 
     return Response({
         'username': user.username,
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the ASGI deployment.
+
+    gunicorn -c gunicorn.conf.py employee_project.asgi:application
+
+Each worker runs an event loop (uvicorn), so the async endpoints under /api/async/ can
+hold many in-flight requests while waiting on the database; sync views still run in
+Django's thread pool. For the WSGI deployment, override the worker class:
+
+    gunicorn -c gunicorn.conf.py -k sync employee_project.wsgi:application
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = timeout
+accesslog = '-'
@@ -0,0 +1,71 @@
+"""
+Management command running job queue workers.
+
+Starts a pool of worker processes that claim and run queued jobs until interrupted; each
+process handles one job at a time. ``--processes 0`` runs a single worker in this
+process, and ``--burst`` exits once the queue has no runnable jobs (handy in tests, cron
+and CI). Models are imported inside functions so the worker entry point can be loaded in
+spawned processes before Django is set up.
+"""
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_main(burst, poll_interval, stop):
+    import django
+    django.setup()  # No-op when forked from an already set-up parent.
+    from jobs.queue import work
+    # The parent handles Ctrl-C and tells workers to stop after their current job.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(burst=burst, poll_interval=poll_interval, stop=stop)
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers on a pool of processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Worker processes to start (default: the JOB_WORKERS setting); '
+                                 '0 runs one worker in this process.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is runnable instead of polling for new ones.')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Seconds to wait between polls of an empty queue.')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes is None:
+            processes = getattr(settings, 'JOB_WORKERS', 2)
+        if processes <= 0:
+            from jobs.queue import work
+            done = work(burst=options['burst'], poll_interval=options['poll_interval'])
+            self.stdout.write(self.style.SUCCESS(f'Ran {done} job(s).'))
+            return
+
+        stop = multiprocessing.Event()
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=_worker_main, args=(options['burst'], options['poll_interval'], stop),
+                name=f'job-worker-{number}',
+            )
+            for number in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Started {processes} worker process(es).')
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping workers after their current jobs...')
+            stop.set()
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Name of the registered task to run', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Arguments for the task')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', help_text='Current state of the job', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of times a worker has started the job')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, help_text='Attempts allowed before the job is marked failed')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time a worker may start the job; pushed back between retries')),
+                ('checkpoint', models.JSONField(blank=True, help_text='Progress saved by the task, handed back to it when a retry resumes', null=True)),
+                ('progress', models.FloatField(default=0.0, help_text='Fraction of the work done, from 0 to 1')),
+                ('result', models.JSONField(blank=True, help_text='Value returned by the task', null=True)),
+                ('error', models.TextField(blank=True, help_text='Traceback of the most recent failure')),
+                ('worker', models.CharField(blank=True, help_text='Worker currently holding the job', max_length=100)),
+                ('heartbeat_at', models.DateTimeField(blank=True, help_text='Last time the worker reported the job alive', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who enqueued the job', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after', 'id'], name='job_claim_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+"""
+Model for the database-backed job queue.
+A Job row is both the queue entry and its status record: workers claim queued rows with a
+conditional UPDATE, so no broker or row locking support is needed.
+"""
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work run by ``manage.py run_workers``."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(
+        max_length=100,
+        help_text="Name of the registered task to run"
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Arguments for the task"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        help_text="Current state of the job"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of times a worker has started the job"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        help_text="Attempts allowed before the job is marked failed"
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time a worker may start the job; pushed back between retries"
+    )
+    checkpoint = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Progress saved by the task, handed back to it when a retry resumes"
+    )
+    progress = models.FloatField(
+        default=0.0,
+        help_text="Fraction of the work done, from 0 to 1"
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Value returned by the task"
+    )
+    error = models.TextField(
+        blank=True,
+        help_text="Traceback of the most recent failure"
+    )
+    worker = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Worker currently holding the job"
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Last time the worker reported the job alive"
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='jobs',
+        help_text="User who enqueued the job"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Workers look for the oldest runnable queued job; stale-lease recovery scans running ones.
+        indexes = [
+            models.Index(fields=['status', 'run_after', 'id'], name='job_claim_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,199 @@
+"""
+Task registry, enqueueing and the worker loop for the job queue.
+
+Tasks are plain functions registered with @task and called with a JobContext. A task that
+calls ``context.save_checkpoint()`` as it goes is resumable: when an attempt fails, or its
+worker dies and the lease expires, the next attempt gets the last checkpoint back in
+``context.checkpoint`` and can continue from there.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_TASKS = {}
+
+
+class JobLost(Exception):
+    """Raised inside a task when its lease was taken over by another worker."""
+
+
+def task(name, max_attempts=3, validate=None):
+    """
+    Register ``func(context)`` as the task run for jobs of kind ``name``. ``validate``, if
+    given, is called with the payload at enqueue time and raises ValueError to reject it.
+    """
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        func.validate = validate
+        _TASKS[name] = func
+        return func
+    return decorator
+
+
+def task_names():
+    return sorted(_TASKS)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(kind, payload=None, user=None, max_attempts=None, run_after=None):
+    """Queue a job for the registered task ``kind``; returns the Job."""
+    if kind not in _TASKS:
+        raise ValueError(f'Unknown job kind: {kind!r}.')
+    if _TASKS[kind].validate is not None:
+        _TASKS[kind].validate(payload or {})
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or _TASKS[kind].max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+
+class JobContext:
+    """What a task sees of its job: the payload, the last checkpoint and a way to save one."""
+
+    def __init__(self, job):
+        self.job = job
+        self.payload = job.payload
+        self.checkpoint = job.checkpoint
+
+    def save_checkpoint(self, state, progress=None):
+        """
+        Persist ``state`` (JSON-serializable) so a later attempt can resume from it.
+        Also renews the lease; raises JobLost if another worker has taken the job over.
+        """
+        fields = {'checkpoint': state, 'heartbeat_at': timezone.now()}
+        if progress is not None:
+            fields['progress'] = min(max(progress, 0.0), 1.0)
+        if not _owned(self.job).update(**fields):
+            raise JobLost(f'Job {self.job.pk} is no longer held by {self.job.worker}.')
+        self.checkpoint = state
+
+
+def _owned(job):
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, worker=job.worker)
+
+
+def requeue_stale():
+    """Return running jobs whose worker stopped heartbeating to the queue, or fail them."""
+    cutoff = timezone.now() - timedelta(seconds=_setting('JOB_LEASE_SECONDS', 300))
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, worker='', finished_at=timezone.now(),
+        error='Worker stopped responding on the final attempt.',
+    )
+    return stale.update(status=Job.QUEUED, worker='')
+
+
+def claim(worker):
+    """Claim the oldest runnable job for ``worker``; returns the Job or None."""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        .order_by('run_after', 'id').values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        # Only one worker's conditional UPDATE can move the row out of 'queued'.
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, attempts=F('attempts') + 1,
+            started_at=now, heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+class _Heartbeat(threading.Thread):
+    """Renews the lease of a running job so long tasks without checkpoints keep it."""
+
+    def __init__(self, job):
+        super().__init__(daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = _setting('JOB_LEASE_SECONDS', 300) / 3
+        try:
+            while not self.stopped.wait(interval):
+                _owned(self.job).update(heartbeat_at=timezone.now())
+        finally:
+            connections.close_all()
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome: success, a retry with backoff, or failure."""
+    heartbeat = _Heartbeat(job)
+    heartbeat.start()
+    try:
+        result = _TASKS[job.kind](JobContext(job))
+    except JobLost:
+        logger.warning('Job %s was taken over by another worker.', job.pk)
+        return
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = _setting('JOB_RETRY_BACKOFF_SECONDS', 30) * 2 ** (job.attempts - 1)
+            _owned(job).update(
+                status=Job.QUEUED, worker='', error=error,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+            logger.warning('Job %s failed on attempt %s; retrying in %ss.', job.pk, job.attempts, delay)
+        else:
+            _owned(job).update(status=Job.FAILED, worker='', error=error, finished_at=timezone.now())
+            logger.error('Job %s failed after %s attempts.', job.pk, job.attempts)
+    else:
+        _owned(job).update(
+            status=Job.SUCCEEDED, worker='', result=result, progress=1.0, finished_at=timezone.now(),
+        )
+    finally:
+        heartbeat.stopped.set()
+        heartbeat.join()
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def work(burst=False, poll_interval=None, stop=None):
+    """
+    Claim and run jobs until ``stop`` (an Event) is set. In burst mode, return as soon as no
+    job is runnable. Returns the number of jobs run.
+    """
+    name = worker_name()
+    poll_interval = _setting('JOB_POLL_INTERVAL', 1.0) if poll_interval is None else poll_interval
+    done = 0
+    while stop is None or not stop.is_set():
+        close_old_connections()
+        requeue_stale()
+        job = claim(name)
+        if job is None:
+            if burst:
+                break
+            (stop or threading.Event()).wait(poll_interval)
+            continue
+        if job.kind not in _TASKS:
+            _owned(job).update(
+                status=Job.FAILED, worker='', finished_at=timezone.now(),
+                error=f'No task registered for {job.kind!r}.',
+            )
+            continue
+        run_job(job)
+        done += 1
+    return done
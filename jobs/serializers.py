@@ -0,0 +1,41 @@
+"""
+Serializers for the job queue API.
+"""
+from rest_framework import serializers
+
+from .models import Job
+from .queue import enqueue, task_names
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Job status for polling; on create, ``kind`` and ``payload`` are validated and queued."""
+    kind = serializers.ChoiceField(choices=[], help_text="Registered task to run")
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'payload', 'status', 'progress', 'attempts', 'max_attempts',
+            'result', 'error', 'run_after', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'status', 'progress', 'attempts', 'result', 'error', 'run_after',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        extra_kwargs = {'max_attempts': {'required': False, 'min_value': 1, 'max_value': 10}}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Tasks register at app load, after this class is defined.
+        fields['kind'].choices = task_names()
+        return fields
+
+    def create(self, validated_data):
+        try:
+            return enqueue(
+                validated_data['kind'],
+                payload=validated_data.get('payload'),
+                user=self.context['request'].user,
+                max_attempts=validated_data.get('max_attempts'),
+            )
+        except ValueError as exc:
+            raise serializers.ValidationError({'payload': [str(exc)]})
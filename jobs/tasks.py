@@ -0,0 +1,146 @@
+"""
+Built-in job tasks: exports, employee imports and the derived-data maintenance commands.
+"""
+import os
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from rest_framework.request import Request
+
+from attendance.matrix import prune_changes
+from attendance.rollup import rebuild_rollup
+from attendance.views import AttendanceViewSet
+from employees.exports import EXPORT_CHUNK_SIZE, export_lines
+from employees.models import recount_employee_counts
+from employees.serializers import BULK_BATCH_SIZE, EmployeeSerializer
+from employees.views import EmployeeViewSet, PerformanceViewSet
+from .queue import task
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+MAX_IMPORT_EMPLOYEES = 50000
+EXPORT_VIEWSETS = {
+    'employees': EmployeeViewSet,
+    'performances': PerformanceViewSet,
+    'attendance': AttendanceViewSet,
+}
+
+
+def export_dir():
+    return getattr(settings, 'JOB_EXPORT_DIR', os.path.join(settings.BASE_DIR, 'exports'))
+
+
+def validate_export(payload):
+    if payload.get('resource') not in EXPORT_VIEWSETS:
+        raise ValueError(f"'resource' must be one of: {', '.join(EXPORT_VIEWSETS)}.")
+    if payload.get('format', 'csv') not in EXPORT_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(EXPORT_FORMATS)}.")
+    if not isinstance(payload.get('filters', {}), dict):
+        raise ValueError("'filters' must be an object of list query parameters.")
+
+
+@task('export', validate=validate_export)
+def export(context):
+    """
+    Write an export file to JOB_EXPORT_DIR. Payload: ``resource``, ``format`` (csv or
+    ndjson) and ``filters``, the query parameters the list endpoint accepts. Rows go out in
+    primary key order, one chunk at a time; each chunk is checkpointed with the file size,
+    so a retry truncates any partial chunk and carries on after the last written row.
+    """
+    payload = context.payload
+    export_format = payload.get('format', 'csv')
+    viewset_class = EXPORT_VIEWSETS[payload['resource']]
+    http_request = HttpRequest()
+    http_request.GET = QueryDict(urlencode(payload.get('filters', {}), doseq=True))
+    view = viewset_class(request=Request(http_request), format_kwarg=None, action='list', args=(), kwargs={})
+    queryset = view.filter_queryset(view.get_queryset()).order_by('pk')
+    headers = [header for header, _ in viewset_class.export_columns]
+    lookups = ['pk'] + [lookup for _, lookup in viewset_class.export_columns]
+
+    state = context.checkpoint or {'last_pk': None, 'rows': 0, 'bytes': 0}
+    total = queryset.count()
+    os.makedirs(export_dir(), exist_ok=True)
+    path = os.path.join(export_dir(), f'{viewset_class.export_filename}-{context.job.pk}.{export_format}')
+    with open(path, 'a+b') as handle:
+        # Append mode writes at the end, which the truncate moves back to the checkpoint.
+        handle.truncate(state['bytes'])
+        if state['bytes'] == 0:
+            handle.write(''.join(export_lines(headers, [], export_format)).encode())
+        while True:
+            rows = queryset if state['last_pk'] is None else queryset.filter(pk__gt=state['last_pk'])
+            chunk = list(rows.values_list(*lookups)[:EXPORT_CHUNK_SIZE])
+            if not chunk:
+                break
+            lines = export_lines(headers, [row[1:] for row in chunk], export_format, header=False)
+            handle.write(''.join(lines).encode())
+            handle.flush()
+            state = {'last_pk': chunk[-1][0], 'rows': state['rows'] + len(chunk), 'bytes': handle.tell()}
+            context.save_checkpoint(state, progress=state['rows'] / total if total else 1.0)
+    return {
+        'path': path,
+        'filename': f'{viewset_class.export_filename}.{export_format}',
+        'format': export_format,
+        'rows': state['rows'],
+    }
+
+
+def validate_import(payload):
+    employees = payload.get('employees')
+    if not isinstance(employees, list) or not employees:
+        raise ValueError("'employees' must be a non-empty list of employee objects.")
+    if len(employees) > MAX_IMPORT_EMPLOYEES:
+        raise ValueError(f'An import may contain at most {MAX_IMPORT_EMPLOYEES} employees.')
+
+
+@task('import_employees', validate=validate_import)
+def import_employees(context):
+    """
+    Create the employees in ``payload['employees']``, validated and written in batches as
+    a bulk POST to /api/employees/ would be. Invalid items are skipped and reported by their
+    index in the payload. Each batch commits together with its checkpoint, so a retry never
+    creates an employee twice.
+    """
+    items = context.payload['employees']
+    state = context.checkpoint or {'next': 0, 'created': 0, 'errors': []}
+    for start in range(state['next'], len(items), BULK_BATCH_SIZE):
+        pending = list(enumerate(items[start:start + BULK_BATCH_SIZE], start))
+        errors = []
+        created = 0
+        with transaction.atomic():
+            # A list serializer rejects the whole batch, so validate again without the invalid items.
+            while pending:
+                serializer = EmployeeSerializer(data=[item for _, item in pending], many=True)
+                if serializer.is_valid():
+                    created = len(serializer.save())
+                    break
+                errors += [
+                    {'index': index, 'errors': item_errors}
+                    for (index, _), item_errors in zip(pending, serializer.errors) if item_errors
+                ]
+                pending = [entry for entry, item_errors in zip(pending, serializer.errors) if not item_errors]
+            state = {
+                'next': start + BULK_BATCH_SIZE,
+                'created': state['created'] + created,
+                'errors': state['errors'] + errors,
+            }
+            context.save_checkpoint(state, progress=min(state['next'], len(items)) / len(items))
+    return {'created': state['created'], 'errors': state['errors']}
+
+
+@task('rebuild_attendance_rollup')
+def rebuild_attendance_rollup(context):
+    """Rebuild the monthly attendance rollup, as ``manage.py rebuild_attendance_rollup`` does."""
+    return {'rows': rebuild_rollup()}
+
+
+@task('prune_attendance_changes')
+def prune_attendance_changes(context):
+    """Delete AttendanceChange rows no matrix refresh will read again."""
+    return {'deleted': prune_changes()}
+
+
+@task('reconcile_employee_counts')
+def reconcile_employee_counts(context):
+    """Recount Department.employee_count for every department."""
+    return {'departments': recount_employee_counts()}
@@ -0,0 +1,157 @@
+import csv
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from employees.models import Department, Employee
+from jobs.models import Job
+from jobs.queue import claim, enqueue, requeue_stale, task, work
+
+calls = []
+
+
+@task('test_flaky', max_attempts=3)
+def flaky(context):
+    """Saves a checkpoint per step and fails once after step 2; resumes from the checkpoint."""
+    step = (context.checkpoint or {}).get('step', 0)
+    while step < 4:
+        step += 1
+        calls.append(step)
+        context.save_checkpoint({'step': step}, progress=step / 4)
+        if step == 2 and len(calls) == 2:
+            raise RuntimeError('transient failure')
+    return {'steps': step}
+
+
+@task('test_broken', max_attempts=2)
+def broken(context):
+    raise ValueError('always fails')
+
+
+@override_settings(JOB_RETRY_BACKOFF_SECONDS=0)
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_retry_resumes_from_checkpoint(self):
+        job = enqueue('test_flaky')
+        self.assertEqual(work(burst=True), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.result, {'steps': 4})
+        self.assertEqual(job.progress, 1.0)
+        self.assertIn('transient failure', job.error)
+        # Steps 1 and 2 ran once; the retry continued at step 3.
+        self.assertEqual(calls, [1, 2, 3, 4])
+
+    def test_job_fails_after_max_attempts(self):
+        job = enqueue('test_broken')
+        work(burst=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIn('always fails', job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_waits_for_backoff(self):
+        with override_settings(JOB_RETRY_BACKOFF_SECONDS=60):
+            job = enqueue('test_broken')
+            self.assertEqual(work(burst=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=50))
+
+    def test_a_job_is_claimed_once(self):
+        enqueue('test_flaky')
+        self.assertIsNotNone(claim('worker-a'))
+        self.assertIsNone(claim('worker-b'))
+
+    def test_stale_lease_is_requeued_and_resumed(self):
+        job = enqueue('test_flaky')
+        claim('dead-worker')
+        Job.objects.filter(pk=job.pk).update(
+            checkpoint={'step': 3}, heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale(), 1)
+        work(burst=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 2))
+        self.assertEqual(calls, [4])
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('no_such_task')
+
+
+class JobAPITests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass')
+        self.token, _ = Token.objects.get_or_create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        department = Department.objects.create(name='IT')
+        for number in range(5):
+            Employee.objects.create(
+                name=f'Employee {number}', email=f'e{number}@example.com', phone_number='1',
+                address='A', date_of_joining='2024-01-01', department=department
+            )
+        self.department = department
+        self.export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.export_dir.cleanup)
+
+    def test_export_job_end_to_end(self):
+        response = self.client.post('/api/jobs/', {
+            'kind': 'export',
+            'payload': {'resource': 'employees', 'format': 'csv', 'filters': {'search': 'Employee'}},
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], Job.QUEUED)
+        job_url = f"/api/jobs/{response.data['id']}/"
+        self.assertTrue(response['Location'].endswith(job_url))
+
+        with self.settings(JOB_EXPORT_DIR=self.export_dir.name):
+            call_command('run_workers', processes=0, burst=True, stdout=StringIO())
+        response = self.client.get(job_url)
+        self.assertEqual(response.data['status'], Job.SUCCEEDED)
+        self.assertEqual(response.data['result']['rows'], 5)
+
+        response = self.client.get(job_url + 'download/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        response.close()
+        self.assertEqual(rows[0][:3], ['id', 'name', 'email'])
+        self.assertEqual(len(rows), 6)
+
+    def test_import_job_reports_invalid_items(self):
+        items = [
+            {'name': 'New', 'email': 'new@example.com', 'phone_number': '1', 'address': 'A',
+             'date_of_joining': '2024-01-01', 'department_id': self.department.id},
+            {'name': 'Dup', 'email': 'e1@example.com', 'phone_number': '1', 'address': 'A',
+             'date_of_joining': '2024-01-01', 'department_id': self.department.id},
+        ]
+        response = self.client.post('/api/jobs/', {'kind': 'import_employees', 'payload': {'employees': items}},
+                                    format='json')
+        work(burst=True)
+        job = Job.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result['created'], 1)
+        self.assertEqual([error['index'] for error in job.result['errors']], [1])
+        self.assertTrue(Employee.objects.filter(email='new@example.com').exists())
+
+    def test_invalid_payload_and_permissions(self):
+        response = self.client.post('/api/jobs/', {'kind': 'export', 'payload': {'resource': 'users'}},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('payload', response.data)
+        response = self.client.post('/api/jobs/', {'kind': 'shell'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(User.objects.create_user(username='plain', password='pass'))
+        self.assertEqual(self.client.get('/api/jobs/').status_code, status.HTTP_403_FORBIDDEN)
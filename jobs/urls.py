@@ -0,0 +1,10 @@
+"""
+URL routing for the jobs app: registers the job queue viewset.
+"""
+from rest_framework import routers
+from .views import JobViewSet
+
+router = routers.DefaultRouter()
+router.register(r'jobs', JobViewSet)
+
+urlpatterns = router.urls
@@ -0,0 +1,53 @@
+import os
+
+from django.http import FileResponse, Http404
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from employees.views import CursorResultsSetPagination
+from .models import Job
+from .serializers import JobSerializer
+
+
+@swagger_auto_schema(tags=['Jobs'])
+class JobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                 viewsets.GenericViewSet):
+    """
+    Enqueue background jobs and poll their status. Jobs run in ``manage.py run_workers``;
+    poll ``GET /api/jobs/{id}/`` until ``status`` is 'succeeded' or 'failed'.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    query_budget = {'list': 2, 'retrieve': 2, 'create': 3, 'download': 2, 'default': 2}
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'kind']
+    pagination_class = CursorResultsSetPagination
+    permission_classes = [IsAdminUser]
+    # Status polls read the primary, which the workers update.
+    replica_actions = ()
+
+    @swagger_auto_schema(responses={202: JobSerializer})
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        location = request.build_absolute_uri(f'{job.pk}/')
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+    @swagger_auto_schema(
+        method='get',
+        operation_description="Downloads the file written by a finished export job.",
+        responses={200: openapi.Response('The export file'), 404: openapi.Response('No file for this job')}
+    )
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        result = job.result or {}
+        if job.kind != 'export' or job.status != Job.SUCCEEDED or not os.path.exists(result.get('path', '')):
+            raise Http404('This job has no file to download.')
+        return FileResponse(open(result['path'], 'rb'), as_attachment=True, filename=result['filename'])